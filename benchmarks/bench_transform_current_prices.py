@@ -0,0 +1,67 @@
+"""
+Benchmark: vectorized vs row-by-row flattening in transform_current_prices
+
+Run with:
+    python -m benchmarks.bench_transform_current_prices
+"""
+
+import logging
+import time
+from unittest.mock import patch
+import pandas as pd
+from benchmarks.generators import simple_price_payload
+from benchmarks.reference import legacy_flatten_rows
+from src.transform import transform_current_prices as transform_current
+from src.transform.transform_current_prices import (
+    transform_current_prices,
+    _flatten_vectorized,
+)
+
+COIN_COUNTS = [10, 100, 500, 1000, 5000]
+CURRENCY_COUNT = 30
+REPEATS = 3
+
+
+def best_time(func, *args, **kwargs) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    # Keep the per-call INFO logging out of the measurements
+    logging.disable(logging.INFO)
+
+    currencies = [f"cur{i}" for i in range(CURRENCY_COUNT)]
+
+    timestamp = pd.Timestamp.now(tz="UTC")
+
+    print(
+        f"{'coins':>6} {'rows':>8} | {'flatten: rows':>13} {'vectorized':>10} "
+        f"{'speedup':>7} | {'full: rows':>10} {'vectorized':>10} {'speedup':>7}"
+    )
+    for n_coins in COIN_COUNTS:
+        payload = simple_price_payload(n_coins, currencies)
+        coins = [{"id": cid, "name": cid.title()} for cid in payload]
+        lookup = {coin["id"]: coin["name"] for coin in coins}
+
+        flatten_rows = best_time(legacy_flatten_rows, payload, currencies, lookup, timestamp)
+        flatten_vec = best_time(
+            _flatten_vectorized, payload, currencies, lookup, timestamp
+        )
+        with patch.object(transform_current, "_flatten_vectorized", legacy_flatten_rows):
+            full_rows = best_time(transform_current_prices, payload, coins, currencies)
+        full_vec = best_time(transform_current_prices, payload, coins, currencies)
+
+        print(
+            f"{n_coins:>6} {n_coins * CURRENCY_COUNT:>8} | {flatten_rows:>12.4f}s "
+            f"{flatten_vec:>9.4f}s {flatten_rows / flatten_vec:>6.1f}x | "
+            f"{full_rows:>9.4f}s {full_vec:>9.4f}s {full_rows / full_vec:>6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
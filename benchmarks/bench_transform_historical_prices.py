@@ -0,0 +1,50 @@
+"""
+Benchmark: native grouped kernels vs per-group lambdas in
+transform_historical_prices
+
+Run with:
+    python -m benchmarks.bench_transform_historical_prices
+"""
+
+import logging
+import time
+import pandas as pd
+from benchmarks.generators import DAY_MS, ohlc_frame
+from benchmarks.reference import legacy_build_stats, legacy_enrich
+from src.transform.transform_historical_prices import _build_stats, _enrich
+
+COINS = 1000
+YEARS = 5
+REPEATS = 3
+
+
+def best_time(func, df: pd.DataFrame) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        frame = df.copy()
+        start = time.perf_counter()
+        func(frame)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    logging.disable(logging.INFO)
+
+    history = ohlc_frame(COINS, YEARS, candle_ms=DAY_MS)
+    enriched = history.copy()
+    _enrich(enriched)
+
+    print(f"{COINS} coins x {YEARS} years of daily candles ({len(history):,} rows)")
+    print(f"{'step':>8} {'lambdas (s)':>12} {'native (s)':>11} {'speedup':>8}")
+    for step, legacy, native, frame in (
+        ("enrich", legacy_enrich, _enrich, history),
+        ("stats", legacy_build_stats, _build_stats, enriched),
+    ):
+        before = best_time(legacy, frame)
+        after = best_time(native, frame)
+        print(f"{step:>8} {before:>12.4f} {after:>11.4f} {before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+Benchmark cases for each ETL stage and the dashboard read path
+"""
+
+import json
+import tempfile
+from pathlib import Path
+import pandas as pd
+from benchmarks import generators
+from benchmarks.harness import benchmark
+from src.extraction.raw_archive import OhlcArchive
+from src.load.storage import CsvBackend, ParquetBackend
+from src.utils.ohlc_batch import OhlcBatch, load_batches
+from src.transform.transform_current_prices import transform_current_prices
+from src.transform.transform_historical_prices import (
+    transform_coin_history,
+    transform_historical_prices,
+)
+from streamlit_app.comparison import build_comparison, select
+
+BACKENDS = {"csv": CsvBackend, "parquet": ParquetBackend}
+CURRENCY_COUNT = 3
+
+COIN_GRID = [{"coins": n} for n in (10, 100, 1000, 10_000)]
+# The transform input is a list of dicts (as extract returns it), so the
+# grid stops at ~1M candles - 10k coins x 10 years would need ~6 GB of dicts
+MAX_CANDLES = 1_000_000
+HISTORY_GRID = [
+    {"coins": n, "years": years}
+    for n in (10, 100, 1000, 10_000)
+    for years in (1, 10)
+    if n * years * 365 // 4 <= MAX_CANDLES
+]
+# 1000 coins x 10 years of 4-day candles is many small per-coin partitions,
+# so a layout that splits them further (e.g. by month) shows up as a regression
+STORAGE_GRID = [
+    {"backend": backend, "coins": n, "years": years}
+    for backend in BACKENDS
+    for n, years in ((100, 1), (1000, 1), (1000, 10))
+]
+STORAGE_QUICK = [p for p in STORAGE_GRID if p["coins"] == 100] + [
+    {"backend": "parquet", "coins": 1000, "years": 10}
+]
+COMPARISON_GRID = [{"coins": n, "years": years} for n in (10, 50) for years in (1, 5)]
+# Hourly candles, so each coin is big enough for per-coin memory to show
+STREAMING_GRID = [
+    {"mode": mode, "coins": n, "years": 1}
+    for mode in ("batch", "streaming")
+    for n in (20, 200)
+]
+INTERCHANGE_GRID = [
+    {"format": fmt, "coins": n, "years": 10}
+    for fmt in ("dicts", "batches")
+    for n in (100, 1000)
+]
+FALLBACK_GRID = [
+    {"format": fmt, "coins": n, "years": 10}
+    for fmt in ("json", "archive")
+    for n in (100, 1000)
+]
+SNAPSHOT_GRID = [{"backend": b, "coins": n} for b in BACKENDS for n in (100, 10_000)]
+
+
+def _transformed_history(coins: int, years: int) -> dict:
+    return transform_historical_prices(generators.ohlc_batches(coins, years))
+
+
+@benchmark("transform_current", COIN_GRID, quick=COIN_GRID[:3])
+def transform_current(coins):
+    currencies = generators.currencies(CURRENCY_COUNT)
+    payload = generators.simple_price_payload(coins, currencies)
+    coin_list = generators.coins(coins)
+
+    yield (
+        lambda: transform_current_prices(payload, coin_list, currencies),
+        coins * len(currencies),
+    )
+
+
+@benchmark(
+    "transform_historical",
+    HISTORY_GRID,
+    quick=[{"coins": 10, "years": 1}, {"coins": 100, "years": 10}, {"coins": 1000, "years": 1}],
+)
+def transform_historical(coins, years):
+    records = generators.ohlc_records(coins, years)
+
+    yield lambda: transform_historical_prices(records), len(records)
+
+
+@benchmark("load_current", SNAPSHOT_GRID, quick=[p for p in SNAPSHOT_GRID if p["coins"] == 100])
+def load_current(backend, coins):
+    currencies = generators.currencies(CURRENCY_COUNT)
+    payload = generators.simple_price_payload(coins, currencies)
+    df = transform_current_prices(payload, generators.coins(coins), currencies)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = BACKENDS[backend](Path(tmp))
+        timestamps = iter(pd.date_range(df["timestamp"].iloc[0], periods=1000, freq="min"))
+
+        def run():
+            # Each run is a new, later snapshot, as in the polling loop
+            store.write_current(df.assign(timestamp=next(timestamps)))
+
+        yield run, len(df)
+
+
+@benchmark("load_historical", STORAGE_GRID, quick=STORAGE_QUICK)
+def load_historical(backend, coins, years):
+    data = _transformed_history(coins, years)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = BACKENDS[backend](Path(tmp))
+        yield lambda: store.write_historical(data["clean"], data["stats"]), len(data["clean"])
+
+
+@benchmark("read_historical", STORAGE_GRID, quick=STORAGE_QUICK)
+def read_historical(backend, coins, years):
+    """
+    Dashboard read path: one coin's history, as the historical page loads it
+    """
+    data = _transformed_history(coins, years)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = BACKENDS[backend](Path(tmp))
+        store.write_historical(data["clean"], data["stats"])
+        coin_id = generators.coin_ids(coins)[coins // 2]
+        rows = int((data["clean"]["coin_id"] == coin_id).sum())
+
+        yield lambda: store.read_historical(coin_ids=[coin_id]), rows
+
+
+@benchmark("read_historical_all", STORAGE_GRID, quick=STORAGE_QUICK)
+def read_historical_all(backend, coins, years):
+    """
+    Dashboard read path: every coin, as the comparison page loads it
+    """
+    data = _transformed_history(coins, years)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = BACKENDS[backend](Path(tmp))
+        store.write_historical(data["clean"], data["stats"])
+
+        yield store.read_historical, len(data["clean"])
+
+
+@benchmark("comparison_rerun", COMPARISON_GRID, quick=[{"coins": 50, "years": 5}])
+def comparison_rerun(coins, years):
+    """
+    Comparison page rerun: slice every coin over the last year of daily candles
+    """
+    history = generators.ohlc_frame(coins, years, candle_ms=generators.DAY_MS)
+    history["display_name"] = history["coin_name"]
+    history["symbol"] = history["coin_id"]
+    data = build_comparison(history)
+    names = sorted(history["display_name"].unique())
+    start = history["timestamp"].max() - pd.Timedelta(days=365)
+
+    yield lambda: select(data, names, start), int((history["timestamp"] >= start).sum())
+
+
+def _coin_records(coin_id: str, rows: list[list]) -> list[dict]:
+    # The previous extract output - one dict per candle
+    name = coin_id.title()
+    return [
+        {"coin_id": coin_id, "coin_name": name, "currency": "gbp", "timestamp_ms": ts,
+         "open": o, "high": h, "low": low, "close": c}
+        for ts, o, h, low, c in rows
+    ]
+
+
+def _coin_batch(coin_id: str, rows: list[list]) -> OhlcBatch:
+    return OhlcBatch.from_rows(coin_id, coin_id.title(), "gbp", rows)
+
+
+@benchmark("ohlc_interchange", INTERCHANGE_GRID, quick=[p for p in INTERCHANGE_GRID if p["coins"] == 100])
+def ohlc_interchange(format, coins, years):
+    """
+    /ohlc responses -> extract output -> transform, with a dict per candle
+    vs one OhlcBatch per coin - compare peak_mb between the formats
+    """
+    payloads = generators.ohlc_payloads(coins, years)
+    rows = sum(len(r) for r in payloads.values())
+    convert = {"dicts": _coin_records, "batches": _coin_batch}[format]
+
+    def run():
+        raw = [convert(cid, rows) for cid, rows in payloads.items()]
+        if format == "dicts":
+            raw = [r for records in raw for r in records]
+        return transform_historical_prices(raw)
+
+    yield run, rows
+
+
+@benchmark("historical_etl", STREAMING_GRID, quick=[p for p in STREAMING_GRID if p["coins"] == 20])
+def historical_etl(mode, coins, years):
+    """
+    Historical transform + Parquet load, all coins at once vs one coin at a
+    time - compare peak_mb between the batch and streaming modes
+    """
+    payloads = generators.ohlc_payloads(coins, years, candle_ms=generators.DAY_MS // 24)
+    rows = sum(len(r) for r in payloads.values())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ParquetBackend(Path(tmp))
+
+        def batch():
+            batches = [_coin_batch(cid, rows) for cid, rows in payloads.items()]
+            data = transform_historical_prices(batches)
+            del batches
+            store.write_historical(data["clean"], data["stats"])
+
+        def streaming():
+            writer = store.historical_writer()
+            for cid, rows in payloads.items():
+                data = transform_coin_history([_coin_batch(cid, rows)])
+                writer.write_coin(data["clean"], data["stats"])
+            writer.finish()
+
+        yield {"batch": batch, "streaming": streaming}[mode], rows
+
+
+@benchmark("ohlc_fallback", FALLBACK_GRID, quick=[p for p in FALLBACK_GRID if p["coins"] == 100])
+def ohlc_fallback(format, coins, years):
+    """
+    One failed coin's last good candles, from the single all-coins JSON
+    backup vs the raw archive - compare seconds between the formats
+    """
+    batches = generators.ohlc_batches(coins, years)
+    coin_id = batches[-1].coin_id
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+
+        if format == "json":
+            path = root / "backup_historical_prices.json"
+            path.write_text(json.dumps([b.to_json() for b in batches], separators=(",", ":")))
+
+            def run():
+                with open(path) as f:
+                    return next(b for b in load_batches(json.load(f)) if b.coin_id == coin_id)
+        else:
+            archive = OhlcArchive(root, keep=1)
+            archive.write(batches)
+
+            def run():
+                return archive.latest([coin_id], "gbp")[coin_id]
+
+        yield run, len(batches[-1])
@@ -0,0 +1,153 @@
+"""
+Synthetic CoinGecko-shaped payloads for benchmarks
+
+- simple_price_payload: /simple/price response for n coins x currencies
+- ohlc_payloads: /coins/{id}/ohlc responses ([ts, o, h, l, c] rows) per coin
+- ohlc_records: the same candles as a list of dicts, one per candle
+- ohlc_batches: the same candles as extract_historical_ohlc returns them
+- ohlc_frame: sorted, typed OHLC frame as the transform step builds it
+
+All generators are deterministic for a given seed
+"""
+
+import random
+import numpy as np
+import pandas as pd
+from src.utils.ohlc_batch import OhlcBatch
+
+DAY_MS = 24 * 60 * 60 * 1000
+# /ohlc returns 4-day candles for windows over 30 days
+CANDLE_MS = 4 * DAY_MS
+# Fixed end of the generated history, so payloads do not depend on "now"
+END_MS = 1_767_225_600_000  # 2026-01-01T00:00:00Z
+
+
+def coin_ids(n_coins: int) -> list[str]:
+    return [f"coin-{i:05d}" for i in range(n_coins)]
+
+
+def coins(n_coins: int) -> list[dict]:
+    """
+    COINS-style config entries for n_coins synthetic coins
+    """
+    return [
+        {"id": cid, "symbol": cid[-3:].upper(), "name": cid.title()}
+        for cid in coin_ids(n_coins)
+    ]
+
+
+def currencies(n_currencies: int) -> list[str]:
+    base = ["gbp", "usd", "eur"]
+    return (base + [f"cur{i}" for i in range(n_currencies)])[:n_currencies]
+
+
+def simple_price_payload(n_coins: int, currency_list: list[str], seed: int = 0) -> dict:
+    """
+    /simple/price response with market cap, 24h volume and 24h change
+    """
+    rng = random.Random(seed)
+    payload = {}
+    for cid in coin_ids(n_coins):
+        values = {}
+        for cur in currency_list:
+            values[cur] = rng.uniform(0.01, 90_000)
+            values[f"{cur}_market_cap"] = rng.uniform(1e6, 1e12)
+            values[f"{cur}_24h_vol"] = rng.uniform(1e3, 1e10)
+            values[f"{cur}_24h_change"] = rng.uniform(-20, 20)
+        payload[cid] = values
+    return payload
+
+
+def _candles(n_coins: int, years: float, candle_ms: int, seed: int):
+    """
+    Random-walk closes shaped (n_coins, n_candles) plus the candle timestamps
+    """
+    rng = np.random.default_rng(seed)
+    n_candles = max(1, int(years * 365 * DAY_MS // candle_ms))
+
+    steps = rng.normal(0, 0.03, (n_coins, n_candles))
+    close = np.exp(steps.cumsum(axis=1)) * rng.uniform(0.01, 50_000, (n_coins, 1))
+    timestamps = END_MS - candle_ms * np.arange(n_candles - 1, -1, -1, dtype="int64")
+    return close, timestamps
+
+
+def ohlc_frame(
+    n_coins: int, years: float, candle_ms: int = CANDLE_MS, seed: int = 0
+) -> pd.DataFrame:
+    """
+    OHLC rows sorted by coin and timestamp, with the columns and dtypes
+    _clean_ohlc produces
+    """
+    close, timestamps = _candles(n_coins, years, candle_ms, seed)
+    n_candles = len(timestamps)
+    ids = np.repeat(coin_ids(n_coins), n_candles)
+    timestamp_ms = np.tile(timestamps, n_coins)
+    close = close.ravel()
+
+    return pd.DataFrame(
+        {
+            "coin_id": ids,
+            "coin_name": np.char.title(ids.astype(str)),
+            "currency": "gbp",
+            "timestamp_ms": timestamp_ms,
+            "open": close * 0.995,
+            "high": close * 1.01,
+            "low": close * 0.99,
+            "close": close,
+            "timestamp": pd.to_datetime(timestamp_ms, unit="ms"),
+        }
+    )
+
+
+def ohlc_payloads(
+    n_coins: int, years: float, candle_ms: int = CANDLE_MS, seed: int = 0
+) -> dict[str, list[list]]:
+    """
+    {coin_id: /ohlc response} with [timestamp_ms, open, high, low, close] rows
+    """
+    close, timestamps = _candles(n_coins, years, candle_ms, seed)
+    ts = timestamps.tolist()
+    return {
+        cid: [
+            [t, c * 0.995, c * 1.01, c * 0.99, c]
+            for t, c in zip(ts, close[i].tolist())
+        ]
+        for i, cid in enumerate(coin_ids(n_coins))
+    }
+
+
+def ohlc_records(
+    n_coins: int, years: float, candle_ms: int = CANDLE_MS, seed: int = 0, currency: str = "gbp"
+) -> list[dict]:
+    """
+    Candles as the list of dicts extract_historical_ohlc returns
+    """
+    records = []
+    for cid, rows in ohlc_payloads(n_coins, years, candle_ms, seed).items():
+        name = cid.title()
+        records.extend(
+            {
+                "coin_id": cid,
+                "coin_name": name,
+                "currency": currency,
+                "timestamp_ms": ts,
+                "open": o,
+                "high": h,
+                "low": low,
+                "close": c,
+            }
+            for ts, o, h, low, c in rows
+        )
+    return records
+
+
+def ohlc_batches(
+    n_coins: int, years: float, candle_ms: int = CANDLE_MS, seed: int = 0, currency: str = "gbp"
+) -> list[OhlcBatch]:
+    """
+    Candles as the per-coin OhlcBatches extract_historical_ohlc returns
+    """
+    return [
+        OhlcBatch.from_rows(cid, cid.title(), currency, rows)
+        for cid, rows in ohlc_payloads(n_coins, years, candle_ms, seed).items()
+    ]
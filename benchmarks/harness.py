@@ -0,0 +1,165 @@
+"""
+Minimal benchmark harness: case registry, measurement and baseline checks
+
+A case is a generator function registered with @benchmark. It is called
+with one parameter set, does its setup, yields (run, rows) and cleans up
+afterwards. `run` is timed best-of-N; `rows` is used for throughput
+"""
+
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+BASELINE_FILE = Path(__file__).resolve().parent / "baseline.json"
+
+TIERS = ("quick", "full")
+# Allowed slowdown / memory growth over the baseline before a case fails
+DEFAULT_TOLERANCE = 0.25
+# Differences below these are treated as noise
+MIN_SECONDS_DELTA = 0.005
+MIN_PEAK_MB_DELTA = 1.0
+
+
+@dataclass
+class Case:
+    name: str
+    params: dict
+    setup: Callable
+    tiers: set[str] = field(default_factory=set)
+
+    @property
+    def id(self) -> str:
+        args = ",".join(f"{k}={v}" for k, v in self.params.items())
+        return f"{self.name}[{args}]"
+
+
+CASES: list[Case] = []
+
+
+def benchmark(name: str, params: list[dict], quick: list[dict] | None = None):
+    """
+    Register a case for every parameter set in `params`
+    Parameter sets also listed in `quick` run in the quick tier; every set
+    runs in the full tier
+    """
+
+    def decorator(func):
+        setup = contextmanager(func)
+        for p in params:
+            tiers = {"full"} | ({"quick"} if quick and p in quick else set())
+            CASES.append(Case(name, p, setup, tiers))
+        return func
+
+    return decorator
+
+
+def select_cases(tier: str = "quick", pattern: str | None = None) -> list[Case]:
+    return [
+        c for c in CASES if tier in c.tiers and (pattern is None or pattern in c.id)
+    ]
+
+
+def measure(case: Case, repeats: int = 3) -> dict:
+    """
+    Best-of-`repeats` wall time, throughput and tracemalloc peak of one case
+    - Memory is measured on a separate run so tracing does not skew timings
+    - tracemalloc sees Python and numpy/pandas allocations, not Arrow's
+      own memory pool
+    """
+    with case.setup(**case.params) as (run, rows):
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        try:
+            run()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    best = min(timings)
+    return {
+        "seconds": round(best, 6),
+        "median_seconds": round(statistics.median(timings), 6),
+        "rows": rows,
+        "rows_per_second": round(rows / best) if best > 0 else None,
+        "peak_mb": round(peak / 2**20, 3),
+    }
+
+
+def environment() -> dict:
+    import numpy
+    import pandas
+    import pyarrow
+
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "pandas": pandas.__version__,
+        "numpy": numpy.__version__,
+        "pyarrow": pyarrow.__version__,
+    }
+
+
+def load_baseline(path: Path = BASELINE_FILE) -> dict:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text()).get("results", {})
+
+
+def save_baseline(results: dict, path: Path = BASELINE_FILE) -> None:
+    """
+    Merge `results` into the stored baseline (other cases are kept)
+    """
+    stored = load_baseline(path)
+    stored.update(results)
+    path.write_text(
+        json.dumps(
+            {"environment": environment(), "results": dict(sorted(stored.items()))},
+            indent=2,
+        )
+        + "\n"
+    )
+
+
+def compare(
+    results: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE
+) -> list[str]:
+    """
+    Regressions of `results` against `baseline`, as readable messages
+    - Time: best time more than `tolerance` slower (and by more than
+      MIN_SECONDS_DELTA)
+    - Memory: tracemalloc peak more than `tolerance` larger (and by more
+      than MIN_PEAK_MB_DELTA)
+    """
+    regressions = []
+    for case_id, result in results.items():
+        base = baseline.get(case_id)
+        if base is None:
+            continue
+
+        limit = base["seconds"] * (1 + tolerance)
+        if result["seconds"] > limit and result["seconds"] - base["seconds"] > MIN_SECONDS_DELTA:
+            regressions.append(
+                f"{case_id}: {result['seconds']:.4f}s vs baseline "
+                f"{base['seconds']:.4f}s (+{result['seconds'] / base['seconds'] - 1:.0%})"
+            )
+
+        peak_limit = base["peak_mb"] * (1 + tolerance)
+        if result["peak_mb"] > peak_limit and result["peak_mb"] - base["peak_mb"] > MIN_PEAK_MB_DELTA:
+            regressions.append(
+                f"{case_id}: peak {result['peak_mb']:.1f} MB vs baseline "
+                f"{base['peak_mb']:.1f} MB (+{result['peak_mb'] / base['peak_mb'] - 1:.0%})"
+            )
+
+    return regressions
@@ -0,0 +1,78 @@
+"""
+Reference implementations the optimized transforms replaced
+
+Benchmarks time them against the current code, and parity tests check the
+current code gives the same results
+- legacy_enrich / legacy_build_stats: per-series lambda versions of the
+  historical enrich and stats steps, grouped by the same keys as the
+  current code
+- legacy_flatten_rows: row-by-row flattening of a /simple/price response,
+  in place of transform_current_prices' _flatten_vectorized
+"""
+
+import pandas as pd
+from src.transform.transform_current_prices import NUMERIC_COLUMNS, STANDARD_COLUMNS
+from src.transform.transform_historical_prices import SERIES_KEYS
+
+
+def legacy_enrich(ohlc_df: pd.DataFrame) -> None:
+    """
+    Previous implementation: one Python call per series for every column
+    """
+    ohlc_df["pct_change"] = ohlc_df.groupby(SERIES_KEYS)["close"].pct_change()
+    ohlc_df["rolling_7d"] = ohlc_df.groupby(SERIES_KEYS)["close"].transform(
+        lambda x: x.rolling(7, min_periods=1).mean()
+    )
+    ohlc_df["rolling_30d"] = ohlc_df.groupby(SERIES_KEYS)["close"].transform(
+        lambda x: x.rolling(30, min_periods=1).mean()
+    )
+    ohlc_df["normalized_close"] = ohlc_df.groupby(SERIES_KEYS)["close"].transform(
+        lambda x: x / x.iloc[0] if x.iloc[0] != 0 else x
+    )
+
+
+def legacy_build_stats(ohlc_df: pd.DataFrame) -> pd.DataFrame:
+    return (
+        ohlc_df.groupby(SERIES_KEYS)
+        .agg(
+            coin_name=("coin_name", "first"),
+            max_close=("close", "max"),
+            min_close=("close", "min"),
+            mean_volatility=("pct_change", "mean"),
+            total_return=(
+                "close",
+                lambda x: (x.iloc[-1] - x.iloc[0]) / x.iloc[0],
+            ),
+        )
+        .reset_index()
+    )
+
+
+def legacy_flatten_rows(
+    raw_data: dict, currencies: list[str], coin_lookup: dict, timestamp
+) -> pd.DataFrame:
+    """
+    Previous current-price flattening: one dict per (coin, currency) pair
+    """
+    rows = []
+
+    for coin_id, values in raw_data.items():
+        for currency in currencies:
+            rows.append(
+                {
+                    "timestamp": timestamp,
+                    "coin_id": coin_id,
+                    "coin_name": coin_lookup.get(
+                        coin_id, coin_id.capitalize()
+                    ),
+                    "currency": currency,
+                    "price": values.get(currency),
+                    "market_cap": values.get(f"{currency}_market_cap"),
+                    "volume_24h": values.get(f"{currency}_24h_vol"),
+                    "change_24h": values.get(f"{currency}_24h_change"),
+                }
+            )
+
+    df = pd.DataFrame(rows, columns=STANDARD_COLUMNS)
+    df[NUMERIC_COLUMNS] = df[NUMERIC_COLUMNS].apply(pd.to_numeric, errors="coerce")
+    return df
@@ -0,0 +1,93 @@
+import argparse
+import json
+import logging
+import sys
+from datetime import datetime, timezone
+from src.utils import metrics
+from src.utils.config import LOG_DIR
+from benchmarks import cases  # noqa: F401 - registers the benchmark cases
+from benchmarks.harness import (
+    BASELINE_FILE,
+    DEFAULT_TOLERANCE,
+    TIERS,
+    compare,
+    load_baseline,
+    measure,
+    save_baseline,
+    select_cases,
+)
+
+RESULTS_DIR = LOG_DIR / "benchmarks"
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the ETL stages")
+    parser.add_argument("--tier", choices=TIERS, default="quick", help="case set to run (default quick)")
+    parser.add_argument("-k", dest="pattern", help="only run cases whose id contains this text")
+    parser.add_argument("--repeats", type=int, default=3, help="timed runs per case (best is kept)")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help=f"allowed slowdown/memory growth over the baseline (default {DEFAULT_TOLERANCE})",
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help=f"store these results as the new baseline in {BASELINE_FILE.name}",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None):
+    """
+    Run the benchmark suite, save the results under logs/benchmarks and
+    compare them with benchmarks/baseline.json
+    Exits with status 1 if any case regressed beyond the tolerance
+    """
+    args = parse_args(argv)
+
+    # Keep stage logging and run reports out of the measurements
+    logging.disable(logging.INFO)
+    metrics.METRICS_ENABLED = False
+
+    selected = select_cases(args.tier, args.pattern)
+    baseline = load_baseline()
+
+    print(f"{'case':<60} {'best (s)':>10} {'rows/s':>12} {'peak MB':>9} {'vs base':>8}")
+    results = {}
+    for case in selected:
+        result = measure(case, repeats=args.repeats)
+        results[case.id] = result
+
+        base = baseline.get(case.id)
+        change = f"{result['seconds'] / base['seconds'] - 1:+.0%}" if base else "new"
+        print(
+            f"{case.id:<60} {result['seconds']:>10.4f} "
+            f"{result['rows_per_second'] or 0:>12,} {result['peak_mb']:>9.1f} {change:>8}",
+            flush=True,
+        )
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    output = RESULTS_DIR / f"benchmark-{stamp}.json"
+    output.write_text(json.dumps({"tier": args.tier, "results": results}, indent=2))
+    print(f"\nResults saved to {output}")
+
+    if args.update_baseline:
+        save_baseline(results)
+        print(f"Baseline updated: {BASELINE_FILE}")
+        return
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\nPERFORMANCE REGRESSIONS (tolerance {args.tolerance:.0%}):")
+        for regression in regressions:
+            print(f"  - {regression}")
+        sys.exit(1)
+
+    print("No regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,18 @@
 #!/usr/bin/env python3
-import sys
-import subprocess
+from src.utils.import_timing import timed_imports
 
 
-def main():
-    # Run the ETL module as if using `python -m scripts.run_etl_pipeline`
-    subprocess.run([sys.executable, "-m", "scripts.run_etl_pipeline"] + sys.argv[1:])
+def main(argv: list[str] | None = None):
+    """
+    Run the ETL pipeline in this process
+    - run_etl [current | historical | full] [options]; see --help
+    - Only the pipeline entry point is imported here; each subcommand loads
+      the extract/transform/load modules it needs when it gets to them
+    """
+    with timed_imports("pipeline entry point"):
+        from scripts import run_etl_pipeline
+
+    run_etl_pipeline.main(argv)
 
 
 if __name__ == "__main__":
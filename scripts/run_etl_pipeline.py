@@ -1,43 +1,285 @@
+import argparse
+import sys
+from functools import partial
 from src.utils.logger import get_logger
-from src.utils.timer import timer
+from src.utils.timer import skip, timer
+from src.utils.content_hash import frame_hash, load_hashes, payload_hash, save_hashes
+from src.utils.branches import run_branches
+from src.utils.import_timing import log_import_report, timed_imports
+from src.utils.profiling import PROFILERS, configure_profiling
+from src.utils.config import (
+    COINS,
+    CURRENCIES,
+    DEFAULT_CURRENCY,
+    DEFAULT_DAYS,
+    HISTORICAL_CURRENCIES,
+    HISTORICAL_INCREMENTAL,
+    HISTORICAL_STREAMING,
+    CURRENT_INTERVAL_SECONDS,
+    HISTORICAL_INTERVAL_HOURS,
+    PIPELINE_PARALLEL,
+    SKIP_UNCHANGED,
+)
 
-from src.extraction.extract_current_prices import extract_current_prices
-from src.transform.transform_current_prices import transform_current_prices
-from src.load.load_current_prices import load_current_prices
+# Extract/transform/load modules are imported inside each branch, so a
+# `current` run never loads the historical stages, and nothing imports
+# pandas until the first stage that needs it
 
-from src.extraction.extract_historical_prices import extract_historical_ohlc
-from src.transform.transform_historical_prices import transform_historical_prices
-from src.load.load_historical_prices import load_historical_prices
+logger = get_logger(__name__)
 
-from src.utils.config import COINS, CURRENCIES, DEFAULT_CURRENCY, DEFAULT_DAYS
+COMMANDS = ("current", "historical", "full")
 
 
-logger = get_logger(__name__)
+def _stored_version(dataset: str) -> str:
+    with timed_imports("storage"):
+        from src.load.storage import get_storage_backend
+
+    return get_storage_backend().data_version(dataset)
+
+
+def _unchanged(previous: dict, **hashes) -> bool:
+    """
+    True if every given hash matches the one recorded by the last run
+    """
+    return SKIP_UNCHANGED and all(previous.get(k) == v for k, v in hashes.items())
 
 
 @timer("Current Price ETL")
-def run_current_etl():
+def run_current_etl(replay: str | None = None):
+    """
+    - `replay`: id of an archived current-price snapshot to transform and
+      load instead of calling the API
+    """
     logger.info("===== Running Current Price ETL =====")
 
-    raw_current = extract_current_prices(COINS, CURRENCIES)
+    if replay:
+        with timed_imports("raw archive"):
+            from src.extraction.raw_archive import replay_current
+
+        raw_current = replay_current(replay)
+    else:
+        with timed_imports("current extract"):
+            from src.extraction.extract_current_prices import extract_current_prices
+
+        raw_current = extract_current_prices(COINS, CURRENCIES)
+
+    # Same payload as the last run (e.g. backup fallback) and the stored
+    # snapshot is untouched - nothing to transform or write. The transform
+    # output is not hashed, as it is stamped with the run time
+    previous = load_hashes("current")
+    input_hash = payload_hash(raw_current)
+
+    with timed_imports("current transform/load"):
+        from src.transform.transform_current_prices import transform_current_prices
+        from src.load.load_current_prices import load_current_prices
+
+    if _unchanged(previous, input=input_hash, stored=_stored_version("current")):
+        for stage in (transform_current_prices, load_current_prices):
+            skip(stage, "extracted payload unchanged")
+        logger.info("Current price ETL short-circuited - prices unchanged since the last run")
+        return
 
     df_current = transform_current_prices(raw_current, COINS, CURRENCIES)
 
     output_path = load_current_prices(df_current)
 
+    save_hashes("current", {"input": input_hash, "stored": _stored_version("current")})
+
     logger.info(f"Current price ETL completed - data saved to {output_path}")
 
 
+@timer("Stream Historical Crypto Prices")
+def stream_historical_prices(incremental: bool = HISTORICAL_INCREMENTAL) -> dict | None:
+    """
+    Extract, transform and load historical OHLC one coin at a time
+    - Each coin's candles are transformed on their own (with that coin's
+      stored history when incremental) and appended to a staged dataset,
+      so peak memory is bounded by the largest coin, not the whole dataset
+    - Stored coins that were not refetched are carried over unchanged, and
+      the staged dataset only replaces the stored one once every coin is in
+    - Content-hash skips are not applied: the payload is never held whole
+    - The extracted batches are archived as they stream past
+
+    Returns:
+        dict: {"clean_path", "stats_path"}, or None if nothing was written
+    """
+    with timed_imports("historical streaming stages"):
+        from src.extraction.extract_historical_prices import iter_historical_ohlc
+        from src.extraction.extract_fx_rates import extract_fx_rates
+        from src.transform.transform_historical_prices import (
+            transform_coin_history,
+            latest_timestamps,
+        )
+        from src.load.load_historical_prices import (
+            historical_writers,
+            read_historical_prices,
+        )
+        from src.extraction.raw_archive import ohlc_archive
+
+    since = None
+    stored_coins = set()
+
+    if incremental:
+        # Only the key columns - the history itself is read one coin at a time
+        stored = read_historical_prices(columns=["coin_id", "currency", "timestamp_ms"])
+        if not stored.empty:
+            stored_coins = set(stored["coin_id"].unique())
+            missing = set(HISTORICAL_CURRENCIES) - set(stored["currency"].unique())
+            if missing:
+                logger.info(f"Stored history has no {sorted(missing)} data - fetching the full window")
+            else:
+                since = latest_timestamps(stored, currency=DEFAULT_CURRENCY)
+        del stored
+
+    # Every other currency is derived with the cached FX rate series
+    fx_rates = extract_fx_rates(HISTORICAL_CURRENCIES, DEFAULT_CURRENCY, DEFAULT_DAYS)
+
+    writers = historical_writers()
+    archive = ohlc_archive().writer()
+    fetched = False
+    try:
+        for coin in iter_historical_ohlc(
+            COINS, DEFAULT_CURRENCY, DEFAULT_DAYS, since=since, memory_cache=False
+        ):
+            if not coin.ohlc:
+                # Failed with no fallback covering the window - its stored rows are carried over
+                continue
+
+            archive.add(coin.ohlc, good=coin.source != "failed", days=coin.days)
+            fetched = fetched or coin.source == "fetched"
+
+            existing = None
+            if coin.coin_id in stored_coins:
+                existing = read_historical_prices(coin_ids=[coin.coin_id])
+
+            result = transform_coin_history([coin.ohlc], existing=existing, fx_rates=fx_rates)
+            for writer in writers:
+                writer.write_coin(result["clean"], result["stats"])
+
+        if fetched:
+            archive.close()
+        else:
+            archive.abort()
+
+        if not writers[0].coin_ids:
+            for writer in writers:
+                writer.abort()
+            logger.info("No new historical candles - stored history left as is")
+            return None
+
+        paths = [writer.finish() for writer in writers]
+    except BaseException:
+        archive.abort()
+        for writer in writers:
+            writer.abort()
+        raise
+
+    logger.info(
+        f"Streamed {writers[0].rows} rows for {len(writers[0].coin_ids)} coins → "
+        f"{paths[0]['clean_path']} and {paths[0]['stats_path']}"
+    )
+    return paths[0]
+
+
 @timer("Historical Price ETL")
-def run_historical_etl():
+def run_historical_etl(
+    incremental: bool = HISTORICAL_INCREMENTAL,
+    streaming: bool = HISTORICAL_STREAMING,
+    replay: str | None = None,
+):
+    """
+    - `replay`: id of an archived OHLC snapshot to transform and load, with
+      the FX rates archived alongside it, instead of calling the API
+      (always in batch mode)
+    """
     logger.info("===== Running Historical Price ETL =====")
 
-    raw_historical = extract_historical_ohlc(COINS, DEFAULT_CURRENCY, DEFAULT_DAYS)
+    if streaming and not replay:
+        stream_historical_prices(incremental)
+        return
+
+    with timed_imports("historical stages"):
+        from src.extraction.extract_historical_prices import extract_historical_ohlc
+        from src.extraction.extract_fx_rates import extract_fx_rates
+        from src.transform.transform_historical_prices import (
+            transform_historical_prices,
+            latest_timestamps,
+        )
+        from src.load.load_historical_prices import (
+            load_historical_prices,
+            read_historical_prices,
+        )
+        from src.extraction.raw_archive import replay_historical
+
+    existing = read_historical_prices() if incremental else None
+    since = None
+
+    if existing is not None and not existing.empty:
+        missing = set(HISTORICAL_CURRENCIES) - set(existing["currency"].unique())
+        if missing:
+            # New currencies are derived from the full window of base candles
+            logger.info(f"Stored history has no {sorted(missing)} data - fetching the full window")
+        else:
+            since = latest_timestamps(existing, currency=DEFAULT_CURRENCY)
+
+    if replay:
+        raw_historical, fx_rates = replay_historical(replay, DEFAULT_CURRENCY)
+    else:
+        # Every other currency is derived with the cached FX rate series.
+        # Fetched first, as when streaming, so its archived snapshot is the
+        # one a replay of this run's OHLC snapshot picks up
+        fx_rates = extract_fx_rates(HISTORICAL_CURRENCIES, DEFAULT_CURRENCY, DEFAULT_DAYS)
+
+        # OHLC is fetched once, in the base currency
+        raw_historical = extract_historical_ohlc(
+            COINS, DEFAULT_CURRENCY, DEFAULT_DAYS, since=since
+        )
 
-    transformed = transform_historical_prices(raw_historical)
+        if since and not raw_historical:
+            for stage in (transform_historical_prices, load_historical_prices):
+                skip(stage, "no new candles")
+            logger.info("Historical price ETL skipped - stored history is up to date")
+            return
+
+    if existing is None:
+        # A full rewrite keeps the stored rows of coins that failed with no
+        # fallback covering the full window, instead of dropping them
+        extracted = {batch.coin_id for batch in raw_historical}
+        kept = [coin["id"] for coin in COINS if coin["id"] not in extracted]
+        if kept:
+            existing = read_historical_prices(coin_ids=kept)
+
+    # Transform and load are skipped when their inputs match the last run
+    # and the stored dataset is still the one that run wrote
+    previous = load_hashes("historical")
+    input_hash = payload_hash([[batch.digest() for batch in raw_historical], fx_rates])
+    stored = _stored_version("historical")
+
+    if _unchanged(previous, input=input_hash, stored=stored):
+        for stage in (transform_historical_prices, load_historical_prices):
+            skip(stage, "extracted payload unchanged")
+        logger.info("Historical price ETL short-circuited - candles unchanged since the last run")
+        return
+
+    transformed = transform_historical_prices(
+        raw_historical, existing=existing, fx_rates=fx_rates
+    )
+
+    output_hash = payload_hash([frame_hash(transformed["clean"]), frame_hash(transformed["stats"])])
+
+    if _unchanged(previous, output=output_hash, stored=stored):
+        skip(load_historical_prices, "transformed output unchanged")
+        save_hashes("historical", {"input": input_hash, "output": output_hash, "stored": stored})
+        logger.info("Historical price ETL short-circuited - transformed data unchanged")
+        return
 
     output_paths = load_historical_prices(transformed)
 
+    save_hashes(
+        "historical",
+        {"input": input_hash, "output": output_hash, "stored": _stored_version("historical")},
+    )
+
     logger.info(
         f"Historical price ETL completed - data saved to  "
         f"{output_paths['clean_path']} and {output_paths['stats_path']}"
@@ -45,17 +287,163 @@ def run_historical_etl():
 
 
 @timer("Full ETL Pipeline")
-def run_full_pipeline():
+def run_full_pipeline(
+    parallel: bool = PIPELINE_PARALLEL, streaming: bool = HISTORICAL_STREAMING
+) -> bool:
+    """
+    Run the current and historical ETL branches
+    - They share no data, so by default they run concurrently and the fast
+      current-price load does not wait on the rate-limited OHLC job
+    - A failure in one branch does not stop the other
+    - `streaming` runs the historical branch one coin at a time
+
+    Returns:
+        True if every branch succeeded
+    """
     logger.info("===== STARTING FULL CRYPTO ETL PIPELINE =====")
 
-    run_current_etl()
-    run_historical_etl()
+    results = run_branches(
+        {"current": run_current_etl, "historical": partial(run_historical_etl, streaming=streaming)},
+        parallel=parallel,
+    )
+
+    failed = [r.name for r in results if not r.ok]
+    if failed:
+        logger.error(f"=== FULL ETL PIPELINE FINISHED WITH FAILED BRANCHES: {failed} ===")
+        return False
 
     logger.info("=== FULL ETL PIPELINE FINISHED SUCCESSFULLY ===")
+    return True
+
+
+def run_daemon(
+    current_interval: float = CURRENT_INTERVAL_SECONDS,
+    historical_interval_hours: float = HISTORICAL_INTERVAL_HOURS,
+    command: str = "full",
+    streaming: bool = HISTORICAL_STREAMING,
+):
+    """
+    Keep one warm process and run each ETL on its own timer until SIGTERM
+    - `command` limits the daemon to the current or historical job
+    """
+    from src.utils.scheduler import Scheduler
+
+    scheduler = Scheduler()
+    if command in ("current", "full"):
+        scheduler.add_job("current", run_current_etl, current_interval)
+    if command in ("historical", "full"):
+        scheduler.add_job(
+            "historical",
+            partial(run_historical_etl, streaming=streaming),
+            historical_interval_hours * 3600,
+        )
+    scheduler.run()
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Crypto ETL pipeline")
+    parser.add_argument(
+        "command",
+        nargs="?",
+        choices=COMMANDS,
+        default="full",
+        help="which ETL to run (default full: current and historical)",
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="run continuously, scheduling current and historical ETL independently",
+    )
+    parser.add_argument(
+        "--current-interval",
+        type=float,
+        default=CURRENT_INTERVAL_SECONDS,
+        metavar="SECONDS",
+        help=f"daemon: seconds between current price runs (default {CURRENT_INTERVAL_SECONDS})",
+    )
+    parser.add_argument(
+        "--historical-interval",
+        type=float,
+        default=HISTORICAL_INTERVAL_HOURS,
+        metavar="HOURS",
+        help=f"daemon: hours between historical runs (default {HISTORICAL_INTERVAL_HOURS})",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        default=HISTORICAL_STREAMING,
+        help="historical: extract, transform and load one coin at a time to bound memory",
+    )
+    parser.add_argument(
+        "--replay",
+        metavar="SNAPSHOT_ID",
+        help="transform and load an archived extraction (e.g. historical-20260101T000000000Z, "
+        "see data/raw/archive/*/manifest.json) instead of calling the API",
+    )
+    parser.add_argument(
+        "--sequential",
+        action="store_true",
+        help="run the current and historical branches one after the other",
+    )
+    parser.add_argument(
+        "--profile",
+        action="append",
+        default=[],
+        metavar="STAGE",
+        help="profile a @timer stage by name, e.g. 'Transform Historical Crypto Prices' "
+        "(repeatable, '*' for all; also ETL_PROFILE=a,b)",
+    )
+    parser.add_argument(
+        "--profiler",
+        choices=PROFILERS,
+        default="cprofile",
+        help="profiler used with --profile (default cprofile)",
+    )
+    parser.add_argument(
+        "--import-time",
+        action="store_true",
+        help="log how long each group of lazily imported modules took to load "
+        "(for a per-module breakdown use python -X importtime)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.replay:
+        from src.extraction.raw_archive import snapshot_kind
+
+        try:
+            kind = snapshot_kind(args.replay)
+        except ValueError as e:
+            parser.error(str(e))
+        if kind not in ("current", "historical") or args.daemon:
+            parser.error("--replay takes a current or historical snapshot and no --daemon")
+        if args.command == "full":
+            args.command = kind
+        elif args.command != kind:
+            parser.error(f"--replay {args.replay} is a {kind} snapshot, not {args.command}")
+
+    return args
+
+
+def main(argv: list[str] | None = None):
+    args = parse_args(argv)
 
+    if args.profile:
+        configure_profiling(args.profile, args.profiler)
 
-def main():
-    run_full_pipeline()
+    try:
+        if args.daemon:
+            run_daemon(args.current_interval, args.historical_interval, args.command, args.stream)
+        elif args.command == "current":
+            run_current_etl(replay=args.replay)
+        elif args.command == "historical":
+            run_historical_etl(streaming=args.stream, replay=args.replay)
+        elif not run_full_pipeline(
+            parallel=PIPELINE_PARALLEL and not args.sequential, streaming=args.stream
+        ):
+            sys.exit(1)
+    finally:
+        if args.import_time:
+            log_import_report()
 
 
 if __name__ == "__main__":
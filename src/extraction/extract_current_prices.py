@@ -1,62 +1,103 @@
-import json
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from src.utils.logger import get_logger
 from src.utils.timer import timer
-from src.utils.config import RAW_DIR
+from src.utils.http_client import get_http_client
+from src.utils.json_store import read_json_cached
+from src.extraction.raw_archive import current_archive
+from src.utils.config import (
+    RAW_DIR,
+    CURRENT_PRICE_BATCH_SIZE,
+    CURRENT_PRICE_MAX_WORKERS,
+)
 
 logger = get_logger(__name__)
 
 API_URL = "https://api.coingecko.com/api/v3/simple/price"
+# Single-generation backup written before the raw archive - still read as
+# a last resort for coins the archive has no good snapshot of
 BACKUP_FILE = RAW_DIR / "backup_current_prices.json"
 
 
-@timer("Current Crypto Price Extraction")
-def extract_current_prices(coins: list[dict], currencies: list[str]) -> dict:
+def _load_backup(coin_ids: list[str]) -> dict:
     """
-    Extract crypto prices from CoinGecko
-    If API request fails, fallback to loading backup JSON
+    Each coin's prices from its latest good archived snapshot, falling back
+    to the legacy backup file - coins found in neither are left out
     """
+    backup = current_archive().latest(coin_ids)
 
-    coin_ids = ",".join([coin["id"] for coin in coins])
-    vs_currencies = ",".join(currencies)
+    missing = [cid for cid in coin_ids if cid not in backup]
+    if missing:
+        legacy = read_json_cached(BACKUP_FILE, default={})
+        backup.update({cid: legacy[cid] for cid in missing if cid in legacy})
 
-    logger.info("Preparing API request...")
-    logger.info(f"Coins requested: {coin_ids}")
-    logger.info(f"Currencies requested: {vs_currencies}")
+    return backup
+
+
+def _validate_prices(
+    data: dict, coin_ids: list[str], currencies: list[str]
+) -> dict[str, list[str]]:
+    """
+    Check every requested coin in a single pass over coins x currencies
+    Returns {coin_id: [problems]} for the coins that failed validation
+    """
+    problems = {}
+    for cid in coin_ids:
+        values = data.get(cid)
+        if not isinstance(values, dict):
+            problems[cid] = ["missing coin"]
+            continue
+
+        coin_problems = []
+        for cur in currencies:
+            if cur not in values:
+                coin_problems.append(f"missing currency '{cur}'")
+            elif not isinstance(values[cur], (int, float)):
+                coin_problems.append(f"non-numeric {cur}: {values[cur]!r}")
 
+        if coin_problems:
+            problems[cid] = coin_problems
+
+    return problems
+
+
+def _chunk(items: list, size: int) -> list[list]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _fetch_price_chunk(
+    coin_ids: list[str], currencies: list[str], label: str
+) -> dict | None:
+    """
+    Request and validate prices for one batch of coins
+    - Returns only the coins that passed validation
+    - Returns None if the request or the response as a whole failed
+    """
     params = {
-        "ids": coin_ids,
-        "vs_currencies": vs_currencies,
+        "ids": ",".join(coin_ids),
+        "vs_currencies": ",".join(currencies),
         "include_market_cap": "true",
         "include_24hr_vol": "true",
         "include_24hr_change": "true",
     }
 
-    logger.info("Sending request to CoinGecko API...")
+    logger.debug("Sending request to CoinGecko API (%s, %d coins)...", label, len(coin_ids))
 
     try:
-        response = requests.get(API_URL, params=params, timeout=10)
+        response = get_http_client().get(API_URL, params=params, timeout=10)
         response.raise_for_status()
 
     except requests.exceptions.Timeout:
-        logger.error("API request timed out after 10 seconds")
-        logger.warning("Loading backup file instead...")
-        if BACKUP_FILE.exists():
-            with open(BACKUP_FILE) as f:
-                return json.load(f)
-        return {}
+        logger.error(f"{label}: API request timed out after 10 seconds (retries exhausted)")
+        return None
 
     except requests.exceptions.ConnectionError:
-        logger.error("Connection error — network/API issue")
-        logger.warning("Loading backup file instead...")
-        if BACKUP_FILE.exists():
-            with open(BACKUP_FILE) as f:
-                return json.load(f)
-        return {}
+        logger.error(f"{label}: Connection error — network/API issue")
+        return None
 
     except requests.exceptions.HTTPError as e:
         status = response.status_code
-        logger.error(f"HTTP error {status}: {response.reason} - {e}")
+        logger.error(f"{label}: HTTP error {status}: {response.reason} - {e}")
 
         if status == 429:
             logger.error("Rate limit hit (429)")
@@ -64,79 +105,100 @@ def extract_current_prices(coins: list[dict], currencies: list[str]) -> dict:
             logger.error("Endpoint not found (404)")
         elif 500 <= status < 600:
             logger.error("Server error on CoinGecko (5xx)")
-
-        logger.warning("Loading backup file instead...")
-        if BACKUP_FILE.exists():
-            with open(BACKUP_FILE) as f:
-                return json.load(f)
-        return {}
+        return None
 
     except requests.exceptions.RequestException as e:
-        logger.error(f"Unexpected request exception: {e}")
-        logger.warning("Loading backup file instead...")
-        if BACKUP_FILE.exists():
-            with open(BACKUP_FILE) as f:
-                return json.load(f)
-        return {}
-
-    logger.info("API request successful. Decoding JSON...")
+        logger.error(f"{label}: Unexpected request exception: {e}")
+        return None
 
     try:
         data = response.json()
     except ValueError:
-        logger.error("Failed to decode JSON from API")
-        logger.warning("Loading backup file instead...")
-        if BACKUP_FILE.exists():
-            with open(BACKUP_FILE) as f:
-                return json.load(f)
-        return {}
+        logger.error(f"{label}: Failed to decode JSON from API")
+        return None
 
     # Checks for dict returned and non empty
     if not isinstance(data, dict) or not data:
-        logger.error("API returned invalid or empty data — keeping backup")
-        if BACKUP_FILE.exists():
-            with open(BACKUP_FILE) as f:
-                return json.load(f)
-        return {}
-
-    # Data for every coin is returned
-    for coin in coins:
-        cid = coin["id"]
-        if cid not in data:
-            logger.error(f"Missing coin '{cid}' — backup preserved")
-            if BACKUP_FILE.exists():
-                with open(BACKUP_FILE) as f:
-                    return json.load(f)
-            return {}
-
-    # Every currency is returned for each coin
-    for coin in coins:
-        cid = coin["id"]
-        for cur in currencies:
-            if cur not in data[cid]:
-                logger.error(f"Missing currency '{cur}' for coin '{cid}' — backup")
-                if BACKUP_FILE.exists():
-                    with open(BACKUP_FILE) as f:
-                        return json.load(f)
-                return {}
-
-    # All values are numeric
-    for coin in coins:
-        cid = coin["id"]
-        for cur in currencies:
-            val = data[cid][cur]
-            if not isinstance(val, (int, float)):
-                logger.error(f"Non-numeric value found {cid}/{cur}: {val} — backup")
-                if BACKUP_FILE.exists():
-                    with open(BACKUP_FILE) as f:
-                        return json.load(f)
-                return {}
-
-    # Save backup if valid data is returned from the api
-    with open(BACKUP_FILE, "w") as f:
-        json.dump(data, f, indent=2)
-
-    logger.info(f"Backup saved to {BACKUP_FILE}")
-    logger.info(f"Extraction successful — received data for {len(data)} coins")
+        logger.error(f"{label}: API returned invalid or empty data")
+        return None
+
+    problems = _validate_prices(data, coin_ids, currencies)
+    for cid, coin_problems in problems.items():
+        logger.error(f"{label}: Invalid data for coin '{cid}': {'; '.join(coin_problems)}")
+
+    return {cid: data[cid] for cid in coin_ids if cid not in problems}
+
+
+@timer("Current Crypto Price Extraction")
+def extract_current_prices(
+    coins: list[dict],
+    currencies: list[str],
+    batch_size: int = CURRENT_PRICE_BATCH_SIZE,
+    max_workers: int = CURRENT_PRICE_MAX_WORKERS,
+) -> dict:
+    """
+    Extract crypto prices from CoinGecko
+    - Coins are split into batches of `batch_size` ids per request
+    - Batches are requested concurrently and merged into one dict
+    - Transient failures (429/5xx/timeouts) are retried by the shared client
+    - A batch that still fails, or a coin with invalid data, falls back to
+      its latest good archived prices, for those coins only
+    - Every run that got fresh prices is archived as a snapshot (see
+      raw_archive), so it can be replayed later
+    """
+
+    coin_ids = [coin["id"] for coin in coins]
+    chunks = _chunk(coin_ids, max(1, batch_size))
+
+    logger.info("Preparing API request...")
+    logger.info(f"Coins requested: {len(coin_ids)} in {len(chunks)} batch(es)")
+    logger.info(f"Currencies requested: {','.join(currencies)}")
+
+    client = get_http_client()
+    http_before = client.stats()
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        results = list(
+            pool.map(
+                lambda args: _fetch_price_chunk(
+                    args[1], currencies, f"batch {args[0] + 1}/{len(chunks)}"
+                ),
+                enumerate(chunks),
+            )
+        )
+
+    client.log_stats("Current prices", since=http_before)
+
+    data = {}
+    failed_coins = []
+    for chunk, result in zip(chunks, results):
+        if result is None:
+            failed_coins.extend(chunk)
+        else:
+            data.update(result)
+            failed_coins.extend(cid for cid in chunk if cid not in result)
+
+    fresh = list(data)
+    fresh_coins = len(fresh)
+
+    if failed_coins:
+        logger.warning(
+            f"{len(failed_coins)} coins failed — loading backup for those coins only"
+        )
+        recovered = _load_backup(failed_coins)
+        missing = [cid for cid in failed_coins if cid not in recovered]
+        if missing:
+            logger.error(f"No backup available for coins: {missing}")
+
+        data.update(recovered)
+
+    # Only the fresh coins become the latest good snapshot of their coin
+    if fresh_coins:
+        current_archive().write(data, good=fresh)
+
+    logger.info(
+        f"Extraction complete — {fresh_coins} coins fresh, "
+        f"{len(data) - fresh_coins} from backup"
+    )
 
     return data
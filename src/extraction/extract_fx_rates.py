@@ -0,0 +1,125 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from src.utils.logger import get_logger
+from src.utils.timer import timer
+from src.utils.json_store import read_json_cached, write_json_atomic
+from src.extraction.raw_archive import fx_archive
+from src.extraction.extract_historical_prices import (
+    DAY_MS,
+    fetch_coin_ohlc,
+    incremental_days,
+)
+from src.utils.config import (
+    FX_CACHE_FILE,
+    FX_REFERENCE_COIN,
+    DEFAULT_CURRENCY,
+    DEFAULT_DAYS,
+    HISTORICAL_MAX_WORKERS,
+)
+
+logger = get_logger(__name__)
+
+
+def _read_cache(base: str) -> dict[str, list[list]]:
+    """
+    Cached {currency: [[timestamp_ms, rate], ...]} for `base` - empty if the
+    cache was built for another base currency
+    """
+    cache = read_json_cached(FX_CACHE_FILE, default={})
+    if cache.get("base") != base:
+        return {}
+    return dict(cache.get("rates", {}))
+
+
+def _stale_window(rates: list[list] | None, days: int, now_ms: int) -> int | None:
+    """
+    `days` window to fetch for one currency - None if its rates are current
+    """
+    if not rates:
+        return days
+    return incremental_days(max(ts for ts, _ in rates), days, now_ms)
+
+
+@timer("Extract FX Rates")
+def extract_fx_rates(
+    currencies: list[str],
+    base: str = DEFAULT_CURRENCY,
+    days: int = DEFAULT_DAYS,
+    max_workers: int = HISTORICAL_MAX_WORKERS,
+) -> dict[str, list[list]]:
+    """
+    FX rate series from `base` into each other currency, for deriving
+    historical OHLC without fetching every coin in every currency
+    - Rates come from FX_REFERENCE_COIN's candles: close in the currency
+      divided by close in `base` at the same timestamp
+    - One request per currency (plus one for `base`), whatever the number
+      of coins
+    - Cached in FX_CACHE_FILE; only the window since the newest cached rate
+      is fetched, and nothing at all while the cache is current
+    - A failed fetch keeps that currency's cached rates; if every fetch
+      fails, neither the cache nor the archive is written
+    - Every fetch is archived as a snapshot, so historical replays use the
+      rates of their own run
+
+    Returns:
+        {currency: [[timestamp_ms, rate], ...]} sorted by timestamp, for
+        each currency that has any rates
+    """
+    targets = [c for c in currencies if c != base]
+    if not targets:
+        return {}
+
+    cached = _read_cache(base)
+    now_ms = int(time.time() * 1000)
+
+    # One window covering the stalest currency
+    windows = [w for w in (_stale_window(cached.get(c), days, now_ms) for c in targets) if w is not None]
+    if not windows:
+        logger.info(f"FX rates for {targets} are up to date — using cache")
+        return {c: cached[c] for c in targets}
+
+    window = max(windows)
+    logger.info(f"Fetching {base} FX rates for {targets} via {FX_REFERENCE_COIN['id']}, days={window}")
+
+    wanted = [base] + targets
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        candles = dict(
+            zip(wanted, pool.map(lambda cur: fetch_coin_ohlc(FX_REFERENCE_COIN, cur, window), wanted))
+        )
+
+    base_close = {}
+    if candles[base] is not None:
+        base_close = dict(zip(candles[base].candles["timestamp_ms"].tolist(), candles[base].candles["close"].tolist()))
+    # Rates older than the history window (plus one candle) are dropped
+    oldest_ms = now_ms - (days + 4) * DAY_MS
+
+    rates = {}
+    fetched = []
+    for currency in targets:
+        merged = {int(ts): rate for ts, rate in cached.get(currency, [])}
+
+        if not base_close or candles[currency] is None:
+            logger.error(f"FX fetch failed for {base}->{currency} — keeping {len(merged)} cached rates")
+        else:
+            fetched.append(currency)
+            rows = candles[currency].candles
+            for ts, currency_close in zip(rows["timestamp_ms"].tolist(), rows["close"].tolist()):
+                close = base_close.get(ts)
+                if close:
+                    merged[ts] = currency_close / close
+
+        series = [[ts, rate] for ts, rate in sorted(merged.items()) if ts >= oldest_ms]
+        if series:
+            rates[currency] = series
+        else:
+            logger.error(f"No {base}->{currency} FX rates available — currency not derived")
+
+    if not fetched:
+        # Nothing new - the cache and the latest FX snapshot already hold these
+        return rates
+
+    write_json_atomic(FX_CACHE_FILE, {"base": base, "rates": {**cached, **rates}})
+    logger.info(f"FX rates cached to {FX_CACHE_FILE}")
+    fx_archive().write(rates, good=fetched)
+
+    return rates
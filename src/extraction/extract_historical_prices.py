@@ -1,10 +1,26 @@
 import json
-import requests
+import math
 import time
-import random
+import requests
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
 from src.utils.logger import get_logger
 from src.utils.timer import timer
-from src.utils.config import RAW_DIR, DEFAULT_CURRENCY, DEFAULT_DAYS
+from src.utils.http_client import get_http_client
+from src.utils.json_store import read_json, read_json_cached, write_json_atomic
+from src.utils.ohlc_batch import OhlcBatch, load_batches
+from src.extraction.raw_archive import ohlc_archive
+from src.utils.config import (
+    RAW_DIR,
+    DEFAULT_CURRENCY,
+    DEFAULT_DAYS,
+    HISTORICAL_CACHE_DIR,
+    HISTORICAL_CACHE_TTL_HOURS,
+    HISTORICAL_MAX_WORKERS,
+)
 
 logger = get_logger(__name__)
 
@@ -13,111 +29,394 @@ HISTORICAL_API = (
     "vs_currency={currency}&days={days}"
 )
 
+# Single-generation backup written before the raw archive - still read as
+# a last resort for coins the archive has no good snapshot of
 BACKUP_FILE = RAW_DIR / "backup_historical_prices.json"
+CACHE_DIR = HISTORICAL_CACHE_DIR
 
+# Values accepted by the /ohlc `days` parameter, smallest first
+OHLC_DAY_WINDOWS = (1, 7, 14, 30, 90, 180, 365)
+DAY_MS = 24 * 60 * 60 * 1000
 
-@timer("Extract Historical OHLC Crypto Data")
-def extract_historical_ohlc(
+
+def _candle_interval_ms(days: int) -> int:
+    """
+    Candle size CoinGecko returns for a given `days` window
+    1-2 days: 30 minutes, 3-30 days: 4 hours, 31+ days: 4 days
+    """
+    if days <= 2:
+        return 30 * 60 * 1000
+    if days <= 30:
+        return 4 * 60 * 60 * 1000
+    return 4 * DAY_MS
+
+
+def incremental_days(last_timestamp_ms: int, days: int, now_ms: int) -> int | None:
+    """
+    Smallest `days` window that covers everything after last_timestamp_ms
+
+    Only windows with the same candle size as `days` are considered, so
+    incremental candles line up with the stored ones
+
+    Returns None when no new candle can have closed since the last one
+    """
+    interval = _candle_interval_ms(days)
+    gap_ms = now_ms - last_timestamp_ms
+
+    if gap_ms < interval:
+        return None
+
+    gap_days = math.ceil(gap_ms / DAY_MS)
+
+    for window in OHLC_DAY_WINDOWS:
+        if window >= days:
+            break
+        if window >= gap_days and _candle_interval_ms(window) == interval:
+            return window
+
+    return days
+
+
+def fetch_coin_ohlc(coin: dict, currency: str, days: int) -> OhlcBatch | None:
+    """
+    Fetch and parse OHLC candles for one coin
+    Returns None if the coin failed for any reason
+    - Also used by extract_fx_rates for the FX reference coin
+    """
+    coin_id = coin["id"]
+    coin_name = coin["name"]
+
+    url = HISTORICAL_API.format(coin=coin_id, currency=currency, days=days)
+
+    logger.debug("Fetching OHLC for %s/%s (days=%s)", coin_id, currency, days)
+
+    try:
+        response = get_http_client().get(url, timeout=10)
+        response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Request failed for {coin_id}: {e}")
+        return None
+
+    try:
+        ohlc_data = response.json()
+    except ValueError:
+        logger.error(f"Invalid JSON for {coin_id}/{currency}")
+        return None
+
+    if not isinstance(ohlc_data, list):
+        logger.error(f"Unexpected OHLC format for {coin_id}: {ohlc_data}")
+        return None
+
+    if len(ohlc_data) < 10:
+        logger.warning(
+            f"Insufficient OHLC rows for {coin_id} ({len(ohlc_data)} " f"rows)"
+        )
+        return None
+
+    rows = []
+    for row in ohlc_data:
+        if not isinstance(row, list) or len(row) != 5:
+            logger.warning(f"Bad OHLC row for {coin_id}: {row}")
+            continue
+        rows.append(row)
+
+    return OhlcBatch.from_rows(coin_id, coin_name, currency, rows)
+
+
+def _cache_path(coin_id: str, currency: str) -> Path:
+    return CACHE_DIR / f"{coin_id}_{currency}.json"
+
+
+def _read_coin_cache(coin_id: str, currency: str, memory_cache: bool = True) -> dict | None:
+    """
+    Last good fetch for a coin: {"days", "fetched_at_ms", "batch"}
+    (entries written before OhlcBatch hold "records" instead)
+    - memory_cache=False reads it without keeping it in the shared JSON cache
+    """
+    path = _cache_path(coin_id, currency)
+    return read_json_cached(path) if memory_cache else read_json(path)
+
+
+def _cached_batch(entry: dict) -> OhlcBatch | None:
+    if "batch" in entry:
+        return OhlcBatch.from_json(entry["batch"])
+    batches = OhlcBatch.from_records(entry.get("records", []))
+    return batches[0] if batches else None
+
+
+def _write_coin_cache(
+    coin_id: str, currency: str, days: int, batch: OhlcBatch, memory_cache: bool = True
+) -> None:
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    write_json_atomic(
+        _cache_path(coin_id, currency),
+        {"days": days, "fetched_at_ms": int(time.time() * 1000), "batch": batch.to_json()},
+        prime_cache=memory_cache,
+    )
+
+
+def _mark_failed(coin_id: str, currency: str, entry: dict, memory_cache: bool = True) -> None:
+    """
+    Keep a failed coin's cached rows, but make the next run retry it
+    """
+    write_json_atomic(
+        _cache_path(coin_id, currency),
+        {**entry, "failed_at_ms": int(time.time() * 1000)},
+        prime_cache=memory_cache,
+    )
+
+
+def _is_fresh(entry: dict | None, days: int, fresh_after_ms: int) -> bool:
+    """
+    True if a cache entry covers `days`, was fetched after fresh_after_ms
+    and the coin's latest fetch did not fail
+    """
+    return (
+        bool(entry)
+        and "failed_at_ms" not in entry
+        and entry["fetched_at_ms"] >= fresh_after_ms
+        and entry["days"] >= days
+    )
+
+
+def _read_legacy_backup() -> list[OhlcBatch]:
+    """
+    Every batch in the legacy all-coins backup file (either format)
+    """
+    if not BACKUP_FILE.exists():
+        return []
+    with open(BACKUP_FILE) as f:
+        return load_batches(json.load(f))
+
+
+def _legacy_covers(batch: OhlcBatch, days: int, now_ms: int) -> bool:
+    """
+    True if a legacy backup batch reaches back `days` - the legacy file
+    recorded no window, so it is judged by its first candle (one candle of
+    slack, as /ohlc starts on a candle boundary)
+    """
+    return bool(len(batch)) and int(batch.candles["timestamp_ms"][0]) <= (
+        now_ms - days * DAY_MS + _candle_interval_ms(days)
+    )
+
+
+def _read_backup(coin_ids: list[str], currency: str, days: int = 0) -> list[OhlcBatch]:
+    """
+    Each coin's candles from its latest good archived snapshot, falling back
+    to the legacy backup file - coins found in neither are left out
+    - Only the requested coins' batches are read from the archive
+    - Only batches fetched for a window of at least `days` are used, so an
+      incremental tail never stands in for a full window
+    """
+    found = ohlc_archive().latest(coin_ids, currency, min_days=days)
+
+    if len(found) < len(coin_ids):
+        now_ms = int(time.time() * 1000)
+        for batch in _read_legacy_backup():
+            if batch.coin_id in coin_ids and batch.coin_id not in found and _legacy_covers(batch, days, now_ms):
+                found[batch.coin_id] = batch
+
+    return [found[cid] for cid in coin_ids if cid in found]
+
+
+def _fallback_batch(coin_id: str, currency: str, entry: dict | None, days: int) -> OhlcBatch | None:
+    """
+    A failed coin's last good candles, if they cover the requested `days`
+    - A cached or archived incremental tail is not used for a full window:
+      a full rewrite would then drop the coin's older stored rows, which are
+      kept instead (see run_historical_etl)
+    """
+    if entry and entry["days"] >= days:
+        return _cached_batch(entry)
+    backup = _read_backup([coin_id], currency, days)
+    return backup[0] if backup else None
+
+
+def _coin_windows(coins: list[dict], days: int, since: dict[str, int] | None) -> list[tuple[dict, int]]:
+    """
+    Per-coin request window - full `days` unless the coin is already stored
+    """
+    if not since:
+        return [(coin, days) for coin in coins]
+
+    now_ms = int(time.time() * 1000)
+    windows = []
+    for coin in coins:
+        last_ts = since.get(coin["id"])
+        coin_days = days if last_ts is None else incremental_days(last_ts, days, now_ms)
+        if coin_days is not None:
+            windows.append((coin, coin_days))
+
+    logger.info(
+        f"Incremental mode — {len(windows)}/{len(coins)} coins need new candles "
+        f"(windows: {sorted({d for _, d in windows})})"
+    )
+    return windows
+
+
+@dataclass
+class CoinBatch:
+    """
+    One coin's OHLC candles from iter_historical_ohlc
+    - source: "fetched", "cache" (fresh cached fetch) or "failed" (ohlc is
+      the coin's last good data, None if none covers the requested window)
+    - days: the `days` window the candles were fetched for
+    """
+
+    coin_id: str
+    ohlc: OhlcBatch | None
+    source: str
+    days: int = 0
+
+
+def iter_historical_ohlc(
     coins: list[dict],
     currency: str = DEFAULT_CURRENCY,
     days: int = DEFAULT_DAYS,
-) -> list[dict]:
+    max_workers: int = HISTORICAL_MAX_WORKERS,
+    since: dict[str, int] | None = None,
+    cache_ttl_hours: float = HISTORICAL_CACHE_TTL_HOURS,
+    memory_cache: bool = True,
+) -> Iterator[CoinBatch]:
     """
-    Extract historical OHLC data for a list of coins (single currency)
-    - Rate-limit protected with random sleep
-    - Marks coins as failed if *anything* goes wrong
-    - Only overwrites backup if ALL coins succeed
-    - Falls back to backup if extraction is incomplete
+    Yield each coin's OHLC candles as a CoinBatch, in the order of `coins`
+    - Up to `max_workers` coins are fetched concurrently, and at most
+      2 * max_workers coins' responses are held at once
+    - Coins fetched within `cache_ttl_hours` are served from their cache
+      file; coins with no new candle due (see `since`) are not yielded
+    - memory_cache=False keeps the per-coin cache files out of the shared
+      JSON cache, so a streaming consumer only ever holds a few coins
     """
+    windows = _coin_windows(coins, days, since)
+    if since and not windows:
+        logger.info("All coins are up to date — nothing to fetch")
+        return
 
-    logger.info(f"Extracting OHLC for {len(coins)} coins in {currency}, days={days}")
+    client = get_http_client()
+    http_before = client.stats()
+    fresh_after_ms = int((time.time() - cache_ttl_hours * 3600) * 1000)
+    prefetch = 2 * max(1, max_workers)
+    n_fetched = 0
 
-    all_records = []
-    failed_coins = []
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        jobs = iter(windows)
+        pending = deque()
 
-    try:
-        for coin in coins:
-            coin_id = coin["id"]
-            coin_name = coin["name"]
+        def fill():
+            while len(pending) < prefetch:
+                job = next(jobs, None)
+                if job is None:
+                    return
+                coin, coin_days = job
+                entry = _read_coin_cache(coin["id"], currency, memory_cache)
+                future = None
+                if not _is_fresh(entry, coin_days, fresh_after_ms):
+                    future = pool.submit(fetch_coin_ohlc, coin, currency, coin_days)
+                pending.append((coin["id"], coin_days, entry, future))
 
-            # Random delay to avoid rate limiting
-            time.sleep(random.uniform(8.0, 16.0))
+        fill()
+        while pending:
+            coin_id, coin_days, entry, future = pending.popleft()
 
-            url = HISTORICAL_API.format(coin=coin_id, currency=currency, days=days)
+            if future is None:
+                fill()
+                yield CoinBatch(coin_id, _cached_batch(entry), "cache", entry["days"])
+                continue
 
-            logger.info(f"Fetching OHLC for {coin_id}/{currency}")
+            batch = future.result()
+            n_fetched += 1
+            fill()
 
-            try:
-                response = requests.get(url, timeout=10)
-                response.raise_for_status()
-            except requests.exceptions.RequestException as e:
-                logger.error(f"Request failed for {coin_id}: {e}")
-                failed_coins.append(coin_id)
+            if batch is not None:
+                _write_coin_cache(coin_id, currency, coin_days, batch, memory_cache)
+                yield CoinBatch(coin_id, batch, "fetched", coin_days)
                 continue
 
-            try:
-                ohlc_data = response.json()
-            except ValueError:
-                logger.error(f"Invalid JSON for {coin_id}/{currency}")
-                failed_coins.append(coin_id)
-                continue
+            # Failed - fall back to the coin's last good candles
+            if entry:
+                _mark_failed(coin_id, currency, entry, memory_cache)
+            yield CoinBatch(coin_id, _fallback_batch(coin_id, currency, entry, coin_days), "failed", coin_days)
 
-            if not isinstance(ohlc_data, list):
-                logger.error(f"Unexpected OHLC format for {coin_id}: {ohlc_data}")
-                failed_coins.append(coin_id)
-                continue
+    if n_fetched:
+        client.log_stats("Historical OHLC", since=http_before)
 
-            if len(ohlc_data) < 10:
-                logger.warning(
-                    f"Insufficient OHLC rows for {coin_id} ({len(ohlc_data)} " f"rows)"
-                )
-                failed_coins.append(coin_id)
-                continue
 
-            for row in ohlc_data:
-                if len(row) != 5:
-                    logger.warning(f"Bad OHLC row for {coin_id}: {row}")
-                    continue
-
-                ts_ms, open_, high_, low_, close_ = row
-
-                all_records.append(
-                    {
-                        "coin_id": coin_id,
-                        "coin_name": coin_name,
-                        "currency": currency,
-                        "timestamp_ms": ts_ms,
-                        "open": open_,
-                        "high": high_,
-                        "low": low_,
-                        "close": close_,
-                    }
-                )
+@timer("Extract Historical OHLC Crypto Data")
+def extract_historical_ohlc(
+    coins: list[dict],
+    currency: str = DEFAULT_CURRENCY,
+    days: int = DEFAULT_DAYS,
+    max_workers: int = HISTORICAL_MAX_WORKERS,
+    since: dict[str, int] | None = None,
+    cache_ttl_hours: float = HISTORICAL_CACHE_TTL_HOURS,
+) -> list[OhlcBatch]:
+    """
+    Extract historical OHLC data for a list of coins (single currency)
+    - Returns one OhlcBatch per coin (columnar candles, see ohlc_batch)
+    - Coins are fetched concurrently by up to `max_workers` threads
+    - Requests go through the shared pooled HTTP client, which applies the
+      token-bucket rate limit and retries 429/5xx/timeouts with backoff
+    - Incremental mode: `since` maps coin_id -> newest stored timestamp_ms;
+      those coins only fetch the smallest window covering the gap and are
+      skipped entirely if no new candle is due
+    - Each coin's last good response is cached in HISTORICAL_CACHE_DIR with
+      its fetch time; coins fetched within `cache_ttl_hours` (for at least
+      the requested window) are served from it without a request
+    - A coin that fails falls back to its own cached rows (or its latest
+      good archived batch) if they cover the requested window, and is left
+      out otherwise; the other coins keep their fresh data
+    - Every run that fetched anything is archived as a columnar snapshot
+      (see raw_archive), with the failed coins' fallbacks marked as not good
+    - iter_historical_ohlc yields the same data one coin at a time
+    """
 
-        if failed_coins:
-            logger.error(f"Extraction incomplete — failed coins: {failed_coins}")
+    logger.info(
+        f"Extracting OHLC for {len(coins)} coins in {currency}, days={days} "
+        f"(workers={max_workers})"
+    )
 
-            if BACKUP_FILE.exists():
-                logger.warning("Loading previous backup instead of partial data")
-                with open(BACKUP_FILE) as f:
-                    return json.load(f)
+    try:
+        batches = []
+        sources = Counter()
+        failed_coins = []
+        missing_coins = []
+        windows = {}
+
+        for coin in iter_historical_ohlc(
+            coins, currency, days, max_workers, since, cache_ttl_hours
+        ):
+            sources[coin.source] += 1
+            if coin.source == "failed":
+                failed_coins.append(coin.coin_id)
+                if coin.ohlc is None:
+                    missing_coins.append(coin.coin_id)
+            if coin.ohlc is not None:
+                batches.append(coin.ohlc)
+                windows[coin.coin_id] = coin.days
 
-            logger.error("No backup exists — returning EMPTY LIST (safe fallback)")
+        if not sources:
             return []
 
-        with open(BACKUP_FILE, "w") as f:
-            json.dump(all_records, f, indent=2)
+        logger.info(
+            f"OHLC coins: {sources['fetched']} fetched, "
+            f"{sources['cache']} from cache (< {cache_ttl_hours}h old), "
+            f"{len(failed_coins)} failed"
+        )
+
+        if failed_coins:
+            logger.error(
+                f"Extraction incomplete — failed coins: {failed_coins}; "
+                f"using their last good data where available (none for {missing_coins})"
+            )
+        if sources["fetched"]:
+            ohlc_archive().write(batches, failed=set(failed_coins), days=windows)
 
-        logger.info(f"Backup saved to {BACKUP_FILE}")
-        logger.info(f"Extracted {len(all_records)} total OHLC rows")
-        return all_records
+        logger.info(f"Extracted {sum(len(b) for b in batches)} total OHLC rows")
+        return batches
 
     except Exception as e:
         logger.error(f"Unexpected error: {e}")
 
-        if BACKUP_FILE.exists():
-            logger.warning("Loading backup due to unexpected exception")
-            with open(BACKUP_FILE) as f:
-                return json.load(f)
-
-        return []
+        logger.warning("Loading backup due to unexpected exception")
+        # Incremental runs merge with the stored history, so any window will do
+        return _read_backup([coin["id"] for coin in coins], currency, 0 if since else days)
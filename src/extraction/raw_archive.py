@@ -0,0 +1,398 @@
+import gzip
+import json
+import os
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING
+from src.utils.logger import get_logger
+from src.utils.json_store import read_json_cached, write_json_atomic
+from src.utils.config import (
+    DEFAULT_CURRENCY,
+    RAW_ARCHIVE_COMPRESSION,
+    RAW_ARCHIVE_DIR,
+    RAW_ARCHIVE_KEEP,
+)
+
+if TYPE_CHECKING:
+    from src.utils.ohlc_batch import OhlcBatch
+
+# numpy/pyarrow are only imported by the OHLC archive, so the current-price
+# extract does not load them
+
+logger = get_logger(__name__)
+
+ARCHIVE_DIR = RAW_ARCHIVE_DIR
+MANIFEST_FILE = "manifest.json"
+KINDS = ("current", "historical", "fx")
+
+
+def _snapshot_id(kind: str, created_at_ms: int) -> str:
+    stamp = datetime.fromtimestamp(created_at_ms / 1000, tz=timezone.utc)
+    return f"{kind}-{stamp:%Y%m%dT%H%M%S}{created_at_ms % 1000:03d}Z"
+
+
+def snapshot_kind(snapshot_id: str) -> str:
+    """
+    Kind of a snapshot ("current", "historical" or "fx") from its id
+    """
+    kind = snapshot_id.split("-", 1)[0]
+    if kind not in KINDS:
+        raise ValueError(f"Not a raw snapshot id: {snapshot_id!r}")
+    return kind
+
+
+class RawArchive:
+    """
+    Timestamped, compressed snapshots of one kind of raw extraction output
+    - Each snapshot is one immutable file under ARCHIVE_DIR/<kind>/
+    - manifest.json lists the snapshots, oldest first, and maps each key
+      (a coin, or a currency for FX rates) to the newest snapshot holding
+      good data for it, so "latest good snapshot for X" is a dict lookup
+    - Only the newest `keep` snapshots are kept, plus any older one that is
+      still some key's latest good snapshot
+    - Data files are written before the manifest, so an interrupted write
+      leaves a file the manifest never points to
+    """
+
+    kind: str
+    suffix: str
+
+    def __init__(self, root: Path, keep: int):
+        self.dir = root / self.kind
+        self.keep = max(1, keep)
+        self.manifest_path = self.dir / MANIFEST_FILE
+
+    def manifest(self) -> dict:
+        # Parsed once per change - treat as read-only
+        return read_json_cached(self.manifest_path, default={"snapshots": [], "latest": {}})
+
+    def snapshots(self) -> list[dict]:
+        return list(self.manifest()["snapshots"])
+
+    def entry(self, snapshot_id: str) -> dict:
+        for entry in self.manifest()["snapshots"]:
+            if entry["id"] == snapshot_id:
+                return entry
+        raise KeyError(f"No {self.kind} snapshot {snapshot_id!r} in {self.manifest_path}")
+
+    def path(self, snapshot_id: str) -> Path:
+        return self.dir / self.entry(snapshot_id)["file"]
+
+    def latest_ids(self, keys: list[str]) -> dict[str, list[str]]:
+        """
+        {snapshot_id: [keys]} - the latest good snapshot of each key that has one
+        """
+        latest = self.manifest()["latest"]
+        by_snapshot = {}
+        for key in keys:
+            if key in latest:
+                by_snapshot.setdefault(latest[key], []).append(key)
+        return by_snapshot
+
+    def _new_snapshot(self) -> tuple[str, int, Path]:
+        created_at_ms = int(time.time() * 1000)
+        snapshots = self.manifest()["snapshots"]
+        if snapshots:
+            # Ids stay unique and ordered even for writes in the same millisecond
+            created_at_ms = max(created_at_ms, snapshots[-1]["created_at_ms"] + 1)
+
+        snapshot_id = _snapshot_id(self.kind, created_at_ms)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        return snapshot_id, created_at_ms, self.dir / f"{snapshot_id}{self.suffix}"
+
+    def _commit(
+        self, snapshot_id: str, created_at_ms: int, path: Path, rows: int, good: list[str], **extra
+    ) -> None:
+        """
+        Add a written snapshot to the manifest, then apply retention
+        """
+        manifest = self.manifest()
+        snapshots = manifest["snapshots"] + [
+            {
+                "id": snapshot_id,
+                "file": path.name,
+                "created_at_ms": created_at_ms,
+                "rows": rows,
+                "bytes": path.stat().st_size,
+                **extra,
+            }
+        ]
+        latest = {**manifest["latest"], **dict.fromkeys(good, snapshot_id)}
+
+        referenced = set(latest.values())
+        expired = {
+            entry["id"]
+            for entry in snapshots[: max(0, len(snapshots) - self.keep)]
+            if entry["id"] not in referenced
+        }
+        write_json_atomic(
+            self.manifest_path,
+            {"snapshots": [e for e in snapshots if e["id"] not in expired], "latest": latest},
+        )
+
+        # Only deleted once the manifest no longer points to them
+        for entry in snapshots:
+            if entry["id"] in expired:
+                (self.dir / entry["file"]).unlink(missing_ok=True)
+
+        logger.info(
+            f"Archived {self.kind} snapshot {snapshot_id} ({rows} rows, "
+            f"{path.stat().st_size} bytes)"
+            + (f" - {len(expired)} expired" if expired else "")
+        )
+
+
+@lru_cache(maxsize=8)
+def _read_json_gz(path: str) -> dict:
+    # Snapshot files never change once written, so the parse is cached;
+    # the returned dict is shared - treat it as read-only
+    with gzip.open(path, "rt") as f:
+        return json.load(f)
+
+
+class JsonArchive(RawArchive):
+    """
+    Gzipped JSON snapshots of a {key: value} payload - current prices
+    ({coin_id: prices}) or FX rates ({currency: [[timestamp_ms, rate], ...]})
+    """
+
+    suffix = ".json.gz"
+
+    def __init__(self, kind: str, root: Path, keep: int):
+        self.kind = kind
+        super().__init__(root, keep)
+
+    def write(self, data: dict, good: list[str]) -> str:
+        """
+        Archive one extraction's output - `good` are the keys that were
+        freshly extracted (not fallbacks)
+
+        Returns the snapshot id
+        """
+        snapshot_id, created_at_ms, path = self._new_snapshot()
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        try:
+            with gzip.open(tmp_path, "wt") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+        self._commit(snapshot_id, created_at_ms, path, len(data), good)
+        return snapshot_id
+
+    def read(self, snapshot_id: str) -> dict:
+        return _read_json_gz(str(self.path(snapshot_id)))
+
+    def latest(self, keys: list[str]) -> dict:
+        """
+        Each key's value from its latest good snapshot - keys that were never
+        good are left out. One file read per distinct snapshot
+        """
+        found = {}
+        for snapshot_id, snapshot_keys in self.latest_ids(keys).items():
+            data = self.read(snapshot_id)
+            found.update({k: data[k] for k in snapshot_keys if k in data})
+        return found
+
+    def as_of(self, created_at_ms: int) -> dict | None:
+        """
+        Newest snapshot written at or before `created_at_ms`, if any
+        """
+        earlier = [e for e in self.manifest()["snapshots"] if e["created_at_ms"] <= created_at_ms]
+        return self.read(earlier[-1]["id"]) if earlier else None
+
+
+def _ohlc_key(coin_id: str, currency: str) -> str:
+    return f"{coin_id}/{currency}"
+
+
+class OhlcArchiveWriter:
+    """
+    Writes one OHLC snapshot a coin at a time (see OhlcArchive)
+    """
+
+    def __init__(self, archive: "OhlcArchive"):
+        import pyarrow as pa
+        from src.utils.ohlc_batch import OHLC_DTYPE
+
+        self.archive = archive
+        self.snapshot_id, self.created_at_ms, self.path = archive._new_snapshot()
+        self._tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        self._schema = pa.schema([(name, pa.from_numpy_dtype(OHLC_DTYPE[name])) for name in OHLC_DTYPE.names])
+        self._sink = pa.OSFile(str(self._tmp_path), "wb")
+        self._writer = pa.ipc.new_file(
+            self._sink, self._schema, options=pa.ipc.IpcWriteOptions(compression=RAW_ARCHIVE_COMPRESSION)
+        )
+        self.batches: dict[str, int] = {}
+        self.days: dict[str, int] = {}
+        self._written = 0
+        self.good: list[str] = []
+        self.rows = 0
+
+    def add(self, batch: "OhlcBatch", good: bool = True, days: int = 0) -> None:
+        """
+        Append one coin's candles - good=False for fallback data, `days` is
+        the window they were fetched for
+        """
+        import pyarrow as pa
+
+        key = _ohlc_key(batch.coin_id, batch.currency)
+        self._writer.write_batch(
+            pa.record_batch([batch.candles[name] for name in self._schema.names], schema=self._schema),
+            custom_metadata={"coin_id": batch.coin_id, "coin_name": batch.coin_name, "currency": batch.currency},
+        )
+        self.batches[key] = self._written
+        self.days[key] = days
+        self._written += 1
+        if good:
+            self.good.append(key)
+        self.rows += len(batch)
+
+    def close(self) -> str:
+        """
+        Finish the file and add it to the manifest
+
+        Returns the snapshot id
+        """
+        self._writer.close()
+        self._sink.close()
+        os.replace(self._tmp_path, self.path)
+        self.archive._commit(
+            self.snapshot_id, self.created_at_ms, self.path, self.rows, self.good,
+            batches=self.batches, days=self.days,
+        )
+        return self.snapshot_id
+
+    def abort(self) -> None:
+        try:
+            self._writer.close()
+            self._sink.close()
+        finally:
+            self._tmp_path.unlink(missing_ok=True)
+
+
+class OhlcArchive(RawArchive):
+    """
+    Columnar OHLC snapshots - one Arrow IPC file per extraction with one
+    compressed record batch per coin (its series fields as batch metadata)
+    - The manifest maps each coin to its batch number, so reading one coin
+      memory-maps the file and decompresses that coin's batch only, and to
+      the `days` window its candles were fetched for
+    """
+
+    kind = "historical"
+    suffix = ".arrow"
+
+    def writer(self) -> OhlcArchiveWriter:
+        return OhlcArchiveWriter(self)
+
+    def write(
+        self, batches: list["OhlcBatch"], failed: set[str] = frozenset(), days: dict[str, int] | None = None
+    ) -> str:
+        """
+        Archive one extraction's batches - coins in `failed` hold fallback
+        data, `days` maps coin_id to the window it was fetched for
+
+        Returns the snapshot id
+        """
+        writer = self.writer()
+        try:
+            for batch in batches:
+                writer.add(batch, good=batch.coin_id not in failed, days=(days or {}).get(batch.coin_id, 0))
+        except BaseException:
+            writer.abort()
+            raise
+        return writer.close()
+
+    def _read(self, path: Path, numbers) -> list["OhlcBatch"]:
+        import numpy as np
+        import pyarrow as pa
+        from src.utils.ohlc_batch import OHLC_DTYPE, SERIES_FIELDS, OhlcBatch
+
+        batches = []
+        with pa.memory_map(str(path)) as source:
+            reader = pa.ipc.open_file(source)
+            for number in range(reader.num_record_batches) if numbers is None else numbers:
+                record_batch, metadata = reader.get_batch_with_custom_metadata(number)
+                candles = np.empty(record_batch.num_rows, dtype=OHLC_DTYPE)
+                for name in OHLC_DTYPE.names:
+                    candles[name] = record_batch.column(name).to_numpy()
+                series = [metadata[field.encode()].decode() for field in SERIES_FIELDS]
+                batches.append(OhlcBatch(*series, candles))
+        return batches
+
+    def read(self, snapshot_id: str, coin_ids: list[str] | None = None) -> list["OhlcBatch"]:
+        """
+        A snapshot's batches - every coin, or only `coin_ids`
+        """
+        entry = self.entry(snapshot_id)
+        numbers = None
+        if coin_ids is not None:
+            wanted = set(coin_ids)
+            numbers = sorted(n for key, n in entry["batches"].items() if key.split("/")[0] in wanted)
+        return self._read(self.dir / entry["file"], numbers)
+
+    def latest(
+        self, coin_ids: list[str], currency: str = DEFAULT_CURRENCY, min_days: int = 0
+    ) -> dict[str, "OhlcBatch"]:
+        """
+        {coin_id: batch} from each coin's latest good snapshot in `currency`
+        - coins that were never archived with good data are left out, as are
+          coins whose latest good batch was fetched for fewer than `min_days`
+        """
+        keys = {_ohlc_key(cid, currency): cid for cid in coin_ids}
+        found = {}
+        for snapshot_id, snapshot_keys in self.latest_ids(list(keys)).items():
+            entry = self.entry(snapshot_id)
+            numbers = sorted(
+                entry["batches"][k] for k in snapshot_keys if entry.get("days", {}).get(k, 0) >= min_days
+            )
+            if not numbers:
+                continue
+            for batch in self._read(self.dir / entry["file"], numbers):
+                found[batch.coin_id] = batch
+        return found
+
+
+def current_archive() -> JsonArchive:
+    return JsonArchive("current", ARCHIVE_DIR, RAW_ARCHIVE_KEEP["current"])
+
+
+def fx_archive() -> JsonArchive:
+    return JsonArchive("fx", ARCHIVE_DIR, RAW_ARCHIVE_KEEP["fx"])
+
+
+def ohlc_archive() -> OhlcArchive:
+    return OhlcArchive(ARCHIVE_DIR, RAW_ARCHIVE_KEEP["historical"])
+
+
+def replay_current(snapshot_id: str) -> dict:
+    """
+    An archived current-price extraction, as extract_current_prices returned it
+    """
+    logger.info(f"Replaying current prices from snapshot {snapshot_id}")
+    return current_archive().read(snapshot_id)
+
+
+def replay_historical(snapshot_id: str, base: str = DEFAULT_CURRENCY) -> tuple[list["OhlcBatch"], dict]:
+    """
+    An archived OHLC extraction and the FX rates in use when it ran
+    - FX rates come from the newest FX snapshot written at or before the OHLC
+      snapshot, or from the FX cache file if there is none - never the API
+    """
+    archive = ohlc_archive()
+    batches = archive.read(snapshot_id)
+
+    fx_rates = fx_archive().as_of(archive.entry(snapshot_id)["created_at_ms"])
+    if fx_rates is None:
+        from src.extraction.extract_fx_rates import _read_cache
+
+        logger.warning(f"No FX snapshot as old as {snapshot_id} - using the cached FX rates")
+        fx_rates = _read_cache(base)
+
+    logger.info(f"Replaying {len(batches)} OHLC batches from snapshot {snapshot_id}")
+    return batches, fx_rates
@@ -1,8 +1,9 @@
 import pandas as pd
 import os
 from src.utils.logger import get_logger
-from src.utils.config import CLEANED_DIR
+from src.utils.config import CLEANED_DIR, STORAGE_BACKEND, EXPORT_CSV
 from src.utils.timer import timer
+from src.load.storage import CsvBackend, get_storage_backend
 
 logger = get_logger(__name__)
 
@@ -12,14 +13,15 @@ def load_current_prices(
     df: pd.DataFrame, filename: str = "current_crypto_prices.csv"
 ) -> str:
     """
-    Save the cleaned DataFrame into a CSV file
+    Save the cleaned DataFrame with the configured storage backend
+    Also exports a CSV copy when EXPORT_CSV is set
 
     Args:
         df (pd.DataFrame): cleaned price data
-        filename (str): filename to save in the cleaned directory
+        filename (str): CSV filename to save in the cleaned directory
 
     Returns:
-        str: full file path of the saved CSV
+        str: full path of the primary saved file
     """
 
     logger.info("Starting load step for current price data...")
@@ -28,18 +30,33 @@ def load_current_prices(
         logger.info(f"Directory {CLEANED_DIR} does not exist. Creating it...")
         CLEANED_DIR.mkdir(parents=True, exist_ok=True)
 
-    output_path = CLEANED_DIR / filename
+    backend = get_storage_backend(STORAGE_BACKEND, CLEANED_DIR)
 
-    logger.info(f"Saving DataFrame to: {output_path}")
+    logger.info(f"Saving DataFrame with the {backend.name} backend")
 
     try:
-        df.to_csv(output_path, index=False)
+        output_path = backend.write_current(df, filename)
     except Exception as e:
-        logger.error(f"Failed to save CSV to {output_path}: {e}")
+        logger.error(f"Failed to save current prices ({backend.name}): {e}")
         raise
 
-    file_size_kb = os.path.getsize(output_path) / 1024
-    logger.info(f"Saved {len(df)} rows. File size: {file_size_kb:.2f} KB")
+    if EXPORT_CSV and backend.name != CsvBackend.name:
+        try:
+            export_path = CsvBackend(CLEANED_DIR).write_current(df, filename)
+            logger.info(f"Exported CSV copy to {export_path}")
+        except Exception as e:
+            logger.error(f"Failed to save CSV to {CLEANED_DIR / filename}: {e}")
+            raise
+
+    # An empty or not-newer snapshot is not appended, and on a first run the
+    # snapshot store's directory may not exist yet
+    if os.path.exists(output_path):
+        file_size_kb = os.path.getsize(output_path) / 1024
+        logger.info(
+            f"Saved {len(df)} rows to {output_path}. File size: {file_size_kb:.2f} KB"
+        )
+    else:
+        logger.info(f"Nothing written to {output_path}")
 
     logger.info("Load step completed successfully.")
 
@@ -1,6 +1,8 @@
+import pandas as pd
 from src.utils.logger import get_logger
-from src.utils.config import CLEANED_DIR
+from src.utils.config import CLEANED_DIR, STORAGE_BACKEND, EXPORT_CSV
 from src.utils.timer import timer
+from src.load.storage import CsvBackend, HistoricalWriter, get_storage_backend
 
 logger = get_logger(__name__)
 
@@ -12,15 +14,16 @@ def load_historical_prices(
     stats_filename: str = "historical_crypto_stats.csv",
 ) -> dict:
     """
-    Save the transformed historical OHLC data and stats table into CSV files
+    Save the transformed historical OHLC data and stats table with the
+    configured storage backend, plus CSV copies when EXPORT_CSV is set
 
     Args:
         data (dict): {
             "clean": pd.DataFrame,
             "stats": pd.DataFrame
         }
-        clean_filename (str): output CSV for the cleaned OHLC dataset
-        stats_filename (str): output CSV for the summary stats table
+        clean_filename (str): CSV name for the cleaned OHLC dataset
+        stats_filename (str): CSV name for the summary stats table
 
     Returns:
         dict: {
@@ -43,30 +46,76 @@ def load_historical_prices(
         logger.info(f"Directory {CLEANED_DIR} does not exist. Creating it...")
         CLEANED_DIR.mkdir(parents=True, exist_ok=True)
 
-    clean_path = CLEANED_DIR / clean_filename
-    stats_path = CLEANED_DIR / stats_filename
+    backend = get_storage_backend(STORAGE_BACKEND, CLEANED_DIR)
 
-    # Convert cleaned OHLC dataframe to csv
     try:
-        clean_df.to_csv(clean_path, index=False)
+        paths = backend.write_historical(
+            clean_df, stats_df, clean_filename, stats_filename
+        )
         logger.info(
-            f"Saved CLEAN OHLC data → {clean_path} ({len(clean_df)} rows)"
+            f"Saved CLEAN OHLC data → {paths['clean_path']} ({len(clean_df)} rows)"
         )
+        logger.info(f"Saved STATS table → {paths['stats_path']} ({len(stats_df)} rows)")
     except Exception as e:
-        logger.error(f"Failed to write cleaned OHLC CSV: {e}")
+        logger.error(f"Failed to write historical data ({backend.name}): {e}")
         raise
 
-    # Convert stats dataframe to csv
-    try:
-        stats_df.to_csv(stats_path, index=False)
-        logger.info(f"Saved STATS table → {stats_path} ({len(stats_df)} rows)")
-    except Exception as e:
-        logger.error(f"Failed to write stats CSV: {e}")
-        raise
+    if EXPORT_CSV and backend.name != CsvBackend.name:
+        try:
+            exported = CsvBackend(CLEANED_DIR).write_historical(
+                clean_df, stats_df, clean_filename, stats_filename
+            )
+            logger.info(
+                f"Exported CSV copies → {exported['clean_path']}, "
+                f"{exported['stats_path']}"
+            )
+        except Exception as e:
+            logger.error(f"Failed to write CSV export: {e}")
+            raise
 
     logger.info("Historical price load step completed successfully.")
 
-    return {
-        "clean_path": str(clean_path),
-        "stats_path": str(stats_path),
-    }
+    return paths
+
+
+def historical_writers(
+    clean_filename: str = "historical_crypto_prices.csv",
+    stats_filename: str = "historical_crypto_stats.csv",
+) -> list[HistoricalWriter]:
+    """
+    Per-coin writers for a streaming load: the configured backend first,
+    plus a CSV export writer when EXPORT_CSV is set
+    - Call write_coin() per coin, then finish() on each (abort() on error)
+    """
+
+    if not CLEANED_DIR.exists():
+        logger.info(f"Directory {CLEANED_DIR} does not exist. Creating it...")
+        CLEANED_DIR.mkdir(parents=True, exist_ok=True)
+
+    backend = get_storage_backend(STORAGE_BACKEND, CLEANED_DIR)
+    writers = [backend.historical_writer(clean_filename, stats_filename)]
+
+    if EXPORT_CSV and backend.name != CsvBackend.name:
+        writers.append(CsvBackend(CLEANED_DIR).historical_writer(clean_filename, stats_filename))
+
+    return writers
+
+
+def read_historical_prices(
+    coin_ids: list[str] | None = None,
+    columns: list[str] | None = None,
+) -> pd.DataFrame:
+    """
+    Read the stored cleaned OHLC history back (used by incremental runs)
+    - `columns` reads only those columns (e.g. to find the newest candles)
+
+    Returns:
+        pd.DataFrame: stored history, or an empty DataFrame if none exists
+    """
+
+    backend = get_storage_backend(STORAGE_BACKEND, CLEANED_DIR)
+    df = backend.read_historical(coin_ids=coin_ids, columns=columns)
+
+    logger.info(f"Read {len(df)} stored OHLC rows ({backend.name} backend)")
+
+    return df
@@ -0,0 +1,247 @@
+import io
+import os
+from dataclasses import dataclass
+from pathlib import Path
+import pandas as pd
+import pyarrow as pa
+from src.utils.logger import get_logger
+from src.utils.config import SNAPSHOT_SEGMENT_MAX_BYTES
+
+logger = get_logger(__name__)
+
+INDEX_FILE = "index.csv"
+INDEX_HEADER = "timestamp,segment,offset,length,rows\n"
+# Enough trailing bytes of the index to always contain its last line
+INDEX_TAIL_BYTES = 4096
+# Every snapshot is stored with this schema, whatever pandas would infer
+# from its values (e.g. an all-null column), so snapshots always concatenate
+CURRENT_PRICE_SCHEMA = pa.schema(
+    [
+        ("timestamp", pa.timestamp("ns", tz="UTC")),
+        ("coin_id", pa.string()),
+        ("coin_name", pa.string()),
+        ("currency", pa.string()),
+        ("price", pa.float64()),
+        ("market_cap", pa.float64()),
+        ("volume_24h", pa.float64()),
+        ("change_24h", pa.float64()),
+    ]
+)
+
+
+@dataclass
+class IndexEntry:
+    timestamp: pd.Timestamp
+    segment: str
+    offset: int
+    length: int
+    rows: int
+
+
+def _parse_entry(line: str) -> IndexEntry:
+    timestamp, segment, offset, length, rows = line.strip().split(",")
+    return IndexEntry(pd.Timestamp(timestamp), segment, int(offset), int(length), int(rows))
+
+
+class SnapshotStore:
+    """
+    Append-only time series of current-price snapshots
+    - Each snapshot is one Arrow IPC stream appended to a rolling segment
+      file (segment-00001.arrows, ...); a new segment starts once the
+      active one passes `segment_max_bytes`
+    - index.csv gets one line per snapshot: timestamp, segment, byte offset,
+      length and row count
+    - Appends only touch the end of the active segment and of the index, so
+      write time does not grow with the size of the store
+    - Index lines are fsynced as they are written; a final line with no
+      newline (an interrupted append) is ignored by readers and cut off by
+      the next append
+    - latest() reads the last index line and exactly one snapshot
+    - Snapshots are cast to `schema`; missing columns are stored as nulls
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        segment_max_bytes: int = SNAPSHOT_SEGMENT_MAX_BYTES,
+        schema: pa.Schema = CURRENT_PRICE_SCHEMA,
+    ):
+        self.root = root
+        self.segment_max_bytes = segment_max_bytes
+        self.schema = schema
+        self.index_path = root / INDEX_FILE
+
+    def _segment_name(self, number: int) -> str:
+        return f"segment-{number:05d}.arrows"
+
+    def last_entry(self) -> IndexEntry | None:
+        """
+        Newest index entry, read from the tail of the index file
+        """
+        if not self.index_path.exists():
+            return None
+
+        with open(self.index_path, "rb") as f:
+            f.seek(0, io.SEEK_END)
+            size = f.tell()
+            f.seek(max(0, size - INDEX_TAIL_BYTES))
+            tail = f.read().decode()
+
+        # Drop a partial last line left by an interrupted append
+        tail = tail[: tail.rfind("\n") + 1]
+        lines = [line for line in tail.splitlines() if line.strip()]
+        if not lines or lines[-1] == INDEX_HEADER.strip():
+            return None
+        return _parse_entry(lines[-1])
+
+    def entries(self) -> list[IndexEntry]:
+        if not self.index_path.exists():
+            return []
+        with open(self.index_path) as f:
+            next(f, None)  # header
+            return [_parse_entry(line) for line in f if line.strip() and line.endswith("\n")]
+
+    def _truncate_partial_index_line(self) -> None:
+        """
+        Cut off a last index line with no newline, so the next line does not
+        get appended onto it
+        """
+        with open(self.index_path, "rb+") as f:
+            size = f.seek(0, io.SEEK_END)
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+
+            start = max(0, size - INDEX_TAIL_BYTES)
+            f.seek(start)
+            end = start + f.read().rfind(b"\n") + 1
+            logger.warning(f"Dropping a partial last line from {self.index_path}")
+            f.truncate(end)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def append(self, df: pd.DataFrame) -> Path | None:
+        """
+        Append one snapshot, keyed by its (single) timestamp
+
+        Returns the segment path written, or None if a snapshot with the
+        same or a newer timestamp is already stored
+        """
+        if df.empty:
+            logger.warning("Empty snapshot - nothing appended")
+            return None
+
+        timestamp = pd.Timestamp(df["timestamp"].max())
+        last = self.last_entry()
+
+        if last is not None and timestamp <= last.timestamp:
+            logger.warning(
+                f"Snapshot {timestamp} is not newer than stored {last.timestamp} "
+                f"- skipped"
+            )
+            return None
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        if not self.index_path.exists():
+            self.index_path.write_text(INDEX_HEADER)
+        else:
+            self._truncate_partial_index_line()
+
+        if last is None:
+            segment = self.root / self._segment_name(1)
+        else:
+            segment = self.root / last.segment
+            if segment.exists() and segment.stat().st_size >= self.segment_max_bytes:
+                number = int(last.segment.split("-")[1].split(".")[0]) + 1
+                segment = self.root / self._segment_name(number)
+
+        extra = [c for c in df.columns if c not in self.schema.names]
+        if extra:
+            logger.warning(f"Columns {extra} are not in the snapshot schema - not stored")
+        table = pa.Table.from_pandas(
+            df.reindex(columns=self.schema.names), schema=self.schema, preserve_index=False
+        )
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        payload = sink.getvalue().to_pybytes()
+
+        # Data first, index second: an interrupted append leaves unindexed
+        # bytes that readers never look at, or a partial index line
+        with open(segment, "ab") as f:
+            offset = f.tell()
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+
+        with open(self.index_path, "a") as f:
+            f.write(
+                f"{timestamp.isoformat()},{segment.name},{offset},"
+                f"{len(payload)},{len(df)}\n"
+            )
+            f.flush()
+            os.fsync(f.fileno())
+
+        return segment
+
+    def _read_snapshot(self, data: bytes | memoryview) -> pa.Table:
+        table = pa.ipc.open_stream(pa.py_buffer(data)).read_all()
+        if table.schema.equals(self.schema):
+            return table
+
+        # Written before snapshots had a fixed schema
+        columns = [
+            table.column(field.name).cast(field.type)
+            if field.name in table.schema.names
+            else pa.nulls(len(table), field.type)
+            for field in self.schema
+        ]
+        return pa.Table.from_arrays(columns, schema=self.schema)
+
+    def latest(self) -> pd.DataFrame:
+        """
+        Most recent snapshot only
+        """
+        entry = self.last_entry()
+        if entry is None:
+            return pd.DataFrame()
+
+        with open(self.root / entry.segment, "rb") as f:
+            f.seek(entry.offset)
+            data = f.read(entry.length)
+
+        return self._read_snapshot(data).to_pandas()
+
+    def history(
+        self,
+        start: pd.Timestamp | None = None,
+        end: pd.Timestamp | None = None,
+    ) -> pd.DataFrame:
+        """
+        All snapshots with start <= timestamp <= end, oldest first
+        Only the segments holding matching snapshots are opened
+        """
+        selected = [
+            e
+            for e in self.entries()
+            if (start is None or e.timestamp >= pd.Timestamp(start))
+            and (end is None or e.timestamp <= pd.Timestamp(end))
+        ]
+        if not selected:
+            return pd.DataFrame()
+
+        tables = []
+        by_segment = {}
+        for entry in selected:
+            by_segment.setdefault(entry.segment, []).append(entry)
+
+        for segment, segment_entries in by_segment.items():
+            data = memoryview((self.root / segment).read_bytes())
+            for entry in segment_entries:
+                tables.append(
+                    self._read_snapshot(data[entry.offset:entry.offset + entry.length])
+                )
+
+        return pa.concat_tables(tables).to_pandas().reset_index(drop=True)
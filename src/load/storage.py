@@ -0,0 +1,577 @@
+import shutil
+from abc import ABC, abstractmethod
+from pathlib import Path
+from urllib.parse import unquote
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from src.utils.logger import get_logger
+from src.load.snapshot_store import SnapshotStore
+from src.utils.config import CLEANED_DIR, STORAGE_BACKEND, PARQUET_COMPRESSION
+
+logger = get_logger(__name__)
+
+CURRENT_CSV = "current_crypto_prices.csv"
+HISTORICAL_CSV = "historical_crypto_prices.csv"
+STATS_CSV = "historical_crypto_stats.csv"
+
+# Typed columns for the columnar store - anything else is inferred
+COLUMN_TYPES = {
+    "coin_id": pa.string(),
+    "coin_name": pa.string(),
+    "currency": pa.string(),
+    "timestamp_ms": pa.int64(),
+    "open": pa.float64(),
+    "high": pa.float64(),
+    "low": pa.float64(),
+    "close": pa.float64(),
+    "pct_change": pa.float64(),
+    "rolling_7d": pa.float64(),
+    "rolling_30d": pa.float64(),
+    "normalized_close": pa.float64(),
+    "price": pa.float64(),
+    "market_cap": pa.float64(),
+    "volume_24h": pa.float64(),
+    "change_24h": pa.float64(),
+    "max_close": pa.float64(),
+    "min_close": pa.float64(),
+    "mean_volatility": pa.float64(),
+    "total_return": pa.float64(),
+}
+
+# Hive-style partitions of the historical dataset: one coin_id=... directory
+# (and file) per coin. Finer partitions (e.g. per month) leave a handful of
+# 4-day candles per file, and opening thousands of tiny files dominates reads
+PARTITIONING = ds.partitioning(pa.schema([("coin_id", pa.string())]), flavor="hive")
+# Row-group size within a coin's file - the timestamp filter is pushed down
+# to row-group statistics
+HISTORICAL_ROW_GROUP_ROWS = 64 * 1024
+
+
+def _fingerprint(paths: list[Path]) -> str:
+    """
+    Cheap change token for a set of files/directories: inode, mtime and size
+    of each (a directory swapped in by rename gets a new inode)
+    """
+    parts = []
+    for path in paths:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            parts.append(f"{path.name}:-")
+            continue
+        parts.append(f"{path.name}:{stat.st_ino}:{stat.st_mtime_ns}:{stat.st_size}")
+    return "|".join(parts)
+
+
+def _filter_history(
+    df: pd.DataFrame,
+    coin_ids: list[str] | None,
+    start: pd.Timestamp | None,
+    end: pd.Timestamp | None,
+) -> pd.DataFrame:
+    if coin_ids is not None:
+        df = df[df["coin_id"].isin(coin_ids)]
+    if start is not None:
+        df = df[df["timestamp"] >= pd.Timestamp(start)]
+    if end is not None:
+        df = df[df["timestamp"] <= pd.Timestamp(end)]
+    return df.reset_index(drop=True)
+
+
+class StorageBackend(ABC):
+    """
+    Where the load step persists cleaned datasets and dashboards read them
+    - write_* methods return the path(s) written
+    - historical_writer() writes the historical dataset one coin at a time
+    - read_historical accepts coin, date-range and column filters
+    """
+
+    name = "base"
+
+    def __init__(self, root: Path = CLEANED_DIR):
+        self.root = root
+
+    @abstractmethod
+    def write_current(self, df: pd.DataFrame, filename: str = CURRENT_CSV) -> str:
+        """
+        Store one current-price snapshot
+        """
+
+    @abstractmethod
+    def write_historical(
+        self,
+        clean_df: pd.DataFrame,
+        stats_df: pd.DataFrame,
+        clean_filename: str = HISTORICAL_CSV,
+        stats_filename: str = STATS_CSV,
+    ) -> dict:
+        """
+        Replace the historical dataset and its stats
+        """
+
+    @abstractmethod
+    def historical_writer(
+        self,
+        clean_filename: str = HISTORICAL_CSV,
+        stats_filename: str = STATS_CSV,
+    ) -> "HistoricalWriter":
+        """
+        Writer that replaces the historical dataset one coin at a time
+        """
+
+    @abstractmethod
+    def read_current(self) -> pd.DataFrame:
+        """
+        Latest current-price snapshot
+        """
+
+    @abstractmethod
+    def read_current_history(
+        self,
+        start: pd.Timestamp | None = None,
+        end: pd.Timestamp | None = None,
+    ) -> pd.DataFrame:
+        """
+        Every stored current-price snapshot between start and end
+        """
+
+    @abstractmethod
+    def read_historical(
+        self,
+        coin_ids: list[str] | None = None,
+        start: pd.Timestamp | None = None,
+        end: pd.Timestamp | None = None,
+        columns: list[str] | None = None,
+    ) -> pd.DataFrame:
+        """
+        Historical OHLC, filtered by coin, date range and columns
+        """
+
+    @abstractmethod
+    def read_stats(self) -> pd.DataFrame:
+        """
+        Per-coin stats table
+        """
+
+    @abstractmethod
+    def _dataset_paths(self, dataset: str) -> list[Path]:
+        """
+        Files/directories whose changes change data_version(dataset)
+        """
+
+    def data_version(self, dataset: str) -> str:
+        """
+        Token that changes whenever `dataset` ("current", "historical" or
+        "stats") is rewritten - used to invalidate reader caches
+        """
+        return _fingerprint(self._dataset_paths(dataset))
+
+
+class HistoricalWriter(ABC):
+    """
+    Writes the historical dataset one coin at a time (streaming load)
+    - write_coin() appends one coin's rows to a staged copy of the dataset
+      and keeps its (few) stats rows
+    - finish() copies over stored coins that were not written, with their
+      stored stats rows, and swaps the new dataset in
+    - abort() drops the staged copy and leaves the stored data untouched
+    """
+
+    def __init__(self, backend: StorageBackend):
+        self.backend = backend
+        self.coin_ids: set[str] = set()
+        self.stats: list[pd.DataFrame] = []
+        self.rows = 0
+
+    def write_coin(self, clean_df: pd.DataFrame, stats_df: pd.DataFrame) -> None:
+        if clean_df.empty:
+            return
+        self._append(clean_df)
+        self.coin_ids.update(clean_df["coin_id"].unique())
+        self.stats.append(stats_df)
+        self.rows += len(clean_df)
+
+    def finish(self) -> dict:
+        self._carry_over()
+
+        stats = list(self.stats)
+        stored_stats = self.backend.read_stats()
+        if not stored_stats.empty:
+            stats.append(stored_stats[~stored_stats["coin_id"].isin(self.coin_ids)])
+        stats_df = pd.concat(stats, ignore_index=True) if stats else pd.DataFrame()
+
+        # Same order as a full transform's stats table
+        keys = [c for c in ("coin_id", "currency") if c in stats_df.columns]
+        if keys:
+            stats_df = stats_df.sort_values(keys).reset_index(drop=True)
+
+        return self._swap_in(stats_df)
+
+    @abstractmethod
+    def abort(self) -> None:
+        """
+        Drop the staged copy
+        """
+
+    @abstractmethod
+    def _append(self, df: pd.DataFrame) -> None:
+        """
+        Add rows to the staged copy
+        """
+
+    @abstractmethod
+    def _carry_over(self) -> None:
+        """
+        Copy stored coins that were not written into the staged copy
+        """
+
+    @abstractmethod
+    def _swap_in(self, stats_df: pd.DataFrame) -> dict:
+        """
+        Replace the stored dataset with the staged copy and write stats
+        """
+
+
+class CsvHistoricalWriter(HistoricalWriter):
+    """
+    Appends each coin to a temp CSV that replaces the stored file on finish
+    """
+
+    # Rows per chunk when copying stored coins from the old file
+    CHUNK_ROWS = 100_000
+
+    def __init__(self, backend: "CsvBackend", clean_filename: str, stats_filename: str):
+        super().__init__(backend)
+        self.clean_path = backend.root / clean_filename
+        self.stats_path = backend.root / stats_filename
+        self.tmp_path = self.clean_path.with_name(self.clean_path.name + ".tmp")
+        self.columns: list[str] | None = None
+        self.tmp_path.unlink(missing_ok=True)
+
+    def _append(self, df: pd.DataFrame) -> None:
+        header = self.columns is None
+        if header:
+            self.columns = list(df.columns)
+        df.reindex(columns=self.columns).to_csv(self.tmp_path, mode="a", header=header, index=False)
+
+    def _carry_over(self) -> None:
+        if not self.clean_path.exists():
+            return
+        for chunk in pd.read_csv(self.clean_path, chunksize=self.CHUNK_ROWS):
+            kept = chunk[~chunk["coin_id"].isin(self.coin_ids)]
+            if not kept.empty:
+                self._append(kept)
+
+    def _swap_in(self, stats_df: pd.DataFrame) -> dict:
+        if self.columns is None:
+            # Nothing written or stored - still leave an (empty) file behind
+            pd.DataFrame().to_csv(self.tmp_path, index=False)
+        self.tmp_path.replace(self.clean_path)
+        stats_df.to_csv(self.stats_path, index=False)
+        return {"clean_path": str(self.clean_path), "stats_path": str(self.stats_path)}
+
+    def abort(self) -> None:
+        self.tmp_path.unlink(missing_ok=True)
+
+
+class ParquetHistoricalWriter(HistoricalWriter):
+    """
+    Writes each coin's partitions into a staging dataset that replaces the
+    stored one on finish; stored coins that were not written keep their
+    partition directories
+    """
+
+    def __init__(self, backend: "ParquetBackend"):
+        super().__init__(backend)
+        self.staging_dir = backend.historical_dir.with_name(backend.historical_dir.name + ".tmp")
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
+
+    def _append(self, df: pd.DataFrame) -> None:
+        # Each coin has its own coin_id=... partitions, so nothing is overwritten
+        self.backend._write_partitions(df, self.staging_dir)
+
+    def _carry_over(self) -> None:
+        self.staging_dir.mkdir(parents=True, exist_ok=True)
+        if not self.backend.historical_dir.exists():
+            return
+        for coin_dir in self.backend.historical_dir.glob("coin_id=*"):
+            if unquote(coin_dir.name.split("=", 1)[1]) not in self.coin_ids:
+                shutil.copytree(coin_dir, self.staging_dir / coin_dir.name)
+
+    def _swap_in(self, stats_df: pd.DataFrame) -> dict:
+        return self.backend._swap_in_historical(self.staging_dir, stats_df)
+
+    def abort(self) -> None:
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
+
+
+class CsvBackend(StorageBackend):
+    """
+    Plain CSV files in the cleaned directory
+    Used as the optional export format alongside a columnar backend
+    """
+
+    name = "csv"
+
+    def write_current(self, df: pd.DataFrame, filename: str = CURRENT_CSV) -> str:
+        output_path = self.root / filename
+        df.to_csv(output_path, index=False)
+        return str(output_path)
+
+    def write_historical(
+        self,
+        clean_df: pd.DataFrame,
+        stats_df: pd.DataFrame,
+        clean_filename: str = HISTORICAL_CSV,
+        stats_filename: str = STATS_CSV,
+    ) -> dict:
+        clean_path = self.root / clean_filename
+        stats_path = self.root / stats_filename
+
+        clean_df.to_csv(clean_path, index=False)
+        stats_df.to_csv(stats_path, index=False)
+
+        return {"clean_path": str(clean_path), "stats_path": str(stats_path)}
+
+    def historical_writer(
+        self,
+        clean_filename: str = HISTORICAL_CSV,
+        stats_filename: str = STATS_CSV,
+    ) -> HistoricalWriter:
+        return CsvHistoricalWriter(self, clean_filename, stats_filename)
+
+    def read_current(self) -> pd.DataFrame:
+        path = self.root / CURRENT_CSV
+        if not path.exists():
+            return pd.DataFrame()
+        df = pd.read_csv(path)
+        df["timestamp"] = pd.to_datetime(df["timestamp"])
+        return df
+
+    def read_current_history(self, start=None, end=None) -> pd.DataFrame:
+        # The CSV file only ever holds the latest snapshot
+        df = self.read_current()
+        if df.empty:
+            return df
+        return _filter_history(df, None, start, end)
+
+    def read_historical(self, coin_ids=None, start=None, end=None, columns=None) -> pd.DataFrame:
+        path = self.root / HISTORICAL_CSV
+        if not path.exists():
+            return pd.DataFrame()
+        usecols = None
+        if columns is not None:
+            # Plus whatever the filters need
+            wanted = set(columns) | {"coin_id", "timestamp"}
+            usecols = wanted.__contains__
+        df = pd.read_csv(path, usecols=usecols)
+        if "timestamp" in df.columns:
+            df["timestamp"] = pd.to_datetime(df["timestamp"])
+        df = _filter_history(df, coin_ids, start, end)
+        return df if columns is None else df[[c for c in columns if c in df.columns]]
+
+    def read_stats(self) -> pd.DataFrame:
+        path = self.root / STATS_CSV
+        if not path.exists():
+            return pd.DataFrame()
+        return pd.read_csv(path)
+
+    def _dataset_paths(self, dataset: str) -> list[Path]:
+        files = {"current": CURRENT_CSV, "historical": HISTORICAL_CSV, "stats": STATS_CSV}
+        return [self.root / files[dataset]]
+
+
+class ParquetBackend(StorageBackend):
+    """
+    Typed, compressed Parquet files under <root>/parquet
+    - Historical OHLC is a dataset partitioned by coin_id, so readers only
+      open the files of the coins they ask for; date filters use row-group
+      statistics
+    - Current prices are appended to a snapshot store (typed Arrow
+      segments), so every run's snapshot is kept and the latest is cheap
+    - Stats are a single Parquet file
+    - Reads fall back to the CSV export when no Parquet data exists yet
+    """
+
+    name = "parquet"
+
+    def __init__(self, root: Path = CLEANED_DIR, compression: str = PARQUET_COMPRESSION):
+        super().__init__(root)
+        self.compression = compression
+        self.base_dir = root / "parquet"
+        self.snapshots = SnapshotStore(self.base_dir / "current_snapshots")
+        self.historical_dir = self.base_dir / "historical_crypto_prices"
+        self.stats_path = self.base_dir / "historical_crypto_stats.parquet"
+
+    @staticmethod
+    def _to_table(df: pd.DataFrame) -> pa.Table:
+        fields = []
+        for field in pa.Schema.from_pandas(df, preserve_index=False):
+            if pa.types.is_timestamp(field.type):
+                # Store timestamps at microsecond precision, keeping any timezone
+                fields.append(pa.field(field.name, pa.timestamp("us", tz=field.type.tz)))
+            else:
+                fields.append(pa.field(field.name, COLUMN_TYPES.get(field.name, field.type)))
+        return pa.Table.from_pandas(df, schema=pa.schema(fields), preserve_index=False)
+
+    def _write_file(self, df: pd.DataFrame, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".parquet.tmp")
+        pq.write_table(self._to_table(df), tmp_path, compression=self.compression)
+        tmp_path.replace(path)
+
+    def write_current(self, df: pd.DataFrame, filename: str = CURRENT_CSV) -> str:
+        segment = self.snapshots.append(df)
+        if segment is None:
+            last = self.snapshots.last_entry()
+            segment = self.snapshots.root / last.segment if last else self.snapshots.root
+        return str(segment)
+
+    def write_historical(
+        self,
+        clean_df: pd.DataFrame,
+        stats_df: pd.DataFrame,
+        clean_filename: str = HISTORICAL_CSV,
+        stats_filename: str = STATS_CSV,
+    ) -> dict:
+        if "timestamp" not in clean_df.columns or "coin_id" not in clean_df.columns:
+            raise ValueError("Historical data needs 'coin_id' and 'timestamp' columns")
+
+        # Write the full dataset next to the live one, then swap directories,
+        # so readers never see a half-written set of partitions
+        staging_dir = self.historical_dir.with_name(self.historical_dir.name + ".tmp")
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+        self._write_partitions(clean_df, staging_dir)
+
+        return self._swap_in_historical(staging_dir, stats_df)
+
+    def historical_writer(
+        self,
+        clean_filename: str = HISTORICAL_CSV,
+        stats_filename: str = STATS_CSV,
+    ) -> HistoricalWriter:
+        return ParquetHistoricalWriter(self)
+
+    def _write_partitions(self, clean_df: pd.DataFrame, target_dir: Path) -> None:
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+
+        # pyarrow refuses to write more than 1024 partitions by default
+        n_partitions = clean_df["coin_id"].nunique()
+
+        ds.write_dataset(
+            self._to_table(clean_df),
+            target_dir,
+            format="parquet",
+            partitioning=PARTITIONING,
+            max_partitions=max(1024, n_partitions),
+            max_rows_per_group=HISTORICAL_ROW_GROUP_ROWS,
+            basename_template="part-{i}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+            file_options=ds.ParquetFileFormat().make_write_options(
+                compression=self.compression
+            ),
+        )
+
+    def _swap_in_historical(self, staging_dir: Path, stats_df: pd.DataFrame) -> dict:
+        """
+        Replace the live historical dataset with `staging_dir` and write stats
+        """
+        old_dir = self.historical_dir.with_name(self.historical_dir.name + ".old")
+
+        if self.historical_dir.exists():
+            self.historical_dir.rename(old_dir)
+        staging_dir.rename(self.historical_dir)
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+        self._write_file(stats_df, self.stats_path)
+
+        return {
+            "clean_path": str(self.historical_dir),
+            "stats_path": str(self.stats_path),
+        }
+
+    def read_current(self) -> pd.DataFrame:
+        if self.snapshots.last_entry() is None:
+            return CsvBackend(self.root).read_current()
+        return self.snapshots.latest()
+
+    def read_current_history(self, start=None, end=None) -> pd.DataFrame:
+        if self.snapshots.last_entry() is None:
+            return CsvBackend(self.root).read_current_history(start, end)
+        return self.snapshots.history(start, end)
+
+    def read_historical(self, coin_ids=None, start=None, end=None, columns=None) -> pd.DataFrame:
+        if not self.historical_dir.exists():
+            return CsvBackend(self.root).read_historical(coin_ids, start, end, columns)
+
+        dataset = ds.dataset(
+            self.historical_dir, format="parquet", partitioning=PARTITIONING
+        )
+
+        # The coin_id partition key prunes whole files; the timestamp filter
+        # is pushed down to Parquet row-group statistics
+        conditions = []
+        if coin_ids is not None:
+            conditions.append(ds.field("coin_id").isin(list(coin_ids)))
+        if start is not None:
+            start = pd.Timestamp(start)
+            conditions.append(
+                ds.field("timestamp") >= pa.scalar(start.to_pydatetime(), pa.timestamp("us"))
+            )
+        if end is not None:
+            end = pd.Timestamp(end)
+            conditions.append(
+                ds.field("timestamp") <= pa.scalar(end.to_pydatetime(), pa.timestamp("us"))
+            )
+
+        expression = None
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+
+        if columns is not None:
+            columns = [c for c in columns if c in dataset.schema.names]
+        table = dataset.to_table(filter=expression, columns=columns)
+        df = table.to_pandas(coerce_temporal_nanoseconds=True)
+        if "coin_id" in df.columns:
+            df = df[["coin_id"] + [c for c in df.columns if c != "coin_id"]]
+
+        # One series per coin and currency
+        keys = [c for c in ("coin_id", "currency", "timestamp") if c in df.columns]
+        return df.sort_values(keys).reset_index(drop=True)
+
+    def read_stats(self) -> pd.DataFrame:
+        if not self.stats_path.exists():
+            return CsvBackend(self.root).read_stats()
+        return pq.read_table(self.stats_path).to_pandas()
+
+    def _dataset_paths(self, dataset: str) -> list[Path]:
+        # Include the CSV files the readers fall back to
+        own = {
+            "current": self.snapshots.index_path,
+            "historical": self.historical_dir,
+            "stats": self.stats_path,
+        }
+        return [own[dataset]] + CsvBackend(self.root)._dataset_paths(dataset)
+
+
+BACKENDS = {
+    CsvBackend.name: CsvBackend,
+    ParquetBackend.name: ParquetBackend,
+}
+
+
+def get_storage_backend(
+    name: str = STORAGE_BACKEND, root: Path = CLEANED_DIR
+) -> StorageBackend:
+    """
+    Instantiate the configured storage backend for `root`
+    """
+    try:
+        return BACKENDS[name](root)
+    except KeyError:
+        raise ValueError(
+            f"Unknown storage backend '{name}' - choose from {sorted(BACKENDS)}"
+        ) from None
@@ -1,3 +1,5 @@
+from itertools import chain
+import numpy as np
 import pandas as pd
 from src.utils.logger import get_logger
 from src.utils.timer import timer
@@ -15,10 +17,75 @@ STANDARD_COLUMNS = [
     "change_24h",
 ]
 
+NUMERIC_COLUMNS = ["price", "market_cap", "volume_24h", "change_24h"]
+
+# Key suffix used by /simple/price for each numeric column, per currency
+FIELD_SUFFIXES = {
+    "price": "",
+    "market_cap": "_market_cap",
+    "volume_24h": "_24h_vol",
+    "change_24h": "_24h_change",
+}
+
+
+def _to_float_array(values: np.ndarray) -> np.ndarray:
+    try:
+        return values.astype("float64")
+    except (TypeError, ValueError):
+        # Strings or other junk in the payload - coerce them to NaN
+        return pd.to_numeric(pd.Series(values), errors="coerce").to_numpy("float64")
+
+
+def _flatten_vectorized(
+    raw_data: dict, currencies: list[str], coin_lookup: dict, timestamp
+) -> pd.DataFrame:
+    """
+    Build each output column as one array straight from the raw response
+    Rows are coin-major, currency-minor
+    """
+    coin_ids = list(raw_data)
+    values = list(raw_data.values())
+    n_coins, n_currencies = len(coin_ids), len(currencies)
+
+    columns = {
+        "timestamp": pd.DatetimeIndex([timestamp], dtype="datetime64[ns, UTC]").repeat(
+            n_coins * n_currencies
+        ),
+        "coin_id": np.repeat(np.array(coin_ids, dtype=object), n_currencies),
+        "coin_name": np.repeat(
+            np.array(
+                [coin_lookup.get(cid, cid.capitalize()) for cid in coin_ids],
+                dtype=object,
+            ),
+            n_currencies,
+        ),
+        "currency": np.tile(np.array(currencies, dtype=object), n_coins),
+    }
+
+    # One C-level pass over every coin: field-major, then currency
+    keys = [
+        f"{currency}{suffix}"
+        for suffix in FIELD_SUFFIXES.values()
+        for currency in currencies
+    ]
+    cells = np.fromiter(
+        chain.from_iterable(map(v.get, keys) for v in values),
+        dtype=object,
+        count=n_coins * len(keys),
+    )
+    matrix = _to_float_array(cells).reshape(n_coins, len(FIELD_SUFFIXES), n_currencies)
+
+    for i, column in enumerate(FIELD_SUFFIXES):
+        columns[column] = matrix[:, i, :].ravel()
+
+    return pd.DataFrame(columns, columns=STANDARD_COLUMNS)
+
 
 @timer("Transform Current Crypto Prices")
 def transform_current_prices(
-    raw_data: dict, coins: list[dict], currencies: list[str]
+    raw_data: dict,
+    coins: list[dict],
+    currencies: list[str],
 ) -> pd.DataFrame:
     """
     Clean, validate, and standardize cryptocurrency price data using Pandas.
@@ -39,41 +106,20 @@ def transform_current_prices(
     )
 
     logger.info("Flattening raw JSON into tabular rows")
-    rows = []
     timestamp = pd.Timestamp.now(tz="UTC")
     # Maps coin id to coin name - constant time lookup
     coin_lookup = {coin["id"]: coin["name"] for coin in coins}
 
-    for coin_id, values in raw_data.items():
+    for coin_id in raw_data:
         if coin_id not in coin_lookup:
             logger.warning(
                 f"Unknown coin ID detected in API response: {coin_id}"
             )
 
-        for currency in currencies:
-            rows.append(
-                {
-                    "timestamp": timestamp,
-                    "coin_id": coin_id,
-                    "coin_name": coin_lookup.get(
-                        coin_id, coin_id.capitalize()
-                    ),
-                    "currency": currency,
-                    "price": values.get(currency),
-                    "market_cap": values.get(f"{currency}_market_cap"),
-                    "volume_24h": values.get(f"{currency}_24h_vol"),
-                    "change_24h": values.get(f"{currency}_24h_change"),
-                }
-            )
-
-    df = pd.DataFrame(rows)
+    df = _flatten_vectorized(raw_data, currencies, coin_lookup, timestamp)
     logger.info(f"Initial DataFrame created with {len(df)} rows")
 
-    df.columns = [col.lower().strip() for col in df.columns]
-    df = df[STANDARD_COLUMNS]
-
-    numeric_cols = ["price", "market_cap", "volume_24h", "change_24h"]
-    df[numeric_cols] = df[numeric_cols].apply(pd.to_numeric, errors="coerce")
+    df[NUMERIC_COLUMNS] = df[NUMERIC_COLUMNS].astype("float64")
 
     missing_price_rows = df["price"].isna().sum()
     if missing_price_rows > 0:
@@ -88,7 +134,9 @@ def transform_current_prices(
     df["change_24h"] = df["change_24h"].fillna(0)
 
     before = len(df)
-    df = df.drop_duplicates()
+    # Every other column is derived from (coin_id, currency), so rows that
+    # share that key are full duplicates - no need to hash all 8 columns
+    df = df.drop_duplicates(subset=["coin_id", "currency"])
     removed = before - len(df)
     if removed > 0:
         logger.info(f"Removed {removed} duplicate rows")
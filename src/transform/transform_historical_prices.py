@@ -1,78 +1,369 @@
+import numpy as np
 import pandas as pd
+from pandas.api.indexers import BaseIndexer
 from src.utils.logger import get_logger
 from src.utils.timer import timer
+from src.utils.ohlc_batch import OHLC_DTYPE, SERIES_FIELDS, OhlcBatch
 
 logger = get_logger(__name__)
 
+OHLC_COLUMNS = ["open", "high", "low", "close"]
+# One series per coin and currency
+SERIES_KEYS = ["coin_id", "currency"]
+DERIVED_COLUMNS = ["pct_change", "rolling_7d", "rolling_30d", "normalized_close"]
+# Rows of earlier history a recomputed tail needs for its widest window
+TAIL_CONTEXT_ROWS = 30
+# Derived candles need an FX rate at most this far from their timestamp
+# (the FX series has the same 4-day candles as the coins)
+FX_MAX_GAP_MS = 4 * 24 * 60 * 60 * 1000
 
-@timer("Transform Historical Crypto Prices")
-def transform_historical_prices(raw_records: list[dict]):
-    """
-    Clean and enrich historical OHLC crypto price data
 
-    Returns:
-        {
-            "clean": ohlc_df,
-            "stats": stats_table
-        }
+def _batches_frame(batches: list[OhlcBatch]) -> pd.DataFrame:
     """
+    One frame from per-coin batches - the candle columns are concatenated
+    as-is, and each series string is repeated by reference
+    """
+    sizes = [len(b) for b in batches]
+    candles = np.concatenate([b.candles for b in batches])
 
-    logger.info("Starting transformation of historical OHLC data...")
+    def repeat(field):
+        return np.repeat(np.array([getattr(b, field) for b in batches], dtype=object), sizes)
+
+    columns = {field: repeat(field) for field in SERIES_FIELDS}
+    columns.update({name: candles[name] for name in OHLC_DTYPE.names})
+    return pd.DataFrame(columns)
 
-    if not raw_records:
-        logger.warning("No historical records received; returning empty DataFrames")
-        return {"clean": pd.DataFrame(), "stats": pd.DataFrame()}
 
-    ohlc_df = pd.DataFrame(raw_records)
-    logger.info(f"Initial DataFrame created with {len(ohlc_df)} rows")
+def _clean_ohlc(raw: list[OhlcBatch] | list[dict]) -> pd.DataFrame:
+    """
+    Build a typed, sorted and de-duplicated OHLC frame from extracted
+    batches (or legacy records, one dict per candle)
+    """
+    ohlc_df = _batches_frame(raw) if isinstance(raw[0], OhlcBatch) else pd.DataFrame(raw)
+    logger.debug("Initial DataFrame created with %d rows", len(ohlc_df))
 
     # Convert timestamp from ms to datetime
     ohlc_df["timestamp"] = pd.to_datetime(ohlc_df["timestamp_ms"], unit="ms")
     # Sort chronologically
-    ohlc_df = ohlc_df.sort_values(["coin_id", "timestamp"]).reset_index(drop=True)
-    logger.info("Timestamps converted and sorted")
+    ohlc_df = ohlc_df.sort_values(SERIES_KEYS + ["timestamp"]).reset_index(drop=True)
+    logger.debug("Timestamps converted and sorted")
 
     # Remove duplicates & ensure valid OHLC rows
-    ohlc_df = ohlc_df.drop_duplicates(subset=["coin_id", "timestamp"])
-    ohlc_df = ohlc_df.dropna(subset=["open", "high", "low", "close"])
+    ohlc_df = ohlc_df.drop_duplicates(subset=SERIES_KEYS + ["timestamp"])
+    ohlc_df = ohlc_df.dropna(subset=OHLC_COLUMNS)
 
     # Enforce numeric types for OHLC values
-    ohlc_columns = ["open", "high", "low", "close"]
-    ohlc_df[ohlc_columns] = ohlc_df[ohlc_columns].apply(pd.to_numeric, errors="coerce")
-    ohlc_df = ohlc_df.dropna(subset=ohlc_columns)
+    ohlc_df[OHLC_COLUMNS] = ohlc_df[OHLC_COLUMNS].apply(pd.to_numeric, errors="coerce")
+    ohlc_df = ohlc_df.dropna(subset=OHLC_COLUMNS)
+
+    return ohlc_df
+
+
+def _nearest_rates(timestamps_ms: np.ndarray, rates: list[list]) -> np.ndarray:
+    """
+    FX rate closest in time to each timestamp
+    NaN where no rate lies within FX_MAX_GAP_MS
+    """
+    series = np.asarray(rates, dtype="float64").reshape(-1, 2)
+    if len(series) == 0:
+        return np.full(len(timestamps_ms), np.nan)
+
+    series = series[np.argsort(series[:, 0], kind="stable")]
+    rate_ts, rate = series[:, 0], series[:, 1]
+    ts = np.asarray(timestamps_ms, dtype="float64")
+
+    right = np.minimum(np.searchsorted(rate_ts, ts), len(rate_ts) - 1)
+    left = np.maximum(right - 1, 0)
+    nearest = np.where(np.abs(rate_ts[left] - ts) <= np.abs(rate_ts[right] - ts), left, right)
+
+    return np.where(np.abs(rate_ts[nearest] - ts) <= FX_MAX_GAP_MS, rate[nearest], np.nan)
+
+
+def _derive_currencies(ohlc_df: pd.DataFrame, fx_rates: dict[str, list[list]]) -> pd.DataFrame:
+    """
+    Add a copy of the (base currency) candles in every currency of fx_rates
+    - fx_rates maps currency -> [[timestamp_ms, rate], ...], where rate is
+      units of that currency per unit of the base currency
+    - Prices are scaled by the rate closest in time to each candle; highs
+      and lows are approximate, as FX moves within a candle are not known
+    - Candles with no rate within FX_MAX_GAP_MS are left out
+    """
+    base_currencies = set(ohlc_df["currency"].unique())
+    frames = [ohlc_df]
+
+    for currency, rates in fx_rates.items():
+        if currency in base_currencies:
+            continue
+
+        rate = _nearest_rates(ohlc_df["timestamp_ms"].to_numpy(), rates)
+        derived = ohlc_df.assign(currency=currency)
+        derived[OHLC_COLUMNS] = derived[OHLC_COLUMNS].mul(rate, axis=0)
 
-    ohlc_df["pct_change"] = ohlc_df.groupby("coin_id")["close"].pct_change()
+        missing = np.isnan(rate)
+        if missing.any():
+            logger.warning(f"No {currency} FX rate for {int(missing.sum())} candles - left out")
+            derived = derived[~missing]
 
-    ohlc_df["rolling_7d"] = ohlc_df.groupby("coin_id")["close"].transform(
-        lambda x: x.rolling(7, min_periods=1).mean()
+        frames.append(derived)
+
+    ohlc_df = pd.concat(frames, ignore_index=True)
+    logger.debug("Derived %d candles in %d currencies", len(ohlc_df) - len(frames[0]), len(frames) - 1)
+
+    return ohlc_df.sort_values(SERIES_KEYS + ["timestamp"]).reset_index(drop=True)
+
+
+def _series_firsts(ohlc_df: pd.DataFrame) -> np.ndarray:
+    """
+    True for the first row of each series (a run of equal SERIES_KEYS)
+    """
+    is_first = np.zeros(len(ohlc_df), dtype=bool)
+    is_first[:1] = True
+    for key in SERIES_KEYS:
+        values = ohlc_df[key].to_numpy()
+        is_first[1:] |= values[1:] != values[:-1]
+    return is_first
+
+
+def _is_series_sorted(ohlc_df: pd.DataFrame) -> bool:
+    """
+    True if rows are sorted by SERIES_KEYS (ties in any order)
+    """
+    ordered = np.zeros(max(len(ohlc_df) - 1, 0), dtype=bool)
+    equal = np.ones(len(ordered), dtype=bool)
+    for key in SERIES_KEYS:
+        values = ohlc_df[key].to_numpy()
+        ordered |= equal & (values[:-1] < values[1:])
+        equal &= values[:-1] == values[1:]
+    return bool((ordered | equal).all())
+
+
+class _CoinWindowIndexer(BaseIndexer):
+    """
+    Trailing window of `window_size` rows that never reaches back past the
+    first row of the current series
+    """
+
+    def __init__(self, group_start: np.ndarray, window_size: int):
+        super().__init__(window_size=window_size)
+        self.group_start = group_start
+
+    def get_window_bounds(self, num_values=0, min_periods=None, center=None, closed=None, step=None):
+        end = np.arange(1, num_values + 1, dtype="int64")
+        start = np.maximum(end - self.window_size, self.group_start)
+        return start, end
+
+
+def _enrich(ohlc_df: pd.DataFrame, first_close: pd.Series | None = None) -> None:
+    """
+    Add per-series (coin and currency) derived columns in place
+    - Each series is a contiguous run of rows, so every column is one pass
+      of a native kernel over the whole frame rather than a call per coin
+
+    Args:
+        ohlc_df (pd.DataFrame): OHLC rows sorted by coin, currency and timestamp
+        first_close (pd.Series): optional per-row first close of each series'
+            full history, used when ohlc_df only holds a tail of it
+    """
+    close = ohlc_df["close"]
+
+    # Row position where each row's series starts
+    positions = np.arange(len(ohlc_df), dtype="int64")
+    is_first = _series_firsts(ohlc_df)
+    group_start = np.maximum.accumulate(np.where(is_first, positions, 0))
+
+    ohlc_df["pct_change"] = (close / close.shift(1) - 1).mask(is_first)
+
+    # The rolling kernel restarts its window sums whenever a window does not
+    # overlap the previous one, i.e. at every series boundary, so this
+    # matches a per-coin rolling mean exactly
+    for column, window in (("rolling_7d", 7), ("rolling_30d", 30)):
+        ohlc_df[column] = close.rolling(
+            _CoinWindowIndexer(group_start, window), min_periods=1
+        ).mean()
+
+    # Normalized close price (for coin comparisons)
+    if first_close is None:
+        first_close = pd.Series(close.to_numpy()[group_start], index=ohlc_df.index)
+    ohlc_df["normalized_close"] = (close / first_close).where(first_close != 0, close)
+
+
+def _build_stats(ohlc_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-series (coin and currency) summary stats, one row per series in key
+    order
+    - Each series is a contiguous run of rows, so every stat is one
+      `reduceat` over the whole column rather than a groupby aggregation
+    """
+    columns = SERIES_KEYS + ["coin_name", "max_close", "min_close", "mean_volatility", "total_return"]
+    if ohlc_df.empty:
+        return pd.DataFrame(columns=columns)
+    if not _is_series_sorted(ohlc_df):
+        ohlc_df = ohlc_df.sort_values(SERIES_KEYS, kind="stable")
+
+    starts = np.flatnonzero(_series_firsts(ohlc_df))
+    ends = np.append(starts[1:], len(ohlc_df)) - 1
+    close = ohlc_df["close"].to_numpy("float64")
+
+    # Mean of the non-NaN changes; NaN for a series with none
+    pct_change = ohlc_df["pct_change"].to_numpy("float64")
+    has_change = ~np.isnan(pct_change)
+    change_sum = np.add.reduceat(np.where(has_change, pct_change, 0.0), starts)
+    change_count = np.add.reduceat(has_change, starts)
+    mean_volatility = np.full(len(starts), np.nan)
+    np.divide(change_sum, change_count, out=mean_volatility, where=change_count > 0)
+
+    first_close, last_close = close[starts], close[ends]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        total_return = (last_close - first_close) / first_close
+
+    stats = {key: ohlc_df[key].to_numpy()[starts] for key in SERIES_KEYS + ["coin_name"]}
+    stats.update(
+        max_close=np.maximum.reduceat(close, starts),
+        min_close=np.minimum.reduceat(close, starts),
+        mean_volatility=mean_volatility,
+        total_return=total_return,
     )
-    ohlc_df["rolling_30d"] = ohlc_df.groupby("coin_id")["close"].transform(
-        lambda x: x.rolling(30, min_periods=1).mean()
+    return pd.DataFrame(stats, columns=columns)
+
+
+def _merge_incremental(existing: pd.DataFrame, new_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Merge new candles into an already-enriched history
+
+    New rows win over stored rows with the same (coin_id, currency, timestamp_ms)
+    Derived columns are recomputed only from each series' first new candle
+    onwards, using TAIL_CONTEXT_ROWS earlier rows as rolling-window context
+    """
+    first_new = new_df.groupby(SERIES_KEYS)["timestamp_ms"].min()
+
+    combined = pd.concat([existing, new_df], ignore_index=True)
+    combined = combined.drop_duplicates(
+        subset=SERIES_KEYS + ["timestamp_ms"], keep="last"
     )
+    combined = combined.sort_values(SERIES_KEYS + ["timestamp"]).reset_index(drop=True)
 
-    # Normalized close price (for coin comparisons)
-    ohlc_df["normalized_close"] = ohlc_df.groupby("coin_id")["close"].transform(
-        lambda x: x / x.iloc[0] if x.iloc[0] != 0 else x
+    # Rows at or after the first new candle of their series
+    series_first_new = first_new.reindex(pd.MultiIndex.from_frame(combined[SERIES_KEYS]))
+    affected = pd.Series(
+        combined["timestamp_ms"].to_numpy() >= series_first_new.to_numpy(),
+        index=combined.index,
     )
 
-    stats_table = (
-        ohlc_df.groupby("coin_id")
-        .agg(
-            coin_name=("coin_name", "first"),
-            max_close=("close", "max"),
-            min_close=("close", "min"),
-            mean_volatility=("pct_change", "mean"),
-            total_return=(
-                "close",
-                lambda x: (x.iloc[-1] - x.iloc[0]) / x.iloc[0],
-            ),
-        )
-        .reset_index()
+    by_series = [combined[key] for key in SERIES_KEYS]
+    position = combined.groupby(by_series).cumcount()
+    first_affected = position.where(affected).groupby(by_series).transform("min")
+    in_tail = position >= first_affected - (TAIL_CONTEXT_ROWS - 1)
+
+    tail = combined[in_tail].copy()
+    first_close = combined.groupby(by_series)["close"].transform("first")
+    _enrich(tail, first_close=first_close[in_tail])
+
+    combined.loc[affected, DERIVED_COLUMNS] = tail.loc[
+        affected[affected].index, DERIVED_COLUMNS
+    ]
+
+    logger.debug(
+        "Merged %d new rows into %d stored rows — recomputed %d rows across %d series",
+        len(new_df), len(existing), int(affected.sum()), len(first_new),
     )
 
-    logger.info("Historical transformation complete")
+    return combined
+
+
+def latest_timestamps(ohlc_df: pd.DataFrame, currency: str | None = None) -> dict[str, int]:
+    """
+    Newest stored candle per coin, as {coin_id: timestamp_ms}
+    - `currency` limits it to the candles stored in that currency
+    """
+    if currency is not None and not ohlc_df.empty:
+        ohlc_df = ohlc_df[ohlc_df["currency"] == currency]
+    if ohlc_df.empty:
+        return {}
+    return ohlc_df.groupby("coin_id")["timestamp_ms"].max().astype(int).to_dict()
+
+
+def _transform(
+    raw_records: list[OhlcBatch] | list[dict],
+    existing: pd.DataFrame | None,
+    fx_rates: dict[str, list[list]] | None,
+) -> dict:
+    has_existing = existing is not None and not existing.empty
+
+    if not raw_records:
+        if has_existing:
+            logger.info("No new historical records; keeping stored history")
+            return {"clean": existing, "stats": _build_stats(existing)}
+
+        logger.warning("No historical records received; returning empty DataFrames")
+        return {"clean": pd.DataFrame(), "stats": pd.DataFrame()}
+
+    ohlc_df = _clean_ohlc(raw_records)
+
+    if fx_rates:
+        ohlc_df = _derive_currencies(ohlc_df, fx_rates)
+
+    if has_existing:
+        ohlc_df = _merge_incremental(existing, ohlc_df)
+    else:
+        _enrich(ohlc_df)
 
-    return {
-        "clean": ohlc_df,
-        "stats": stats_table,
-    }
+    return {"clean": ohlc_df, "stats": _build_stats(ohlc_df)}
+
+
+@timer("Transform Historical Crypto Prices")
+def transform_historical_prices(
+    raw_records: list[OhlcBatch] | list[dict],
+    existing: pd.DataFrame | None = None,
+    fx_rates: dict[str, list[list]] | None = None,
+):
+    """
+    Clean and enrich historical OHLC crypto price data
+
+    Args:
+        raw_records (list[OhlcBatch]): OHLC batches from the extract step
+            (a list of one dict per candle is also accepted)
+        existing (pd.DataFrame): optional previously transformed history;
+            when given, raw_records are merged into it incrementally
+        fx_rates (dict): optional {currency: [[timestamp_ms, rate], ...]};
+            raw_records are also stored in each of these currencies
+
+    Returns:
+        {
+            "clean": ohlc_df,
+            "stats": stats_table
+        }
+    """
+
+    logger.info("Starting transformation of historical OHLC data...")
+
+    result = _transform(raw_records, existing, fx_rates)
+
+    logger.info(f"Historical transformation complete ({len(result['clean'])} rows)")
+
+    return result
+
+
+def transform_coin_history(
+    raw_records: list[OhlcBatch] | list[dict],
+    existing: pd.DataFrame | None = None,
+    fx_rates: dict[str, list[list]] | None = None,
+) -> dict:
+    """
+    Streaming counterpart of transform_historical_prices for a single coin
+    - Every derived column (pct_change, rolling, normalized) and the stats
+      only look at one coin's series, so each coin is transformed alone and
+      peak memory is bounded by the largest coin
+    - Not a @timer stage: it runs once per coin inside the streaming stage
+
+    Args:
+        raw_records (list[OhlcBatch]): one coin's OHLC batch(es)
+        existing (pd.DataFrame): that coin's stored history, if any
+        fx_rates (dict): as for transform_historical_prices
+
+    Returns:
+        {
+            "clean": ohlc_df,
+            "stats": stats_table
+        }
+    """
+    return _transform(raw_records, existing, fx_rates)
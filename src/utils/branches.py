@@ -0,0 +1,96 @@
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class BranchResult:
+    name: str
+    start: float
+    end: float
+    error: BaseException | None = None
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _run_branch(name: str, func: Callable[[], object]) -> BranchResult:
+    start = time.perf_counter()
+    try:
+        func()
+    except Exception as e:
+        logger.exception(f"Branch '{name}' failed")
+        return BranchResult(name, start, time.perf_counter(), error=e)
+    return BranchResult(name, start, time.perf_counter())
+
+
+def overlap_seconds(results: list[BranchResult]) -> float:
+    """
+    Time during which at least two branches were running at once
+    """
+    events = sorted(
+        [(r.start, 1) for r in results] + [(r.end, -1) for r in results]
+    )
+    overlap = 0.0
+    running = 0
+    previous = None
+    for moment, change in events:
+        if running >= 2:
+            overlap += moment - previous
+        running += change
+        previous = moment
+    return overlap
+
+
+def run_branches(
+    branches: dict[str, Callable[[], object]], parallel: bool = True
+) -> list[BranchResult]:
+    """
+    Run independent pipeline branches, concurrently if `parallel`
+    - A failing branch is logged and recorded; the others still run
+    - Logs per-branch timings, wall time and the overlap achieved
+    """
+    wall_start = time.perf_counter()
+    # A single branch always runs on the calling thread
+    parallel = parallel and len(branches) > 1
+
+    if parallel:
+        with ThreadPoolExecutor(
+            max_workers=len(branches), thread_name_prefix="branch"
+        ) as pool:
+            # Each branch gets its own copy of the caller's context so its
+            # stages are recorded under the caller's metrics stage
+            futures = [
+                pool.submit(contextvars.copy_context().run, _run_branch, name, func)
+                for name, func in branches.items()
+            ]
+            results = [future.result() for future in futures]
+    else:
+        results = [_run_branch(name, func) for name, func in branches.items()]
+
+    wall = time.perf_counter() - wall_start
+    serial = sum(r.duration for r in results)
+
+    for r in results:
+        status = "ok" if r.ok else f"FAILED ({type(r.error).__name__}: {r.error})"
+        logger.info(
+            f"Branch '{r.name}': {r.duration:.3f}s "
+            f"(+{r.start - wall_start:.3f}s -> +{r.end - wall_start:.3f}s) {status}"
+        )
+    logger.info(
+        f"Branches {'parallel' if parallel else 'sequential'}: wall {wall:.3f}s, "
+        f"sum of branches {serial:.3f}s, overlap {overlap_seconds(results):.3f}s, "
+        f"saved {max(0.0, serial - wall):.3f}s"
+    )
+
+    return results
@@ -13,8 +13,81 @@ COINS = [
 CURRENCIES = ["gbp", "usd", "eur"]
 DEFAULT_CURRENCY = "gbp"
 DEFAULT_DAYS = 365
+# Only fetch candles newer than the stored history on each historical run
+HISTORICAL_INCREMENTAL = True
+# Extract, transform and load historical OHLC one coin at a time, so peak
+# memory is bounded by the largest coin rather than the whole dataset
+HISTORICAL_STREAMING = False
+# Historical OHLC is fetched once in DEFAULT_CURRENCY; the other currencies
+# are derived from an FX rate series, built from FX_REFERENCE_COIN's candles
+# in every currency and cached in FX_CACHE_FILE
+HISTORICAL_CURRENCIES = CURRENCIES
+FX_REFERENCE_COIN = {"id": "bitcoin", "symbol": "BTC", "name": "Bitcoin"}
 
 RAW_DIR = BASE_DIR / "data" / "raw"
 CLEANED_DIR = BASE_DIR / "data" / "cleaned"
-HASH_DIR = BASE_DIR / "data" / "hashes"  # todo - add hashing for files
+# Content hashes of the last run's inputs/outputs, per pipeline
+HASH_DIR = BASE_DIR / "data" / "hashes"
+FX_CACHE_FILE = RAW_DIR / "fx_rates.json"
+# Last good OHLC response per coin and currency, with its fetch time
+HISTORICAL_CACHE_DIR = RAW_DIR / "historical"
+# Timestamped snapshots of every extraction (current prices, OHLC, FX rates)
+RAW_ARCHIVE_DIR = RAW_DIR / "archive"
+# Snapshots kept per kind - older ones are deleted unless they are still
+# some coin's (or currency's) latest good snapshot
+RAW_ARCHIVE_KEEP = {"current": 1440, "historical": 30, "fx": 30}
+# Codec for the columnar OHLC snapshots (Arrow IPC: "zstd", "lz4" or None)
+RAW_ARCHIVE_COMPRESSION = "zstd"
 LOG_DIR = BASE_DIR / "logs"
+# Per-stage metrics reports (runs.jsonl + Prometheus textfile)
+METRICS_DIR = LOG_DIR / "metrics"
+METRICS_ENABLED = True
+# Also trace Python allocations per stage (slow) - or set METRICS_TRACEMALLOC=1
+METRICS_TRACEMALLOC = False
+# Stage profiles, when enabled with ETL_PROFILE or --profile
+PROFILE_DIR = LOG_DIR / "profiles"
+
+# Primary storage for cleaned data ("parquet" or "csv")
+STORAGE_BACKEND = "parquet"
+PARQUET_COMPRESSION = "zstd"
+# Current-price snapshots roll over to a new segment file past this size
+SNAPSHOT_SEGMENT_MAX_BYTES = 16 * 1024 * 1024
+# Also write the legacy CSV files when the primary backend is not CSV
+EXPORT_CSV = True
+
+# CoinGecko public API budget - requests per minute shared by all extractors
+API_CALLS_PER_MINUTE = 10
+API_BURST = 2
+# Pause for a 429 without a Retry-After header (seconds, shared by all workers)
+RATE_LIMIT_DEFAULT_PAUSE_S = 60.0
+HISTORICAL_MAX_WORKERS = 4
+# Coins fetched more recently than this are served from their cache file,
+# so a rerun after a partial failure only retries the failed coins
+HISTORICAL_CACHE_TTL_HOURS = 12
+
+# Shared HTTP client - connection pool size and retry/backoff policy
+HTTP_POOL_SIZE = 10
+HTTP_MAX_RETRIES = 3
+HTTP_BACKOFF_BASE = 1.0
+HTTP_BACKOFF_MAX = 30.0
+
+# Current prices - coins per /simple/price request and concurrent requests
+CURRENT_PRICE_BATCH_SIZE = 100
+CURRENT_PRICE_MAX_WORKERS = 4
+
+# Skip transform & load when the extracted payload (or transformed output)
+# and the stored dataset are unchanged since the last run
+SKIP_UNCHANGED = True
+
+# Run the independent current and historical branches of the full
+# pipeline concurrently
+PIPELINE_PARALLEL = True
+
+# Daemon mode - how often each job runs in the long-lived scheduler
+CURRENT_INTERVAL_SECONDS = 60
+HISTORICAL_INTERVAL_HOURS = 24
+
+# Dashboard charts - series are downsampled to about one point per pixel
+# of this width (candlesticks to one candle per CANDLE_WIDTH_PX pixels)
+CHART_WIDTH_PX = 1400
+CANDLE_WIDTH_PX = 4
@@ -0,0 +1,57 @@
+import hashlib
+import json
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING
+from src.utils.logger import get_logger
+from src.utils.json_store import read_json_cached, write_json_atomic
+from src.utils.config import HASH_DIR
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = get_logger(__name__)
+
+
+def payload_hash(data) -> str:
+    """
+    SHA-256 of a JSON-serialisable payload (e.g. an extract result)
+    - Independent of dict key order; list order matters
+    """
+    encoded = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def frame_hash(df: "pd.DataFrame") -> str:
+    """
+    SHA-256 of a DataFrame's column names, dtypes and values
+    - Row order matters; the index does not
+    """
+    # Imported here so hashing extract payloads does not load pandas
+    import pandas as pd
+
+    digest = hashlib.sha256()
+    digest.update(json.dumps([[str(c), str(t)] for c, t in df.dtypes.items()]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _hash_file(name: str):
+    return HASH_DIR / f"{name}.json"
+
+
+def load_hashes(name: str) -> dict:
+    """
+    Hashes recorded by the last successful run of pipeline `name`
+    """
+    return dict(read_json_cached(_hash_file(name), default={}))
+
+
+def save_hashes(name: str, hashes: dict) -> None:
+    """
+    Record the hashes of a successful run of pipeline `name`
+    - One small file per pipeline, so concurrent branches never share a file
+    """
+    HASH_DIR.mkdir(parents=True, exist_ok=True)
+    record = {**hashes, "updated_at": datetime.now(timezone.utc).isoformat()}
+    write_json_atomic(_hash_file(name), record)
+    logger.info(f"Saved {name} content hashes to {_hash_file(name)}")
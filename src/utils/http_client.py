@@ -0,0 +1,184 @@
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from src.utils.logger import get_logger
+from src.utils.rate_limiter import TokenBucket, get_rate_limiter, parse_retry_after
+from src.utils.config import (
+    HTTP_POOL_SIZE,
+    HTTP_MAX_RETRIES,
+    HTTP_BACKOFF_BASE,
+    HTTP_BACKOFF_MAX,
+    RATE_LIMIT_DEFAULT_PAUSE_S,
+)
+
+logger = get_logger(__name__)
+
+# Responses worth retrying - rate limiting and transient server errors
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class HttpClient:
+    """
+    Pooled HTTP client shared by all extractors
+    - One requests.Session keeps connections alive and reuses them per host
+    - Retries 429/5xx responses, timeouts and connection errors with
+      exponential backoff and full jitter
+    - 429 Retry-After headers are honoured (and shared via the rate limiter);
+      a 429 without one pauses for `rate_limit_pause` seconds
+    - Counts requests, retries and connection reuse for run reports
+    """
+
+    def __init__(
+        self,
+        pool_size: int = HTTP_POOL_SIZE,
+        max_retries: int = HTTP_MAX_RETRIES,
+        backoff_base: float = HTTP_BACKOFF_BASE,
+        backoff_max: float = HTTP_BACKOFF_MAX,
+        rate_limiter: TokenBucket | None = None,
+        sleep=time.sleep,
+        rate_limit_pause: float = RATE_LIMIT_DEFAULT_PAUSE_S,
+    ):
+        self.max_retries = max_retries
+        self.rate_limit_pause = rate_limit_pause
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.rate_limiter = rate_limiter
+        self._sleep = sleep
+
+        # Retries are handled here, so urllib3 must not retry on its own
+        self.adapter = HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0
+        )
+        self.session = requests.Session()
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._retries = 0
+
+    def _backoff(self, attempt: int) -> float:
+        cap = min(self.backoff_max, self.backoff_base * 2**attempt)
+        return random.uniform(0, cap)
+
+    def _wait(self, delay: float, rate_limited: bool) -> None:
+        with self._lock:
+            self._retries += 1
+
+        # A 429 affects every caller, so pause the shared limiter instead
+        if rate_limited and self.rate_limiter is not None:
+            self.rate_limiter.pause(delay)
+        else:
+            self._sleep(delay)
+
+    def get(self, url: str, params: dict | None = None, timeout: float = 10):
+        """
+        Send a GET request, retrying transient failures
+
+        Returns the final response (the caller still calls raise_for_status)
+        Re-raises Timeout/ConnectionError once retries are exhausted
+        """
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+
+            with self._lock:
+                self._requests += 1
+
+            try:
+                response = self.session.get(url, params=params, timeout=timeout)
+            except (
+                requests.exceptions.Timeout,
+                requests.exceptions.ConnectionError,
+            ) as e:
+                if attempt == self.max_retries:
+                    raise
+
+                delay = self._backoff(attempt)
+                logger.warning(
+                    f"{type(e).__name__} for {url} — retrying in {delay:.1f}s "
+                    f"(attempt {attempt + 1}/{self.max_retries})"
+                )
+                self._wait(delay, rate_limited=False)
+                continue
+
+            status = response.status_code
+            if status not in RETRY_STATUSES or attempt == self.max_retries:
+                return response
+
+            if status == 429:
+                # No Retry-After: a jittered ~1s backoff would just send every
+                # worker straight back into the limit, so pause for longer
+                delay = parse_retry_after(response.headers.get("Retry-After"))
+                if delay is None:
+                    delay = self.rate_limit_pause
+            else:
+                delay = self._backoff(attempt)
+
+            logger.warning(
+                f"HTTP {status} for {url} — retrying in {delay:.1f}s "
+                f"(attempt {attempt + 1}/{self.max_retries})"
+            )
+            response.close()
+            self._wait(delay, rate_limited=status == 429)
+
+        return response
+
+    def stats(self) -> dict:
+        """
+        Cumulative counters for this client
+
+        Connection counts come from the urllib3 pools (one per host), so
+        `connections_reused` is requests served over an existing socket
+        """
+        opened = 0
+        pooled_requests = 0
+        pools = self.adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            opened += pool.num_connections
+            pooled_requests += pool.num_requests
+
+        with self._lock:
+            return {
+                "requests": self._requests,
+                "retries": self._retries,
+                "connections_opened": opened,
+                "connections_reused": max(0, pooled_requests - opened),
+            }
+
+    def log_stats(self, label: str, since: dict | None = None) -> dict:
+        """
+        Log counters accumulated since the `since` snapshot (or ever)
+        """
+        current = self.stats()
+        delta = {k: v - (since or {}).get(k, 0) for k, v in current.items()}
+
+        logger.info(
+            f"{label} HTTP stats — requests: {delta['requests']}, "
+            f"retries: {delta['retries']}, "
+            f"connections opened: {delta['connections_opened']}, "
+            f"reused: {delta['connections_reused']}"
+        )
+        return delta
+
+
+_shared_client = None
+_shared_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """
+    Return the process-wide HTTP client, created on first use from config
+    and bound to the shared CoinGecko rate limiter
+    """
+    global _shared_client
+
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = HttpClient(rate_limiter=get_rate_limiter())
+        return _shared_client
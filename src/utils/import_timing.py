@@ -0,0 +1,69 @@
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class ImportTiming:
+    group: str
+    seconds: float
+    new_modules: int
+
+
+_lock = threading.Lock()
+# One entry per group, summed over every time it was entered, so a daemon
+# that re-enters the same groups each run does not grow this
+_timings: dict[str, ImportTiming] = {}
+
+
+@contextmanager
+def timed_imports(group: str):
+    """
+    Time the imports made inside the block, e.g.
+
+        with timed_imports("current transform/load"):
+            from src.transform.transform_current_prices import transform_current_prices
+
+    - Modules already in sys.modules cost ~nothing, so a group only shows
+      what it pulled in for the first time
+    - Counts are approximate when branches import concurrently
+    - Repeated groups are added to the group's totals
+    """
+    modules_before = len(sys.modules)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing = ImportTiming(group, time.perf_counter() - start, len(sys.modules) - modules_before)
+        with _lock:
+            total = _timings.setdefault(group, ImportTiming(group, 0.0, 0))
+            total.seconds += timing.seconds
+            total.new_modules += timing.new_modules
+        logger.debug(
+            "Imported %s in %.1f ms (%d new modules)",
+            group, timing.seconds * 1000, timing.new_modules,
+        )
+
+
+def import_timings() -> list[ImportTiming]:
+    with _lock:
+        return list(_timings.values())
+
+
+def log_import_report() -> None:
+    """
+    Log every timed import group, in the style of `python -X importtime`
+    """
+    timings = import_timings()
+    logger.info("import time:  ms | new modules | group")
+    for t in timings:
+        logger.info(f"import time: {t.seconds * 1000:>7.1f} | {t.new_modules:>11} | {t.group}")
+    logger.info(
+        f"import time: {sum(t.seconds for t in timings) * 1000:>7.1f} | "
+        f"{sum(t.new_modules for t in timings):>11} | total ({len(sys.modules)} modules loaded)"
+    )
@@ -0,0 +1,79 @@
+import json
+import os
+import threading
+from pathlib import Path
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# path -> (mtime_ns, size, parsed data)
+_cache: dict[str, tuple[int, int, object]] = {}
+_lock = threading.Lock()
+
+
+def read_json_cached(path: Path, default=None):
+    """
+    Parse a JSON file, re-reading it only when its mtime or size changed
+    - Returns `default` if the file does not exist
+    - The returned object is shared between callers: treat it as read-only
+    """
+    key = str(path)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        with _lock:
+            _cache.pop(key, None)
+        return default
+
+    with _lock:
+        cached = _cache.get(key)
+    if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2]
+
+    with open(path) as f:
+        data = json.load(f)
+
+    with _lock:
+        _cache[key] = (stat.st_mtime_ns, stat.st_size, data)
+    return data
+
+
+def read_json(path: Path, default=None):
+    """
+    Parse a JSON file without keeping it in the shared cache
+    - For large, read-once files (e.g. per-coin caches in a streaming run)
+    - Returns `default` if the file does not exist
+    """
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+
+def write_json_atomic(path: Path, data, prime_cache: bool = True) -> None:
+    """
+    Write compact JSON to a temp file next to `path`, then swap it in
+    - Readers see either the old file or the new one, never a partial write
+    - The cache is primed so the next read_json_cached skips the parse,
+      unless prime_cache is False (then any cached copy is dropped)
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    if not prime_cache:
+        with _lock:
+            _cache.pop(str(path), None)
+        return
+
+    stat = os.stat(path)
+    with _lock:
+        _cache[str(path)] = (stat.st_mtime_ns, stat.st_size, data)
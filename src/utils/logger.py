@@ -1,58 +1,143 @@
+import atexit
 import logging
-from pathlib import Path
+import logging.handlers
 import os
+import queue
+import threading
+from pathlib import Path
 from dotenv import load_dotenv
 from src.utils.config import LOG_DIR
 
+_lock = threading.Lock()
+_env_loaded = False
+# Handler(s) attached to every logger, created once per process
+_handlers: list[logging.Handler] = []
+_listener: logging.handlers.QueueListener | None = None
 
-def get_logger(name: str) -> logging.Logger:
+
+def _load_env() -> None:
     """
-    Create and return a logger instance
-    - Automatically loads .env.dev or .env.test depending on ENV value
-    - Logging level & log file output is set via in .env
-    - Logs are written to both console and log file
-    - Handlers are added only once per logger name
+    Load .env.dev or .env.test (depending on ENV) once per process
     """
+    global _env_loaded
+    if _env_loaded:
+        return
 
     # Determine which .env file to load (default = dev)
     env_name = os.getenv("ENV", "dev")
-
     env_file = ".env.test" if env_name.lower() == "test" else ".env.dev"
-
-    # Load the selected env file
     load_dotenv(env_file)
+    _env_loaded = True
 
-    # Ensure logs folder exists
-    Path(LOG_DIR).mkdir(parents=True, exist_ok=True)
 
-    logger = logging.getLogger(name)
+def _env_flag(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
 
-    # Avoid duplicate handlers
-    if logger.hasHandlers():
-        return logger
-
-    # Configure log level from .env
-    log_level_str = os.getenv("LOG_LEVEL", "INFO").upper()
-    log_level = getattr(logging, log_level_str, logging.INFO)
-    logger.setLevel(log_level)
 
+def _output_handlers() -> list[logging.Handler]:
+    """
+    File + console handlers that do the actual I/O
+    """
     # Configure output log file, depending on environment
-    log_file_name = os.getenv("LOG_FILE", "etl.log")
-    log_path = LOG_DIR / log_file_name
+    Path(LOG_DIR).mkdir(parents=True, exist_ok=True)
+    log_path = LOG_DIR / os.getenv("LOG_FILE", "etl.log")
 
-    # File handler
     file_handler = logging.FileHandler(log_path)
-    file_format = logging.Formatter(
-        "%(asctime)s | %(name)s | %(levelname)s | %(message)s"
+    file_handler.setFormatter(
+        logging.Formatter("%(asctime)s | %(name)s | %(levelname)s | %(message)s")
     )
-    file_handler.setFormatter(file_format)
 
-    # Console handler
     console_handler = logging.StreamHandler()
-    console_format = logging.Formatter("%(levelname)s | %(message)s")
-    console_handler.setFormatter(console_format)
+    console_handler.setFormatter(logging.Formatter("%(levelname)s | %(message)s"))
+
+    return [file_handler, console_handler]
+
+
+class _RecordQueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueues each record unformatted, so the listener's handlers do the
+    formatting on its thread
+    - QueueHandler.prepare() formats the message on the logging thread,
+      to make the record safe to pickle; records never leave this process
+    - msg/args and exc_info are kept as-is; the (type, value, traceback)
+      tuple is still valid on the listener thread, so tracebacks are
+      formatted there too
+    - Arguments are read when the record is written, so avoid logging
+      objects that are mutated straight afterwards
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def _shared_handlers() -> list[logging.Handler]:
+    """
+    Handlers shared by every logger
+    - Queue mode (LOG_QUEUE, default on): loggers only enqueue records;
+      a QueueListener thread formats them and does the file/console I/O
+      (see _RecordQueueHandler)
+    - Otherwise the file and console handlers are attached directly
+    """
+    global _listener
+
+    with _lock:
+        if _handlers:
+            return _handlers
+
+        outputs = _output_handlers()
+
+        if _env_flag("LOG_QUEUE", "1"):
+            records = queue.SimpleQueue()
+            _listener = logging.handlers.QueueListener(
+                records, *outputs, respect_handler_level=True
+            )
+            _listener.start()
+            # Flush whatever is still queued when the process exits
+            atexit.register(stop_logging)
+            _handlers.append(_RecordQueueHandler(records))
+        else:
+            _handlers.extend(outputs)
+
+        return _handlers
+
+
+def stop_logging() -> None:
+    """
+    Stop the background listener after it has written every queued record
+    """
+    global _listener
+
+    with _lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Create and return a logger instance
+    - Loads .env.dev or .env.test depending on ENV value (once per process)
+    - Logging level & log file output is set via in .env
+    - Logs are written to both console and log file, on a background
+      thread unless LOG_QUEUE=0
+    - Handlers are added only once per logger name
+    - Pass arguments instead of f-strings for debug messages, e.g.
+      logger.debug("Fetched %s", coin_id), so they are only formatted when
+      debug logging is enabled
+    """
+    _load_env()
+
+    logger = logging.getLogger(name)
+
+    # Avoid duplicate handlers
+    if logger.handlers:
+        return logger
+
+    # Configure log level from .env
+    log_level_str = os.getenv("LOG_LEVEL", "INFO").upper()
+    logger.setLevel(getattr(logging, log_level_str, logging.INFO))
 
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    for handler in _shared_handlers():
+        logger.addHandler(handler)
 
     return logger
@@ -0,0 +1,258 @@
+import contextvars
+import json
+import os
+import threading
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from src.utils.logger import get_logger
+from src.utils.config import METRICS_DIR, METRICS_ENABLED, METRICS_TRACEMALLOC
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = get_logger(__name__)
+
+PATH_SEPARATOR = " > "
+RUNS_FILE = "runs.jsonl"
+PROMETHEUS_FILE = "etl_stages.prom"
+
+
+@dataclass
+class StageMetrics:
+    stage: str
+    path: str
+    depth: int
+    started_at: str
+    wall_seconds: float = 0.0
+    # Process-wide CPU time, so it includes worker threads of the stage
+    # (and of any stage running concurrently)
+    cpu_seconds: float = 0.0
+    max_rss_mb: float | None = None
+    max_rss_growth_mb: float | None = None
+    alloc_delta_mb: float | None = None
+    alloc_peak_mb: float | None = None
+    rows_in: int | None = None
+    rows_out: int | None = None
+    # "ok", "error" or "skipped" (short-circuited - see `note` for why)
+    status: str = "ok"
+    note: str | None = None
+
+
+@dataclass
+class _Frame:
+    metrics: StageMetrics
+    run: "_Run"
+    wall_start: float
+    cpu_start: float
+    rss_start: float | None
+    alloc_start: int | None
+    alloc_peak: int = 0
+
+
+@dataclass
+class _Run:
+    root: str
+    started_at: str
+    stages: list[StageMetrics] = field(default_factory=list)
+
+
+# Stack of open stages for the current thread/task; copied into worker
+# threads with contextvars.copy_context() so nested stages keep their path
+_stack: contextvars.ContextVar[tuple[_Frame, ...]] = contextvars.ContextVar(
+    "metrics_stage_stack", default=()
+)
+# Latest metrics per stage path, across runs, for the Prometheus textfile
+_latest: dict[str, StageMetrics] = {}
+_write_lock = threading.Lock()
+
+
+def _max_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def count_rows(obj) -> int | None:
+    """
+    Rows in a stage input/output: len() of a DataFrame, list or dict, or
+    the total rows of a dict of DataFrames; None for anything else
+    """
+    if hasattr(obj, "shape") and hasattr(obj, "columns"):
+        return len(obj)
+    if isinstance(obj, dict) and obj and all(
+        hasattr(v, "shape") and hasattr(v, "columns") for v in obj.values()
+    ):
+        return sum(len(v) for v in obj.values())
+    if isinstance(obj, (list, tuple, dict)):
+        return len(obj)
+    return None
+
+
+def _tracemalloc_requested() -> bool:
+    return METRICS_TRACEMALLOC or os.getenv("METRICS_TRACEMALLOC", "0").lower() in ("1", "true")
+
+
+def _fold_alloc_peak(stack: tuple[_Frame, ...]) -> None:
+    # tracemalloc keeps a single peak, so push it into every open stage
+    # before a nested stage resets it
+    if not tracemalloc.is_tracing():
+        return
+    peak = tracemalloc.get_traced_memory()[1]
+    for frame in stack:
+        frame.alloc_peak = max(frame.alloc_peak, peak)
+
+
+def start_stage(step_name: str, rows_in: int | None = None) -> contextvars.Token:
+    parent = _stack.get()
+    started_at = datetime.now(timezone.utc).isoformat()
+
+    if parent:
+        run = parent[-1].run
+        path = parent[-1].metrics.path + PATH_SEPARATOR + step_name
+    else:
+        run = _Run(root=step_name, started_at=started_at)
+        path = step_name
+
+    if _tracemalloc_requested() and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+    alloc_start = None
+    if tracemalloc.is_tracing():
+        _fold_alloc_peak(parent)
+        alloc_start = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+    frame = _Frame(
+        metrics=StageMetrics(
+            stage=step_name,
+            path=path,
+            depth=len(parent),
+            started_at=started_at,
+            rows_in=rows_in,
+        ),
+        run=run,
+        wall_start=time.perf_counter(),
+        cpu_start=time.process_time(),
+        rss_start=_max_rss_mb(),
+        alloc_start=alloc_start,
+    )
+    return _stack.set(parent + (frame,))
+
+
+def end_stage(
+    token: contextvars.Token,
+    rows_out: int | None = None,
+    status: str = "ok",
+    note: str | None = None,
+) -> StageMetrics:
+    stack = _stack.get()
+    frame = stack[-1]
+    metrics = frame.metrics
+
+    metrics.wall_seconds = round(time.perf_counter() - frame.wall_start, 6)
+    metrics.cpu_seconds = round(time.process_time() - frame.cpu_start, 6)
+    metrics.rows_out = rows_out
+    metrics.status = status
+    metrics.note = note
+
+    rss = _max_rss_mb()
+    if rss is not None:
+        metrics.max_rss_mb = round(rss, 3)
+        metrics.max_rss_growth_mb = round(rss - frame.rss_start, 3)
+
+    if frame.alloc_start is not None and tracemalloc.is_tracing():
+        _fold_alloc_peak(stack)
+        current = tracemalloc.get_traced_memory()[0]
+        metrics.alloc_delta_mb = round((current - frame.alloc_start) / 2**20, 3)
+        metrics.alloc_peak_mb = round((frame.alloc_peak - frame.alloc_start) / 2**20, 3)
+
+    _stack.reset(token)
+    frame.run.stages.append(metrics)
+
+    if len(stack) == 1 and METRICS_ENABLED:
+        try:
+            write_report(frame.run)
+        except OSError as e:
+            logger.warning(f"Could not write metrics report: {e}")
+
+    return metrics
+
+
+def record_skipped(step_name: str, reason: str) -> StageMetrics:
+    """
+    Record a stage that was not run because its inputs were unchanged
+    """
+    return end_stage(start_stage(step_name), status="skipped", note=reason)
+
+
+def _prometheus_lines(stages: list[StageMetrics]) -> list[str]:
+    gauges = [
+        ("etl_stage_duration_seconds", "Wall-clock seconds of the last run", "wall_seconds"),
+        ("etl_stage_cpu_seconds", "Process CPU seconds of the last run", "cpu_seconds"),
+        ("etl_stage_rows_in", "Input rows of the last run", "rows_in"),
+        ("etl_stage_rows_out", "Output rows of the last run", "rows_out"),
+        ("etl_stage_max_rss_megabytes", "Process peak RSS at the end of the last run", "max_rss_mb"),
+        ("etl_stage_alloc_peak_megabytes", "tracemalloc peak above the start of the last run", "alloc_peak_mb"),
+    ]
+
+    lines = []
+    for name, description, attr in gauges:
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} gauge")
+        for s in stages:
+            value = getattr(s, attr)
+            if value is not None:
+                lines.append(f'{name}{{stage="{_escape(s.path)}"}} {value}')
+
+    lines.append("# HELP etl_stage_success 1 if the last run of the stage succeeded or was skipped")
+    lines.append("# TYPE etl_stage_success gauge")
+    for s in stages:
+        lines.append(f'etl_stage_success{{stage="{_escape(s.path)}"}} {int(s.status != "error")}')
+
+    lines.append("# HELP etl_stage_skipped 1 if the last run of the stage was skipped (inputs unchanged)")
+    lines.append("# TYPE etl_stage_skipped gauge")
+    for s in stages:
+        lines.append(f'etl_stage_skipped{{stage="{_escape(s.path)}"}} {int(s.status == "skipped")}')
+
+    return lines
+
+
+def _escape(label: str) -> str:
+    return label.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def write_report(run: _Run) -> None:
+    """
+    Append the run to runs.jsonl and refresh the Prometheus textfile
+    - Stages are listed in start order with their full nested path
+    - "skipped" lists the stages that were short-circuited
+    - The textfile keeps the latest value of every stage seen by this
+      process, so independently scheduled jobs do not erase each other
+    """
+    stages = sorted(run.stages, key=lambda s: s.started_at)
+    report = {
+        "run": run.root,
+        "started_at": run.started_at,
+        "pid": os.getpid(),
+        "stages": [asdict(s) for s in stages],
+        "skipped": [s.path for s in stages if s.status == "skipped"],
+    }
+
+    with _write_lock:
+        METRICS_DIR.mkdir(parents=True, exist_ok=True)
+
+        with open(METRICS_DIR / RUNS_FILE, "a") as f:
+            f.write(json.dumps(report) + "\n")
+
+        for s in stages:
+            _latest[s.path] = s
+
+        prom_path = METRICS_DIR / PROMETHEUS_FILE
+        tmp_path = prom_path.with_suffix(".prom.tmp")
+        tmp_path.write_text("\n".join(_prometheus_lines(list(_latest.values()))) + "\n")
+        tmp_path.replace(prom_path)
@@ -0,0 +1,107 @@
+import hashlib
+import math
+from dataclasses import dataclass
+import numpy as np
+
+# One row per candle, 40 bytes - the strings identifying the series are
+# kept once per batch instead
+OHLC_DTYPE = np.dtype(
+    [
+        ("timestamp_ms", "<i8"),
+        ("open", "<f8"),
+        ("high", "<f8"),
+        ("low", "<f8"),
+        ("close", "<f8"),
+    ]
+)
+SERIES_FIELDS = ("coin_id", "coin_name", "currency")
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+@dataclass(eq=False)
+class OhlcBatch:
+    """
+    One coin's OHLC candles in one currency, stored column-wise
+    - The interchange format between extract, transform and the raw
+      caches/backup, instead of a dict per candle
+    - candles is a NumPy structured array of OHLC_DTYPE
+    - Prices that are not numbers are stored as NaN (dropped by transform)
+    """
+
+    coin_id: str
+    coin_name: str
+    currency: str
+    candles: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.candles)
+
+    @classmethod
+    def from_rows(cls, coin_id: str, coin_name: str, currency: str, rows: list) -> "OhlcBatch":
+        """
+        Batch from [timestamp_ms, open, high, low, close] rows (an /ohlc response)
+        """
+        candles = np.empty(len(rows), dtype=OHLC_DTYPE)
+        if rows:
+            try:
+                values = np.asarray(rows, dtype="float64").reshape(len(rows), 5)
+            except (TypeError, ValueError):
+                values = np.array([[_to_float(v) for v in row] for row in rows]).reshape(len(rows), 5)
+            candles["timestamp_ms"] = values[:, 0]
+            for i, name in enumerate(OHLC_DTYPE.names[1:], start=1):
+                candles[name] = values[:, i]
+        return cls(coin_id, coin_name, currency, candles)
+
+    @classmethod
+    def from_records(cls, records: list[dict]) -> list["OhlcBatch"]:
+        """
+        Batches from the legacy list of dicts, one per coin and currency
+        """
+        groups: dict[tuple, list] = {}
+        for r in records:
+            key = tuple(r[f] for f in SERIES_FIELDS)
+            groups.setdefault(key, []).append([r[name] for name in OHLC_DTYPE.names])
+        return [cls.from_rows(*key, rows) for key, rows in groups.items()]
+
+    def to_records(self) -> list[dict]:
+        series = dict(zip(SERIES_FIELDS, (self.coin_id, self.coin_name, self.currency)))
+        return [{**series, **dict(zip(OHLC_DTYPE.names, row))} for row in self.candles.tolist()]
+
+    def to_json(self) -> dict:
+        """
+        Compact JSON form: the series fields once, then [ts, o, h, l, c] rows
+        """
+        return {
+            "coin_id": self.coin_id,
+            "coin_name": self.coin_name,
+            "currency": self.currency,
+            "candles": [list(row) for row in self.candles.tolist()],
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> "OhlcBatch":
+        return cls.from_rows(data["coin_id"], data["coin_name"], data["currency"], data["candles"])
+
+    def digest(self) -> str:
+        """
+        SHA-256 of the series fields and candle values
+        """
+        h = hashlib.sha256("\0".join((self.coin_id, self.coin_name, self.currency)).encode())
+        h.update(np.ascontiguousarray(self.candles).tobytes())
+        return h.hexdigest()
+
+
+def load_batches(data: list) -> list[OhlcBatch]:
+    """
+    Batches from a backup file's JSON - the compact batch list, or the
+    legacy list of one dict per candle
+    """
+    if data and "candles" not in data[0]:
+        return OhlcBatch.from_records(data)
+    return [OhlcBatch.from_json(d) for d in data]
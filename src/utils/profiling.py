@@ -0,0 +1,119 @@
+import cProfile
+import os
+import re
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from src.utils.logger import get_logger
+from src.utils.config import PROFILE_DIR
+
+logger = get_logger(__name__)
+
+PROFILERS = ("cprofile", "pyinstrument")
+
+# Stage names to profile ("*" = every stage) and which profiler to use.
+# Read from ETL_PROFILE / ETL_PROFILER, or set with configure_profiling()
+_stages: frozenset[str] = frozenset()
+_profiler = "cprofile"
+# Only one stage is profiled at a time across the whole process: from
+# Python 3.12 cProfile is process-wide, and enabling a second profiler while
+# one is running raises ValueError. Nested stages are covered by the outer
+# stage's profile; stages on other threads (parallel branches) run unprofiled
+_lock = threading.Lock()
+_owner: int | None = None
+
+
+def configure_profiling(stages, profiler: str = "cprofile") -> None:
+    """
+    Profile the given @timer step names ("*" for all) with `profiler`
+    An empty list turns profiling off
+    """
+    global _stages, _profiler
+
+    if profiler not in PROFILERS:
+        raise ValueError(f"Unknown profiler '{profiler}' - choose from {PROFILERS}")
+
+    if profiler == "pyinstrument":
+        try:
+            import pyinstrument  # noqa: F401
+        except ImportError:
+            logger.warning("pyinstrument is not installed - falling back to cProfile")
+            profiler = "cprofile"
+
+    _stages = frozenset(s.strip() for s in stages if s.strip())
+    _profiler = profiler
+
+    if _stages:
+        logger.info(f"Profiling {sorted(_stages)} with {_profiler} into {PROFILE_DIR}")
+
+
+def profiling_enabled(step_name: str) -> bool:
+    # Kept to a set lookup: this runs for every stage when profiling is off
+    return bool(_stages) and (step_name in _stages or "*" in _stages)
+
+
+def _output_base(step_name: str):
+    slug = re.sub(r"[^a-z0-9]+", "_", step_name.lower()).strip("_")
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    return PROFILE_DIR / f"{stamp}-{slug}-{os.getpid()}"
+
+
+@contextmanager
+def profile_stage(step_name: str):
+    """
+    Profile the wrapped block and dump the result under PROFILE_DIR
+    - cprofile: <stamp>-<stage>.pstats (open with snakeviz, or convert with
+      flameprof/gprof2dot for a flamegraph)
+    - pyinstrument: <stamp>-<stage>.speedscope.json (speedscope.app) plus
+      an .html report
+    - Only one stage is profiled at a time; a stage that starts while
+      another thread's stage is being profiled runs unprofiled
+    """
+    global _owner
+
+    if not _lock.acquire(blocking=False):
+        if _owner != threading.get_ident():
+            logger.info(f"Not profiling {step_name}: another stage is already being profiled")
+        yield
+        return
+
+    _owner = threading.get_ident()
+    try:
+        if _profiler == "pyinstrument":
+            from pyinstrument import Profiler
+            from pyinstrument.renderers import SpeedscopeRenderer
+
+            profiler = Profiler()
+            profiler.start()
+            try:
+                yield
+            finally:
+                profiler.stop()
+                base = _output_base(step_name)
+                path = base.with_suffix(".speedscope.json")
+                path.write_text(profiler.output(SpeedscopeRenderer()))
+                base.with_suffix(".html").write_text(profiler.output_html())
+                logger.info(f"Profile for {step_name} saved to {path}")
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+                path = _output_base(step_name).with_suffix(".pstats")
+                profiler.dump_stats(path)
+                logger.info(f"Profile for {step_name} saved to {path}")
+    finally:
+        _owner = None
+        _lock.release()
+
+
+try:
+    configure_profiling(
+        os.getenv("ETL_PROFILE", "").split(","),
+        os.getenv("ETL_PROFILER", "cprofile").lower(),
+    )
+except ValueError as e:
+    logger.warning(f"Profiling disabled: {e}")
@@ -0,0 +1,115 @@
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from src.utils.config import API_CALLS_PER_MINUTE, API_BURST
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket limiting how many API calls are sent per minute
+    - Tokens refill continuously at calls_per_minute / 60 per second
+    - Up to `burst` tokens can be saved up while the bucket is idle
+    - pause() blocks every caller until a server-imposed cooldown has passed
+    """
+
+    def __init__(
+        self,
+        calls_per_minute: float,
+        burst: int = 1,
+        clock=time.monotonic,
+        sleep=time.sleep,
+    ):
+        if calls_per_minute <= 0:
+            raise ValueError("calls_per_minute must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+
+        self.rate = calls_per_minute / 60.0
+        self.burst = burst
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """
+        Block until a token is available and consume it
+
+        Returns:
+            float: seconds spent waiting
+        """
+        waited = 0.0
+
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._refill(now)
+
+                if now < self._blocked_until:
+                    delay = self._blocked_until - now
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                else:
+                    delay = (1 - self._tokens) / self.rate
+
+            self._sleep(delay)
+            waited += delay
+
+    def pause(self, seconds: float) -> None:
+        """
+        Stop handing out tokens for `seconds` (e.g. from a Retry-After header)
+        and drop any saved-up burst so callers resume at the steady rate
+        """
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self._blocked_until = max(self._blocked_until, now + seconds)
+            self._tokens = 0.0
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Parse a Retry-After header (delta-seconds or HTTP date) into seconds
+    Returns None if the header is missing or malformed
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+_shared_limiter = None
+_shared_lock = threading.Lock()
+
+
+def get_rate_limiter() -> TokenBucket:
+    """
+    Return the process-wide CoinGecko limiter, created on first use from config
+    """
+    global _shared_limiter
+
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = TokenBucket(API_CALLS_PER_MINUTE, API_BURST)
+        return _shared_limiter
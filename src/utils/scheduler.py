@@ -0,0 +1,135 @@
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class Job:
+    name: str
+    func: Callable[[], object]
+    interval: float
+    next_run: float = 0.0
+    running: bool = False
+    runs: int = 0
+    skipped: int = 0
+    failures: int = 0
+
+
+class Scheduler:
+    """
+    Runs jobs on independent fixed-rate timers inside one long-lived process
+    - Each job runs in its own worker thread, so a slow job never delays
+      another job's schedule
+    - If a job is still running when it is next due, that run is skipped
+      (not queued) and the job is rescheduled one interval later
+    - A failing run is logged and the job keeps its schedule
+    - stop() (or SIGTERM/SIGINT when run from the main thread) stops new
+      runs and waits for in-flight runs to finish
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.jobs: list[Job] = []
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def add_job(
+        self,
+        name: str,
+        func: Callable[[], object],
+        interval_seconds: float,
+        run_immediately: bool = True,
+    ) -> Job:
+        if interval_seconds <= 0:
+            raise ValueError(f"Job '{name}' needs a positive interval")
+
+        first_run = self.clock() + (0 if run_immediately else interval_seconds)
+        job = Job(name, func, interval_seconds, next_run=first_run)
+        self.jobs.append(job)
+        return job
+
+    def stop(self, *_signal_args) -> None:
+        if not self._stop.is_set():
+            logger.info("Scheduler stop requested - finishing in-flight jobs")
+        self._stop.set()
+
+    def _run_job(self, job: Job) -> None:
+        start = time.perf_counter()
+        try:
+            job.func()
+        except Exception:
+            job.failures += 1
+            logger.exception(f"Job '{job.name}' failed")
+        finally:
+            logger.info(
+                f"Job '{job.name}' finished in {time.perf_counter() - start:.3f}s"
+            )
+            with self._lock:
+                job.running = False
+                job.runs += 1
+
+    def _dispatch_due(self, pool: ThreadPoolExecutor) -> None:
+        now = self.clock()
+        for job in self.jobs:
+            if job.next_run > now:
+                continue
+
+            # Fixed rate: stay on the original grid, but never fire twice to
+            # catch up on ticks that were missed
+            while job.next_run <= now:
+                job.next_run += job.interval
+
+            with self._lock:
+                if job.running:
+                    job.skipped += 1
+                    logger.warning(
+                        f"Job '{job.name}' is still running - skipping this run"
+                    )
+                    continue
+                job.running = True
+
+            pool.submit(self._run_job, job)
+
+    def run(self) -> None:
+        """
+        Block until stop() is called, dispatching jobs as they fall due
+        """
+        if not self.jobs:
+            raise ValueError("Scheduler has no jobs")
+
+        previous_handlers = {}
+        if threading.current_thread() is threading.main_thread():
+            for sig in (signal.SIGTERM, signal.SIGINT):
+                previous_handlers[sig] = signal.signal(sig, self.stop)
+
+        logger.info(
+            "Scheduler started: "
+            + ", ".join(f"{job.name} every {job.interval:g}s" for job in self.jobs)
+        )
+
+        try:
+            with ThreadPoolExecutor(
+                max_workers=len(self.jobs), thread_name_prefix="scheduler"
+            ) as pool:
+                while not self._stop.is_set():
+                    self._dispatch_due(pool)
+                    next_due = min(job.next_run for job in self.jobs)
+                    self._stop.wait(max(0.0, next_due - self.clock()))
+        finally:
+            for sig, handler in previous_handlers.items():
+                signal.signal(sig, handler)
+
+        logger.info(
+            "Scheduler stopped: "
+            + ", ".join(
+                f"{job.name} runs={job.runs} skipped={job.skipped} "
+                f"failures={job.failures}"
+                for job in self.jobs
+            )
+        )
@@ -1,31 +1,69 @@
-import time
 from functools import wraps
 from src.utils.logger import get_logger
+from src.utils.metrics import count_rows, end_stage, record_skipped, start_stage
+from src.utils.profiling import profile_stage, profiling_enabled
 
 logger = get_logger(__name__)
 
 
 def timer(step_name: str):
     """
-    Decorator function that calculates time taken for a function to execute
+    Decorator function that times a pipeline stage and records its metrics
+    - Wall (perf_counter) and CPU time, peak RSS, optional tracemalloc
+      and rows in (first data argument) / rows out (return value)
+    - Nested stages are recorded under their parent's path, e.g.
+      "Full ETL Pipeline > Current Price ETL > Transform Current Crypto Prices"
+    - When the outermost stage finishes, the run's report is written to
+      METRICS_DIR (see src/utils/metrics.py)
+    - Stages selected with ETL_PROFILE / --profile are also profiled
+      (see src/utils/profiling.py)
+    - The stage name is available as `func.step_name`
     """
 
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
             logger.info(f"===== Starting {step_name} =====")
-            start = time.time()
 
-            result = func(*args, **kwargs)
+            rows_in = next(
+                (n for n in map(count_rows, (*args, *kwargs.values())) if n is not None),
+                None,
+            )
+            token = start_stage(step_name, rows_in)
+
+            try:
+                if profiling_enabled(step_name):
+                    with profile_stage(step_name):
+                        result = func(*args, **kwargs)
+                else:
+                    result = func(*args, **kwargs)
+            except BaseException:
+                metrics = end_stage(token, status="error")
+                logger.info(
+                    f"===== Failed {step_name} after {metrics.wall_seconds:.3f} seconds====="
+                )
+                raise
 
-            end = time.time()
-            duration = round(end - start, 3)
+            metrics = end_stage(token, rows_out=count_rows(result))
 
+            rows = ""
+            if metrics.rows_in is not None or metrics.rows_out is not None:
+                rows = f", rows {metrics.rows_in} -> {metrics.rows_out}"
             logger.info(
-                f"===== Completed {step_name} in {duration} seconds" f"=====\n"
+                f"===== Completed {step_name} in {metrics.wall_seconds:.3f} seconds "
+                f"(cpu {metrics.cpu_seconds:.3f}s{rows})=====\n"
             )
             return result
 
+        wrapper.step_name = step_name
         return wrapper
 
     return decorator
+
+
+def skip(func, reason: str) -> None:
+    """
+    Log and record a @timer stage that was short-circuited instead of run
+    """
+    logger.info(f"===== Skipped {func.step_name} - {reason} =====")
+    record_skipped(func.step_name, reason)
@@ -7,20 +7,13 @@ import plotly.graph_objects as go
 ROOT_DIR = Path(__file__).resolve().parents[1]
 sys.path.append(str(ROOT_DIR))
 
-from src.utils.config import CURRENCIES, DEFAULT_CURRENCY, COINS  # noqa: E402
+from src.utils.config import CURRENCIES, DEFAULT_CURRENCY  # noqa: E402
+from streamlit_app.data_access import load_current  # noqa: E402
 
 st.set_page_config(page_title="Cryptocurrency Dashboard", layout="wide")
 
-# Load data
-DATA_DIR = ROOT_DIR / "data" / "cleaned"
-df_current = pd.read_csv(DATA_DIR / "current_crypto_prices.csv")
-
-# Dynamic symbol + display name mapping from config
-SYMBOL_MAP = {c["name"]: c["symbol"] for c in COINS}
-DISPLAY_NAME_MAP = {c["name"]: f"{c['name']} ({c['symbol']})" for c in COINS}
-
-df_current["symbol"] = df_current["coin_name"].map(SYMBOL_MAP)
-df_current["display_name"] = df_current["coin_name"].map(DISPLAY_NAME_MAP)
+# Cached per data version - typed, with symbol & display_name columns
+df_current = load_current()
 
 # Sidebar currency selector
 currency_options = [c.upper() for c in CURRENCIES]
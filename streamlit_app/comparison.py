@@ -0,0 +1,91 @@
+"""
+Precomputed dataset for the comparison page
+
+The history is sorted and indexed by (display_name, timestamp) once per
+data version, with per-coin rolling volatility already computed. A rerun
+(coin selection or date range change) then only slices the index and
+derives the normalized return in one vectorized pass.
+"""
+
+import pandas as pd
+import streamlit as st
+from src.load.storage import get_storage_backend
+from src.utils.config import DEFAULT_CURRENCY
+from streamlit_app.data_access import load_historical
+
+VOLATILITY_WINDOW = 7
+COLUMNS = ["symbol", "close", "rolling_volatility_pct"]
+
+
+def build_comparison(df_historical: pd.DataFrame) -> pd.DataFrame:
+    """
+    Comparison dataset indexed by (display_name, timestamp)
+
+    Args:
+        df_historical: Typed history as load_historical returns it
+
+    Returns:
+        Sorted frame with symbol, close and the rolling standard deviation
+        of the per-period percentage change (in %) over VOLATILITY_WINDOW
+        periods, computed per coin over its full history
+    """
+    df = (
+        df_historical[["display_name", "timestamp", "symbol", "close"]]
+        .sort_values(["display_name", "timestamp"], kind="stable")
+        .set_index(["display_name", "timestamp"])
+    )
+
+    by_coin = df.groupby(level="display_name", sort=False)["close"]
+    pct_change = by_coin.pct_change(fill_method=None)
+    df["rolling_volatility_pct"] = (
+        pct_change.groupby(level="display_name", sort=False)
+        .rolling(VOLATILITY_WINDOW)
+        .std()
+        .droplevel(0)
+        * 100.0
+    )
+
+    return df[COLUMNS]
+
+
+def select(
+    comparison: pd.DataFrame,
+    names: list[str],
+    start=None,
+    end=None,
+) -> pd.DataFrame:
+    """
+    Rows for the selected coins between `start` and `end` (inclusive),
+    plus the return normalized to each coin's first close in the range (%)
+    """
+    start = None if start is None else pd.to_datetime(start)
+    end = None if end is None else pd.to_datetime(end)
+    available = set(comparison.index.unique(level="display_name"))
+    names = [n for n in names if n in available]
+
+    selected = comparison.loc[pd.IndexSlice[names, start:end], :]
+    first_close = selected.groupby(level="display_name", sort=False)["close"].transform("first")
+
+    return selected.assign(norm_return_pct=(selected["close"] / first_close - 1.0) * 100.0)
+
+
+def date_bounds(comparison: pd.DataFrame, names: list[str]) -> tuple:
+    """
+    Earliest and latest timestamp over the selected coins
+    """
+    timestamps = comparison.loc[pd.IndexSlice[names, :], :].index.get_level_values("timestamp")
+    return timestamps.min(), timestamps.max()
+
+
+# `version` is only the cache key - a new value means the data changed
+@st.cache_data(show_spinner=False, max_entries=8)
+def _load_comparison(version: str, currency: str) -> pd.DataFrame:
+    df_historical = load_historical()
+    return build_comparison(df_historical[df_historical["currency"] == currency])
+
+
+def load_comparison(currency: str = DEFAULT_CURRENCY) -> pd.DataFrame:
+    """
+    Cached comparison dataset in `currency` for the current historical data version
+    """
+    return _load_comparison(get_storage_backend().data_version("historical"), currency)
@@ -0,0 +1,105 @@
+"""
+Shared, cached data access for the dashboard pages
+
+Each dataset is read from the storage backend once per data version and
+kept in Streamlit's cache, so widget interactions (reruns) do not touch
+disk. The cache key is the backend's data_version(), which changes when
+the ETL rewrites the dataset, so new data shows up on the next rerun.
+"""
+
+import pandas as pd
+import streamlit as st
+from src.load.storage import get_storage_backend
+from src.utils.config import COINS, CURRENCIES, DEFAULT_CURRENCY
+
+# Dynamic symbol + display name mapping from config
+SYMBOL_MAP = {c["name"]: c["symbol"] for c in COINS}
+DISPLAY_NAME_MAP = {c["name"]: f"{c['name']} ({c['symbol']})" for c in COINS}
+
+FLOAT_COLUMNS = [
+    "price",
+    "market_cap",
+    "volume_24h",
+    "change_24h",
+    "open",
+    "high",
+    "low",
+    "close",
+    "pct_change",
+    "rolling_7d",
+    "rolling_30d",
+    "normalized_close",
+    "max_close",
+    "min_close",
+    "mean_volatility",
+    "total_return",
+]
+
+
+def _typed(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Explicit dtypes, parsed timestamps and the display columns every page uses
+    """
+    if df.empty:
+        return df
+
+    floats = [c for c in FLOAT_COLUMNS if c in df.columns]
+    df = df.astype({c: "float64" for c in floats})
+
+    if "timestamp" in df.columns and not pd.api.types.is_datetime64_any_dtype(df["timestamp"]):
+        df["timestamp"] = pd.to_datetime(df["timestamp"])
+
+    if "coin_name" in df.columns:
+        df["symbol"] = df["coin_name"].map(SYMBOL_MAP)
+        df["display_name"] = df["coin_name"].map(DISPLAY_NAME_MAP)
+
+    return df
+
+
+# `version` is only the cache key - a new value means the data changed
+@st.cache_data(show_spinner=False, max_entries=2)
+def _load_current(version: str) -> pd.DataFrame:
+    return _typed(get_storage_backend().read_current())
+
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def _load_historical(version: str) -> pd.DataFrame:
+    return _typed(get_storage_backend().read_historical())
+
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def _load_stats(version: str) -> pd.DataFrame:
+    return _typed(get_storage_backend().read_stats())
+
+
+def load_current() -> pd.DataFrame:
+    """
+    Latest current-price snapshot with symbol and display_name columns
+    """
+    return _load_current(get_storage_backend().data_version("current"))
+
+
+def load_historical() -> pd.DataFrame:
+    """
+    Full cleaned OHLC history with symbol and display_name columns
+    """
+    return _load_historical(get_storage_backend().data_version("historical"))
+
+
+def load_stats() -> pd.DataFrame:
+    """
+    Per-coin summary statistics with a symbol column
+    """
+    return _load_stats(get_storage_backend().data_version("stats"))
+
+
+def history_currencies(df: pd.DataFrame) -> list[str]:
+    """
+    Currencies present in a historical or stats frame - DEFAULT_CURRENCY
+    first, then in CURRENCIES order
+    - Data stored before multi-currency history only has DEFAULT_CURRENCY
+    """
+    if df.empty or "currency" not in df.columns:
+        return [DEFAULT_CURRENCY]
+    order = [DEFAULT_CURRENCY] + CURRENCIES
+    return sorted(df["currency"].unique(), key=lambda c: (order.index(c) if c in order else len(order), c))
@@ -0,0 +1,134 @@
+"""
+Server-side downsampling for the dashboard charts
+
+Plotly draws every point it is sent, but a chart cannot show more than
+about one point per horizontal pixel. Long series are reduced before they
+are sent to the browser:
+- Lines: Largest-Triangle-Three-Buckets (LTTB) keeps the points that
+  preserve the visual shape (peaks and troughs)
+- Candlesticks: consecutive candles are merged into wider time buckets
+  (first open, highest high, lowest low, last close)
+
+Downsampling runs on the date-filtered data, so narrowing the date range
+shows more detail, down to the raw candles
+"""
+
+import numpy as np
+import pandas as pd
+from src.utils.config import CANDLE_WIDTH_PX, CHART_WIDTH_PX
+
+
+def line_points(width_px: int = CHART_WIDTH_PX) -> int:
+    """
+    Target points for a line chart of `width_px` pixels
+    """
+    return max(3, int(width_px))
+
+
+def candle_points(width_px: int = CHART_WIDTH_PX) -> int:
+    """
+    Target candles for a candlestick chart of `width_px` pixels
+    """
+    return max(1, int(width_px) // CANDLE_WIDTH_PX)
+
+
+def _as_numeric(values) -> np.ndarray:
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype("datetime64[ns]").astype("int64")
+    return values
+
+
+def lttb_indices(x, y, n_out: int) -> np.ndarray:
+    """
+    Positions of the points LTTB keeps from the series (x, y)
+
+    Args:
+        x: Sorted x values (numbers or datetimes)
+        y: Values, without NaN
+        n_out: Number of points to keep (at least 3)
+
+    Returns:
+        Sorted positions, always including the first and last point
+    """
+    n = len(x)
+    if n_out >= n or n <= 2:
+        return np.arange(n)
+    n_out = max(n_out, 3)
+
+    x = _as_numeric(x)
+    x = (x - x[0]).astype("float64")
+    y = np.asarray(y, dtype="float64")
+
+    # n_out - 2 buckets between the fixed first and last point; the last
+    # point is the "next bucket" of the final middle bucket
+    edges = np.append(np.linspace(1, n - 1, n_out - 1).astype("int64"), n)
+    sizes = np.diff(edges)
+    avg_x = np.add.reduceat(x, edges[:-1]) / sizes
+    avg_y = np.add.reduceat(y, edges[:-1]) / sizes
+
+    kept = np.empty(n_out, dtype="int64")
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        cx, cy = avg_x[i + 1], avg_y[i + 1]
+        area = np.abs(
+            (x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a])
+        )
+        a = lo + int(area.argmax())
+        kept[i + 1] = a
+
+    return kept
+
+
+def downsample_line(
+    df: pd.DataFrame, y: str, n_out: int | None = None, x: str = "timestamp"
+) -> pd.DataFrame:
+    """
+    Rows of a sorted series that LTTB keeps for column `y`
+    - Rows where `y` is NaN (e.g. rolling warm-up) are dropped first
+    """
+    n_out = line_points() if n_out is None else n_out
+    df = df[df[y].notna()]
+    if len(df) <= n_out:
+        return df
+    return df.iloc[lttb_indices(df[x].to_numpy(), df[y].to_numpy(), n_out)]
+
+
+def downsample_ohlc(
+    df: pd.DataFrame, n_out: int | None = None, x: str = "timestamp"
+) -> pd.DataFrame:
+    """
+    Merge a sorted candle series into at most `n_out` equal-width time buckets
+
+    Args:
+        df: Candles of one coin, sorted by `x`
+        n_out: Maximum number of candles to return
+        x: Timestamp column
+
+    Returns:
+        One candle per non-empty bucket, stamped with the bucket's first
+        timestamp: first open, max high, min low, last close
+    """
+    n_out = candle_points() if n_out is None else n_out
+    if len(df) <= n_out:
+        return df
+
+    t = _as_numeric(df[x].to_numpy())
+    t = t - t[0]
+    width = t[-1] // n_out + 1
+    bucket = t // width
+
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], len(df)] - 1
+
+    return pd.DataFrame(
+        {
+            x: df[x].to_numpy()[starts],
+            "open": df["open"].to_numpy()[starts],
+            "high": np.fmax.reduceat(df["high"].to_numpy(), starts),
+            "low": np.fmin.reduceat(df["low"].to_numpy(), starts),
+            "close": df["close"].to_numpy()[ends],
+        }
+    )
@@ -7,26 +7,23 @@ import plotly.graph_objects as go
 ROOT_DIR = Path(__file__).resolve().parents[2]
 sys.path.append(str(ROOT_DIR))
 
-from src.utils.config import (  # noqa: E402
-    COINS,
-    DEFAULT_CURRENCY,
-    DEFAULT_DAYS,
-)
+from src.utils.config import DEFAULT_DAYS  # noqa: E402
+from streamlit_app.data_access import history_currencies, load_historical  # noqa: E402
+from streamlit_app.downsample import downsample_line, downsample_ohlc  # noqa: E402
 
 st.set_page_config(page_title="Historical Analysis", layout="wide")
 
-# Load historical data
-DATA_DIR = ROOT_DIR / "data" / "cleaned"
-df_historical = pd.read_csv(DATA_DIR / "historical_crypto_prices.csv")
+# Cached per data version - typed, with symbol & display_name columns
+df_historical = load_historical()
+
+# Sidebar currency selector - currencies present in the stored history
+currency_options = [c.upper() for c in history_currencies(df_historical)]
 
-df_historical["timestamp"] = pd.to_datetime(df_historical["timestamp"])
+currency = st.sidebar.radio("Currency:", currency_options)
 
-# Symbol & name mapping for formatting coins
-SYMBOL_MAP = {c["name"]: c["symbol"] for c in COINS}
-DISPLAY_NAME_MAP = {c["name"]: f"{c['name']} ({c['symbol']})" for c in COINS}
+currency_lower = currency.lower()
 
-df_historical["symbol"] = df_historical["coin_name"].map(SYMBOL_MAP)
-df_historical["display_name"] = df_historical["coin_name"].map(DISPLAY_NAME_MAP)
+df_historical = df_historical[df_historical["currency"] == currency_lower]
 
 # Title & Description
 st.markdown(
@@ -38,7 +35,7 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
-currency_display = DEFAULT_CURRENCY.upper()
+currency_display = currency
 
 st.markdown(
     f"""
@@ -51,7 +48,7 @@ st.markdown(
     • Filters apply to all charts and views on this page<br><br>
 
     Time span: <b>Last {DEFAULT_DAYS} days</b><br>
-    Default currency: <b>{currency_display}</b><br><br>
+    Currency: <b>{currency_display}</b><br><br>
 
     <i>Note: Historical prices are returned in fixed time intervals by the API and may not represent exact daily values</i>
 
@@ -132,6 +129,16 @@ if isinstance(date_range, tuple) and len(date_range) == 2:
 # Section Title
 st.subheader(f"Historical Data — {selected_display_name}")
 
+# Charts get about one point per pixel - narrowing the date range shows more detail
+df_coin = df_coin.sort_values("timestamp")
+df_candles = downsample_ohlc(df_coin)
+
+if len(df_candles) < len(df_coin):
+    st.caption(
+        f"Showing {len(df_candles):,} aggregated candles for {len(df_coin):,} data points - "
+        "narrow the date range for full detail"
+    )
+
 # Tabs
 tab1, tab2, tab3 = st.tabs(["Candlestick Chart", "Closing Price", "Moving Averages"])
 
@@ -142,11 +149,11 @@ with tab1:
     fig_candle = go.Figure(
         data=[
             go.Candlestick(
-                x=df_coin["timestamp"],
-                open=df_coin["open"],
-                high=df_coin["high"],
-                low=df_coin["low"],
-                close=df_coin["close"],
+                x=df_candles["timestamp"],
+                open=df_candles["open"],
+                high=df_candles["high"],
+                low=df_candles["low"],
+                close=df_candles["close"],
                 increasing_line_color="#26a69a",
                 decreasing_line_color="#ef5350",
             )
@@ -157,7 +164,7 @@ with tab1:
         template="plotly_dark",
         height=550,
         xaxis_title="Date",
-        yaxis_title="Price (GBP)",
+        yaxis_title=f"Price ({currency_display})",
     )
 
     st.plotly_chart(fig_candle, width="stretch")
@@ -167,11 +174,12 @@ with tab2:
     st.markdown("### Closing Price Trend")
 
     fig_close = go.Figure()
+    df_close = downsample_line(df_coin, "close")
 
     fig_close.add_trace(
         go.Scatter(
-            x=df_coin["timestamp"],
-            y=df_coin["close"],
+            x=df_close["timestamp"],
+            y=df_close["close"],
             mode="lines",
             name="Close Price",
             line=dict(width=2),
@@ -182,7 +190,7 @@ with tab2:
         template="plotly_dark",
         height=450,
         xaxis_title="Date",
-        yaxis_title="Close Price (GBP)",
+        yaxis_title=f"Close Price ({currency_display})",
     )
 
     st.plotly_chart(fig_close, width="stretch")
@@ -192,11 +200,13 @@ with tab3:
     st.markdown("### Moving Averages (MA7 & MA30)")
 
     fig_roll = go.Figure()
+    df_rolling_7d = downsample_line(df_coin, "rolling_7d")
+    df_rolling_30d = downsample_line(df_coin, "rolling_30d")
 
     fig_roll.add_trace(
         go.Scatter(
-            x=df_coin["timestamp"],
-            y=df_coin["rolling_7d"],
+            x=df_rolling_7d["timestamp"],
+            y=df_rolling_7d["rolling_7d"],
             mode="lines",
             name="7-Day Average",
             line=dict(width=2),
@@ -205,8 +215,8 @@ with tab3:
 
     fig_roll.add_trace(
         go.Scatter(
-            x=df_coin["timestamp"],
-            y=df_coin["rolling_30d"],
+            x=df_rolling_30d["timestamp"],
+            y=df_rolling_30d["rolling_30d"],
             mode="lines",
             name="30-Day Average",
             line=dict(width=2),
@@ -217,7 +227,7 @@ with tab3:
         template="plotly_dark",
         height=450,
         xaxis_title="Date",
-        yaxis_title="Price (GBP)",
+        yaxis_title=f"Price ({currency_display})",
     )
 
     st.plotly_chart(fig_roll, width="stretch")
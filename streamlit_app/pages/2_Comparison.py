@@ -7,27 +7,25 @@ import plotly.graph_objects as go
 ROOT_DIR = Path(__file__).resolve().parents[2]
 sys.path.append(str(ROOT_DIR))
 
-from src.utils.config import (  # noqa: E402
-    COINS,
-    DEFAULT_CURRENCY,
-    DEFAULT_DAYS,
-)
+from src.utils.config import DEFAULT_DAYS  # noqa: E402
+from streamlit_app.comparison import date_bounds, load_comparison, select  # noqa: E402
+from streamlit_app.data_access import history_currencies, load_historical  # noqa: E402
+from streamlit_app.downsample import downsample_line  # noqa: E402
 
 st.set_page_config(page_title="Cryptocurrency Comparison", layout="wide")
 
-# Load historical data
-DATA_DIR = ROOT_DIR / "data" / "cleaned"
-df_historical = pd.read_csv(DATA_DIR / "historical_crypto_prices.csv")
+# Cached per data version - typed, with symbol & display_name columns
+df_historical = load_historical()
+
+# Sidebar currency selector - currencies present in the stored history
+currency_options = [c.upper() for c in history_currencies(df_historical)]
 
-# Ensure timestamp is datetime
-df_historical["timestamp"] = pd.to_datetime(df_historical["timestamp"])
+currency = st.sidebar.radio("Currency:", currency_options)
 
-# Symbol & display name mapping
-SYMBOL_MAP = {c["name"]: c["symbol"] for c in COINS}
-DISPLAY_NAME_MAP = {c["name"]: f"{c['name']} ({c['symbol']})" for c in COINS}
+currency_lower = currency.lower()
 
-df_historical["symbol"] = df_historical["coin_name"].map(SYMBOL_MAP)
-df_historical["display_name"] = df_historical["coin_name"].map(DISPLAY_NAME_MAP)
+# Cached per data version & currency - indexed by coin & timestamp, volatility precomputed
+df_comparison = load_comparison(currency_lower)
 
 # Page header & description
 st.markdown(
@@ -39,7 +37,7 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
-currency_display = DEFAULT_CURRENCY.upper()
+currency_display = currency
 
 st.markdown(
     f"""
@@ -51,7 +49,7 @@ st.markdown(
     • Filters apply to all charts and views on this page<br><br>
 
     Time span: <b>Last {DEFAULT_DAYS} days</b><br>
-    Default currency: <b>{currency_display}</b><br><br>
+    Currency: <b>{currency_display}</b><br><br>
 
     <i>Note: Historical prices are returned in fixed time intervals determined by the API and may not represent exact daily values</i>
 
@@ -116,12 +114,7 @@ if not selected_display_names:
     st.sidebar.warning("Please select at least one cryptocurrency.")
     st.stop()
 
-df_filtered = df_historical[
-    df_historical["display_name"].isin(selected_display_names)
-].copy()
-
-min_date = df_filtered["timestamp"].min()
-max_date = df_filtered["timestamp"].max()
+min_date, max_date = date_bounds(df_comparison, selected_display_names)
 
 date_range = st.sidebar.date_input(
     "Select date range:",
@@ -130,12 +123,12 @@ date_range = st.sidebar.date_input(
     max_value=max_date,
 )
 
+start, end = None, None
 if isinstance(date_range, tuple) and len(date_range) == 2:
     start, end = date_range
-    df_filtered = df_filtered[
-        (df_filtered["timestamp"] >= pd.to_datetime(start))
-        & (df_filtered["timestamp"] <= pd.to_datetime(end))
-    ]
+
+# Index slice only - normalized return is derived in one vectorized pass
+df_filtered = select(df_comparison, selected_display_names, start, end)
 
 # Stops if filters cause no data to be shown - handles edge cases
 if df_filtered.empty:
@@ -156,13 +149,33 @@ COLOR_SEQUENCE = [
     "#17becf",
 ]
 
-symbols = df_filtered["symbol"].unique().tolist()
+# Colors follow the coin list, so a coin keeps its color as the selection changes
 color_map = {
-    sym: COLOR_SEQUENCE[i % len(COLOR_SEQUENCE)] for i, sym in enumerate(symbols)
+    name: COLOR_SEQUENCE[i % len(COLOR_SEQUENCE)] for i, name in enumerate(coin_options)
+}
+
+# One pass over the selected coins builds the traces for every tab -
+# about one point per pixel per coin, full detail on narrow ranges
+traces = {
+    "close": [],
+    "norm_return_pct": [],
+    "rolling_volatility_pct": [],
 }
 
-# Map colors back into df
-df_filtered["color"] = df_filtered["symbol"].map(color_map)
+for name, df_coin in df_filtered.groupby(level="display_name", sort=False):
+    df_coin = df_coin.droplevel("display_name").reset_index()
+
+    for column, column_traces in traces.items():
+        df_line = downsample_line(df_coin, column)
+        column_traces.append(
+            go.Scatter(
+                x=df_line["timestamp"],
+                y=df_line[column],
+                mode="lines",
+                name=name,
+                line=dict(width=2, color=color_map[name]),
+            )
+        )
 
 # Section title
 st.subheader("Cryptocurrency Comparison")
@@ -175,24 +188,7 @@ tab_price, tab_norm, tab_vol = st.tabs(
 with tab_price:
     st.markdown("### Price Comparison (Close Price)")
 
-    fig_price = go.Figure()
-
-    for name in selected_display_names:
-        df_coin = (
-            df_filtered[df_filtered["display_name"] == name]
-            .sort_values("timestamp")
-            .copy()
-        )
-
-        fig_price.add_trace(
-            go.Scatter(
-                x=df_coin["timestamp"],
-                y=df_coin["close"],
-                mode="lines",
-                name=name,
-                line=dict(width=2, color=df_coin["color"].iloc[0]),
-            )
-        )
+    fig_price = go.Figure(data=traces["close"])
 
     fig_price.update_layout(
         template="plotly_dark",
@@ -208,28 +204,7 @@ with tab_price:
 with tab_norm:
     st.markdown("### Normalized Performance (from start of selected range)")
 
-    fig_norm = go.Figure()
-
-    for name in selected_display_names:
-        df_coin = (
-            df_filtered[df_filtered["display_name"] == name]
-            .sort_values("timestamp")
-            .copy()
-        )
-
-        # Normalize based on first close in the filtered date range
-        first_close = df_coin["close"].iloc[0]
-        df_coin["norm_return_pct"] = (df_coin["close"] / first_close - 1.0) * 100.0
-
-        fig_norm.add_trace(
-            go.Scatter(
-                x=df_coin["timestamp"],
-                y=df_coin["norm_return_pct"],
-                mode="lines",
-                name=name,
-                line=dict(width=2, color=df_coin["color"].iloc[0]),
-            )
-        )
+    fig_norm = go.Figure(data=traces["norm_return_pct"])
 
     fig_norm.update_layout(
         template="plotly_dark",
@@ -245,28 +220,7 @@ with tab_norm:
 with tab_vol:
     st.markdown("### Volatility Comparison (Rolling 7-period)")
 
-    fig_vol = go.Figure()
-
-    for name in selected_display_names:
-        df_coin = (
-            df_filtered[df_filtered["display_name"] == name]
-            .sort_values("timestamp")
-            .copy()
-        )
-
-        # Compute rolling volatility based on percentage change in close
-        pct_change = df_coin["close"].pct_change()
-        df_coin["rolling_volatility_pct"] = pct_change.rolling(window=7).std() * 100.0
-
-        fig_vol.add_trace(
-            go.Scatter(
-                x=df_coin["timestamp"],
-                y=df_coin["rolling_volatility_pct"],
-                mode="lines",
-                name=name,
-                line=dict(width=2, color=df_coin["color"].iloc[0]),
-            )
-        )
+    fig_vol = go.Figure(data=traces["rolling_volatility_pct"])
 
     fig_vol.update_layout(
         template="plotly_dark",
@@ -1,5 +1,4 @@
 import streamlit as st
-import pandas as pd
 import sys
 from pathlib import Path
 import plotly.graph_objects as go
@@ -7,25 +6,27 @@ import plotly.graph_objects as go
 ROOT_DIR = Path(__file__).resolve().parents[2]
 sys.path.append(str(ROOT_DIR))
 
-from src.utils.config import (  # noqa: E402
-    COINS,
-    DEFAULT_CURRENCY,
-    DEFAULT_DAYS,
-)
+from src.utils.config import DEFAULT_DAYS  # noqa: E402
+from streamlit_app.data_access import history_currencies, load_historical, load_stats  # noqa: E402
 
 st.set_page_config(page_title="Cryptocurrency Statistics", layout="wide")
 
-# Load Data
-DATA_DIR = ROOT_DIR / "data" / "cleaned"
+# Summary metrics (cached per data version, with a symbol column)
+df_stats = load_stats()
+
+# Historical data for timestamp badge - shared with the other pages' cache
+df_hist = load_historical()
+
+# Sidebar currency selector - currencies present in the stored stats
+currency_options = [c.upper() for c in history_currencies(df_stats)]
 
-# Summary metrics
-STATS_PATH = DATA_DIR / "historical_crypto_stats.csv"
-df_stats = pd.read_csv(STATS_PATH)
+currency = st.sidebar.radio("Currency:", currency_options)
 
-# Historical data for timestamp badge
-HIST_PATH = DATA_DIR / "historical_crypto_prices.csv"
-df_hist = pd.read_csv(HIST_PATH)
-df_hist["timestamp"] = pd.to_datetime(df_hist["timestamp"])
+currency_lower = currency.lower()
+
+# Stats stored before multi-currency history have no currency column
+if "currency" in df_stats.columns:
+    df_stats = df_stats[df_stats["currency"] == currency_lower].reset_index(drop=True)
 
 # Validate stats file
 expected_cols = {
@@ -38,13 +39,9 @@ expected_cols = {
 }
 missing = expected_cols - set(df_stats.columns)
 if missing:
-    st.error(f"Missing expected columns in stats CSV: {missing}")
+    st.error(f"Missing expected columns in stats data: {missing}")
     st.stop()
 
-# Symbol + Icon Mapping
-SYMBOL_MAP = {c["name"]: c["symbol"] for c in COINS}
-df_stats["symbol"] = df_stats["coin_name"].map(SYMBOL_MAP)
-
 # Page Header
 st.markdown(
     """
@@ -55,7 +52,7 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
-currency_display = DEFAULT_CURRENCY.upper()
+currency_display = currency
 
 # Description
 st.markdown(
@@ -66,7 +63,7 @@ st.markdown(
     • Calculated using the full OHLC dataset extracted from the CoinGecko API<br><br>
 
     Time span: <b>Last {DEFAULT_DAYS} days</b><br>
-    Default currency: <b>{currency_display}</b><br><br>
+    Currency: <b>{currency_display}</b><br><br>
 
     </div>
     """,
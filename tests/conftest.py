@@ -0,0 +1,56 @@
+import pytest
+from src.utils import http_client
+from src.utils.http_client import HttpClient
+from src.utils.rate_limiter import TokenBucket
+
+
+def fast_client(rate_limiter=None):
+    """
+    HTTP client whose limiter and backoff never make unit tests wait
+    """
+    return HttpClient(
+        rate_limiter=rate_limiter or TokenBucket(calls_per_minute=60_000, burst=100),
+        sleep=lambda seconds: None,
+        rate_limit_pause=0.01,
+    )
+
+
+@pytest.fixture(autouse=True)
+def shared_http_client(monkeypatch):
+    """
+    Swap the process-wide HTTP client for a fast one in every test
+    """
+    client = fast_client()
+    monkeypatch.setattr(http_client, "_shared_client", client)
+    return client
+
+
+@pytest.fixture(autouse=True)
+def metrics_dir(tmp_path, monkeypatch):
+    """
+    Write stage metrics reports under the test's tmp dir, not logs/
+    """
+    path = tmp_path / "metrics"
+    monkeypatch.setattr("src.utils.metrics.METRICS_DIR", path)
+    monkeypatch.setattr("src.utils.metrics._latest", {})
+    return path
+
+
+@pytest.fixture(autouse=True)
+def historical_cache_dir(tmp_path, monkeypatch):
+    """
+    Keep per-coin OHLC cache files under the test's tmp dir, not data/raw
+    """
+    path = tmp_path / "historical_cache"
+    monkeypatch.setattr("src.extraction.extract_historical_prices.CACHE_DIR", path)
+    return path
+
+
+@pytest.fixture(autouse=True)
+def raw_archive_dir(tmp_path, monkeypatch):
+    """
+    Keep raw extraction snapshots under the test's tmp dir, not data/raw
+    """
+    path = tmp_path / "raw_archive"
+    monkeypatch.setattr("src.extraction.raw_archive.ARCHIVE_DIR", path)
+    return path
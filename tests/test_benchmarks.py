@@ -0,0 +1,59 @@
+from contextlib import contextmanager
+from benchmarks import generators
+from benchmarks.harness import Case, compare, measure
+from src.transform.transform_current_prices import transform_current_prices
+from src.transform.transform_historical_prices import transform_historical_prices
+
+
+def test_simple_price_payload_is_fully_usable():
+    currencies = generators.currencies(3)
+    payload = generators.simple_price_payload(20, currencies)
+
+    df = transform_current_prices(payload, generators.coins(20), currencies)
+
+    assert len(df) == 20 * 3
+    assert df["price"].notna().all()
+
+
+def test_ohlc_generators_agree():
+    payloads = generators.ohlc_payloads(3, years=1)
+    records = generators.ohlc_records(3, years=1)
+    frame = generators.ohlc_frame(3, years=1)
+
+    assert all(len(rows) == 91 and len(rows[0]) == 5 for rows in payloads.values())
+    assert len(records) == len(frame) == 3 * 91
+
+    clean = transform_historical_prices(records)["clean"]
+    assert clean["close"].tolist() == frame["close"].tolist()
+
+
+def test_measure_reports_throughput():
+    def setup(n):
+        yield (lambda: sum(range(n))), n
+
+    result = measure(Case("sum", {"n": 1000}, contextmanager(setup)), repeats=2)
+
+    assert result["rows"] == 1000
+    assert result["seconds"] > 0
+    assert result["rows_per_second"] > 0
+
+
+def test_compare_flags_time_and_memory_regressions():
+    baseline = {
+        "a": {"seconds": 1.0, "peak_mb": 10.0},
+        "b": {"seconds": 0.001, "peak_mb": 1.0},
+        "c": {"seconds": 1.0, "peak_mb": 10.0},
+    }
+    results = {
+        "a": {"seconds": 1.5, "peak_mb": 10.0},
+        # 3x slower but within the absolute noise floor
+        "b": {"seconds": 0.003, "peak_mb": 1.0},
+        "c": {"seconds": 1.1, "peak_mb": 20.0},
+        "new": {"seconds": 9.0, "peak_mb": 99.0},
+    }
+
+    regressions = compare(results, baseline, tolerance=0.25)
+
+    assert len(regressions) == 2
+    assert regressions[0].startswith("a: 1.5000s")
+    assert regressions[1].startswith("c: peak 20.0 MB")
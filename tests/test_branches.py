@@ -0,0 +1,62 @@
+import time
+import pytest
+from src.utils.branches import BranchResult, overlap_seconds, run_branches
+
+
+def test_parallel_branches_overlap():
+    results = run_branches(
+        {"a": lambda: time.sleep(0.1), "b": lambda: time.sleep(0.1)},
+        parallel=True,
+    )
+
+    assert [r.name for r in results] == ["a", "b"]
+    assert all(r.ok for r in results)
+    assert overlap_seconds(results) > 0.05
+
+
+def test_sequential_branches_do_not_overlap():
+    results = run_branches(
+        {"a": lambda: time.sleep(0.02), "b": lambda: time.sleep(0.02)},
+        parallel=False,
+    )
+
+    assert overlap_seconds(results) == 0
+    assert results[1].start >= results[0].end
+
+
+@pytest.mark.parametrize("parallel", [True, False])
+def test_failing_branch_does_not_block_others(parallel, caplog):
+    ran = []
+
+    def broken():
+        raise RuntimeError("boom")
+
+    results = run_branches(
+        {"historical": broken, "current": lambda: ran.append("current")},
+        parallel=parallel,
+    )
+
+    assert ran == ["current"]
+    assert not results[0].ok
+    assert isinstance(results[0].error, RuntimeError)
+    assert results[1].ok
+    assert "Branch 'historical' failed" in caplog.text
+
+
+def test_overlap_counts_only_concurrent_time():
+    results = [
+        BranchResult("a", 0.0, 4.0),
+        BranchResult("b", 1.0, 2.0),
+        BranchResult("c", 3.0, 6.0),
+    ]
+
+    # a+b overlap for 1s, a+c for 1s
+    assert overlap_seconds(results) == pytest.approx(2.0)
+
+
+def test_single_branch_is_logged_as_sequential(caplog):
+    with caplog.at_level("INFO"):
+        run_branches({"current": lambda: None}, parallel=True)
+
+    assert "Branches sequential" in caplog.text
+    assert "Branches parallel" not in caplog.text
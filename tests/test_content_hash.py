@@ -0,0 +1,41 @@
+import json
+import pandas as pd
+import pytest
+from src.utils import content_hash
+from src.utils.content_hash import frame_hash, load_hashes, payload_hash, save_hashes
+
+
+@pytest.fixture
+def hash_dir(tmp_path, monkeypatch):
+    path = tmp_path / "hashes"
+    monkeypatch.setattr(content_hash, "HASH_DIR", path)
+    return path
+
+
+def test_payload_hash_ignores_key_order():
+    a = {"bitcoin": {"gbp": 1.0, "usd": 2.0}, "ethereum": {"gbp": 3.0}}
+    b = {"ethereum": {"gbp": 3.0}, "bitcoin": {"usd": 2.0, "gbp": 1.0}}
+
+    assert payload_hash(a) == payload_hash(b)
+    assert payload_hash(a) != payload_hash({**a, "ethereum": {"gbp": 3.5}})
+    assert payload_hash([1, 2]) != payload_hash([2, 1])
+
+
+def test_frame_hash_covers_values_and_dtypes_not_index():
+    df = pd.DataFrame({"coin_id": ["btc", "eth"], "close": [1.0, 2.0]})
+
+    assert frame_hash(df) == frame_hash(df.set_axis([10, 11]))
+    assert frame_hash(df) != frame_hash(df.assign(close=[1.0, 2.5]))
+    assert frame_hash(df) != frame_hash(df.astype({"close": "float32"}))
+    assert frame_hash(df) != frame_hash(df.iloc[::-1])
+
+
+def test_hashes_round_trip_per_pipeline(hash_dir):
+    assert load_hashes("current") == {}
+
+    save_hashes("current", {"input": "abc"})
+    save_hashes("historical", {"input": "def", "output": "123"})
+
+    assert load_hashes("current")["input"] == "abc"
+    assert load_hashes("historical")["output"] == "123"
+    assert json.loads((hash_dir / "current.json").read_text())["updated_at"]
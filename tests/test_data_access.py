@@ -0,0 +1,76 @@
+import pandas as pd
+import pytest
+from unittest.mock import patch
+from src.load.storage import CsvBackend, ParquetBackend
+from streamlit_app import data_access
+from tests.test_storage import make_history, make_stats
+
+
+@pytest.fixture(params=[CsvBackend, ParquetBackend])
+def backend(request, tmp_path, monkeypatch):
+    store = request.param(tmp_path)
+    monkeypatch.setattr(data_access, "get_storage_backend", lambda: store)
+    for loader in (data_access._load_current, data_access._load_historical, data_access._load_stats):
+        loader.clear()
+    return store
+
+
+def test_historical_is_typed_and_mapped(backend):
+    backend.write_historical(make_history(), make_stats())
+
+    df = data_access.load_historical()
+
+    assert pd.api.types.is_datetime64_any_dtype(df["timestamp"])
+    assert df["close"].dtype == "float64"
+    assert set(df["display_name"]) == {"Bitcoin (BTC)", "Ethereum (ETH)"}
+    assert set(data_access.load_stats()["symbol"]) == {"BTC", "ETH"}
+
+
+def test_reruns_do_not_reread_until_data_changes(backend):
+    backend.write_historical(make_history(), make_stats())
+
+    with patch.object(type(backend), "read_historical", wraps=backend.read_historical) as read:
+        first = data_access.load_historical()
+        data_access.load_historical()
+        data_access.load_historical()
+        assert read.call_count == 1
+
+        updated = make_history()
+        updated["close"] = updated["close"] * 2
+        backend.write_historical(updated, make_stats())
+
+        second = data_access.load_historical()
+        assert read.call_count == 2
+
+    assert (second["close"] == first["close"] * 2).all()
+
+
+def test_new_current_snapshot_invalidates_cache(backend):
+    snapshot = pd.DataFrame(
+        {
+            "timestamp": pd.Timestamp("2025-01-01 12:00", tz="UTC"),
+            "coin_id": ["bitcoin"],
+            "coin_name": ["Bitcoin"],
+            "currency": ["gbp"],
+            "price": [100.0],
+            "market_cap": [1.0],
+            "volume_24h": [1.0],
+            "change_24h": [0.5],
+        }
+    )
+    backend.write_current(snapshot)
+    assert data_access.load_current()["price"].tolist() == [100.0]
+
+    backend.write_current(
+        snapshot.assign(timestamp=pd.Timestamp("2025-01-01 12:01", tz="UTC"), price=101.0)
+    )
+    assert data_access.load_current()["price"].tolist() == [101.0]
+    assert data_access.load_current()["symbol"].tolist() == ["BTC"]
+
+
+def test_history_currencies_default_first():
+    df = pd.DataFrame({"currency": ["usd", "eur", "gbp", "usd"]})
+
+    assert data_access.history_currencies(df) == ["gbp", "usd", "eur"]
+    # Stats written before multi-currency history have no currency column
+    assert data_access.history_currencies(pd.DataFrame({"coin_id": ["bitcoin"]})) == ["gbp"]
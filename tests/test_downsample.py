@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+from benchmarks.generators import DAY_MS, ohlc_frame
+from streamlit_app.downsample import (
+    candle_points,
+    downsample_line,
+    downsample_ohlc,
+    lttb_indices,
+)
+
+
+def make_series(n=5000):
+    return ohlc_frame(1, n / 365, candle_ms=DAY_MS, seed=7)
+
+
+def test_lttb_keeps_endpoints_and_extremes():
+    x = np.arange(1000)
+    y = np.sin(x / 50.0)
+    y[321] = 10.0
+    y[654] = -10.0
+
+    kept = lttb_indices(x, y, 100)
+
+    assert len(kept) == 100
+    assert kept[0] == 0 and kept[-1] == 999
+    assert (np.diff(kept) > 0).all()
+    assert {321, 654} <= set(kept)
+
+
+def test_lttb_short_series_unchanged():
+    assert list(lttb_indices(np.arange(5), np.arange(5.0), 10)) == [0, 1, 2, 3, 4]
+
+
+def test_downsample_line_uses_timestamps_and_drops_nan():
+    df = make_series()
+    df.loc[:9, "close"] = np.nan
+    df.loc[2500, "close"] = 1e9
+
+    out = downsample_line(df, "close", 200)
+
+    assert len(out) == 200
+    assert out["close"].notna().all()
+    assert out["timestamp"].iloc[0] == df["timestamp"].iloc[10]
+    assert out["timestamp"].iloc[-1] == df["timestamp"].iloc[-1]
+    assert out["close"].max() == 1e9
+
+
+def test_downsample_ohlc_preserves_range():
+    df = make_series()
+
+    out = downsample_ohlc(df, 100)
+
+    assert 0 < len(out) <= 100
+    assert out["open"].iloc[0] == df["open"].iloc[0]
+    assert out["close"].iloc[-1] == df["close"].iloc[-1]
+    assert out["high"].max() == df["high"].max()
+    assert out["low"].min() == df["low"].min()
+    assert out["timestamp"].is_monotonic_increasing
+
+
+def test_downsample_ohlc_bucket_values():
+    df = pd.DataFrame(
+        {
+            "timestamp": pd.date_range("2024-01-01", periods=6, freq="D"),
+            "open": [1.0, 2, 3, 4, 5, 6],
+            "high": [5.0, 9, 4, 4, 8, 7],
+            "low": [0.5, 1, 2, 3, 1, 4],
+            "close": [2.0, 3, 4, 5, 6, 7],
+        }
+    )
+
+    out = downsample_ohlc(df, 3)
+
+    assert out["open"].tolist() == [1, 3, 5]
+    assert out["high"].tolist() == [9, 4, 8]
+    assert out["low"].tolist() == [0.5, 2, 1]
+    assert out["close"].tolist() == [3, 5, 7]
+
+
+def test_narrow_range_is_full_detail():
+    df = make_series()
+    window = df.iloc[-candle_points():]
+
+    assert downsample_ohlc(window) is window
+    assert len(downsample_line(df.iloc[-500:], "close")) == 500
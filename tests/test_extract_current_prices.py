@@ -1,14 +1,23 @@
-import pytest  # noqa: F401
+import pytest
+import gzip
 import json
-from unittest.mock import patch, MagicMock, mock_open
+import requests
+from unittest.mock import patch, MagicMock
 from src.extraction.extract_current_prices import extract_current_prices
+from src.extraction.raw_archive import current_archive
 from src.utils.config import COINS
 
 
-@patch("builtins.open", new_callable=mock_open)
-@patch("pathlib.Path.exists", return_value=False)
-@patch("requests.get")
-def test_returns_dict(mock_get, mock_exists, mock_file):
+@pytest.fixture(autouse=True)
+def backup_file(tmp_path, monkeypatch):
+    # Keep backups out of the real raw data directory
+    path = tmp_path / "backup_current_prices.json"
+    monkeypatch.setattr("src.extraction.extract_current_prices.BACKUP_FILE", path)
+    return path
+
+
+@patch("requests.Session.get")
+def test_returns_dict(mock_get):
     mock_resp = MagicMock()
     mock_resp.json.return_value = {"bitcoin": {"gbp": 100}}
     mock_resp.raise_for_status.return_value = None
@@ -18,10 +27,8 @@ def test_returns_dict(mock_get, mock_exists, mock_file):
     assert isinstance(data, dict)
 
 
-@patch("builtins.open", new_callable=mock_open)
-@patch("pathlib.Path.exists", return_value=False)
-@patch("requests.get")
-def test_expected_coins_present(mock_get, mock_exists, mock_file):
+@patch("requests.Session.get")
+def test_expected_coins_present(mock_get):
     mock_resp = MagicMock()
     mock_resp.json.return_value = {
         "bitcoin": {"gbp": 100},
@@ -39,10 +46,8 @@ def test_expected_coins_present(mock_get, mock_exists, mock_file):
         assert coin["id"] in data
 
 
-@patch("builtins.open", new_callable=mock_open)
-@patch("pathlib.Path.exists", return_value=False)
-@patch("requests.get")
-def test_currencies_present(mock_get, mock_exists, mock_file):
+@patch("requests.Session.get")
+def test_currencies_present(mock_get):
     mock_resp = MagicMock()
     mock_resp.json.return_value = {"bitcoin": {"gbp": 100, "usd": 110, "eur": 105}}
     mock_resp.raise_for_status.return_value = None
@@ -55,10 +60,8 @@ def test_currencies_present(mock_get, mock_exists, mock_file):
     assert "eur" in data["bitcoin"]
 
 
-@patch("builtins.open", new_callable=mock_open)
-@patch("pathlib.Path.exists", return_value=False)
-@patch("requests.get")
-def test_values_are_numeric(mock_get, mock_exists, mock_file):
+@patch("requests.Session.get")
+def test_values_are_numeric(mock_get):
     mock_resp = MagicMock()
     mock_resp.json.return_value = {"bitcoin": {"gbp": 100, "usd": 110, "eur": 105}}
     mock_resp.raise_for_status.return_value = None
@@ -70,10 +73,8 @@ def test_values_are_numeric(mock_get, mock_exists, mock_file):
         assert isinstance(val, (int, float))
 
 
-@patch("builtins.open", new_callable=mock_open)
-@patch("pathlib.Path.exists", return_value=False)
-@patch("requests.get")
-def test_api_mock(mock_get, mock_exists, mock_file):
+@patch("requests.Session.get")
+def test_api_mock(mock_get):
     mock_resp = MagicMock()
     mock_resp.status_code = 200
     mock_resp.raise_for_status.return_value = None
@@ -85,24 +86,134 @@ def test_api_mock(mock_get, mock_exists, mock_file):
     assert data["bitcoin"]["usd"] == 120
 
 
-@patch("requests.get")
-def test_json_decode_error_uses_backup(mock_get):
+@patch("requests.Session.get")
+def test_json_decode_error_uses_backup(mock_get, backup_file):
     mock_resp = MagicMock()
     mock_resp.raise_for_status.return_value = None
     mock_resp.json.side_effect = ValueError("Bad JSON")
     mock_get.return_value = mock_resp
 
     fake_backup = {"bitcoin": {"gbp": 200}}
+    backup_file.write_text(json.dumps(fake_backup))
 
-    fake_path = MagicMock()
-    fake_path.exists.return_value = True
+    data = extract_current_prices([{"id": "bitcoin"}], ["gbp"])
 
-    fake_stat = MagicMock()
-    fake_stat.st_size = 10
-    fake_path.stat.return_value = fake_stat
+    assert data == fake_backup
 
-    with patch("src.extraction.extract_current_prices.BACKUP_FILE", fake_path):
-        with patch("builtins.open", mock_open(read_data=json.dumps(fake_backup))):
-            data = extract_current_prices([{"id": "bitcoin"}], ["gbp"])
 
-    assert data == fake_backup
+@patch("requests.Session.get")
+def test_transient_server_error_is_retried_not_backup(mock_get):
+    error_resp = MagicMock()
+    error_resp.status_code = 503
+
+    ok_resp = MagicMock()
+    ok_resp.status_code = 200
+    ok_resp.raise_for_status.return_value = None
+    ok_resp.json.return_value = {"bitcoin": {"gbp": 100}}
+
+    mock_get.side_effect = [error_resp, ok_resp]
+
+    data = extract_current_prices([{"id": "bitcoin"}], ["gbp"])
+
+    assert data == {"bitcoin": {"gbp": 100}}
+    assert mock_get.call_count == 2
+
+
+def _price_response(ids, fail_ids=()):
+    resp = MagicMock()
+    resp.status_code = 200
+    if any(cid in fail_ids for cid in ids):
+        resp.raise_for_status.side_effect = requests.exceptions.HTTPError("boom")
+        resp.status_code = 400
+    else:
+        resp.raise_for_status.return_value = None
+        resp.json.return_value = {cid: {"gbp": 100} for cid in ids}
+    return resp
+
+
+@patch("requests.Session.get")
+def test_coins_are_chunked_into_batches(mock_get):
+    mock_get.side_effect = lambda url, params, timeout: _price_response(
+        params["ids"].split(",")
+    )
+
+    data = extract_current_prices(COINS, ["gbp"], batch_size=2)
+
+    requested = sorted(call.kwargs["params"]["ids"] for call in mock_get.call_args_list)
+    assert requested == ["binancecoin,solana", "bitcoin,ethereum", "ripple"]
+    assert set(data) == {coin["id"] for coin in COINS}
+
+
+@patch("requests.Session.get")
+def test_failed_chunk_uses_backup_for_its_coins_only(mock_get, backup_file):
+    mock_get.side_effect = lambda url, params, timeout: _price_response(
+        params["ids"].split(","), fail_ids={"solana"}
+    )
+
+    backup_file.write_text(
+        json.dumps({coin["id"]: {"gbp": 1} for coin in COINS})
+    )
+
+    data = extract_current_prices(COINS, ["gbp"], batch_size=2)
+
+    # The batch containing solana is "binancecoin,solana"
+    assert data["solana"] == {"gbp": 1}
+    assert data["binancecoin"] == {"gbp": 1}
+    assert data["bitcoin"] == {"gbp": 100}
+    assert data["ripple"] == {"gbp": 100}
+
+    # The run is archived as returned, but only the fresh coins become
+    # their coin's latest good snapshot
+    archive = current_archive()
+    [snapshot] = archive.snapshots()
+    assert archive.read(snapshot["id"]) == data
+    assert archive.latest_ids(["solana", "bitcoin"]) == {snapshot["id"]: ["bitcoin"]}
+
+
+@patch("requests.Session.get")
+def test_invalid_coins_use_backup_individually(mock_get, backup_file, caplog):
+    mock_resp = MagicMock()
+    mock_resp.status_code = 200
+    mock_resp.raise_for_status.return_value = None
+    mock_resp.json.return_value = {
+        "bitcoin": {"gbp": 100, "usd": 120},
+        "ethereum": {"gbp": "n/a"},
+        "ripple": {"gbp": 0.5, "usd": 0.6},
+    }
+    mock_get.return_value = mock_resp
+
+    backup_file.write_text(
+        json.dumps({"ethereum": {"gbp": 1, "usd": 2}, "solana": {"gbp": 3, "usd": 4}})
+    )
+
+    coins = [{"id": cid} for cid in ("bitcoin", "ethereum", "solana", "ripple")]
+    data = extract_current_prices(coins, ["gbp", "usd"])
+
+    assert data["bitcoin"] == {"gbp": 100, "usd": 120}
+    assert data["ripple"] == {"gbp": 0.5, "usd": 0.6}
+    assert data["ethereum"] == {"gbp": 1, "usd": 2}
+    assert data["solana"] == {"gbp": 3, "usd": 4}
+
+    # Every problem of a coin is reported together
+    assert "non-numeric gbp: 'n/a'; missing currency 'usd'" in caplog.text
+    assert "'solana': missing coin" in caplog.text
+
+
+@patch("requests.Session.get")
+def test_fresh_prices_are_archived_and_used_as_backup(mock_get, backup_file, raw_archive_dir):
+    ok_resp = MagicMock()
+    ok_resp.status_code = 200
+    ok_resp.raise_for_status.return_value = None
+    ok_resp.json.return_value = {"bitcoin": {"gbp": 100}}
+    mock_get.return_value = ok_resp
+
+    extract_current_prices([{"id": "bitcoin"}], ["gbp"])
+
+    assert not backup_file.exists()  # runs are archived instead
+    [snapshot] = (raw_archive_dir / "current").glob("*.json.gz")
+    assert gzip.decompress(snapshot.read_bytes()) == b'{"bitcoin":{"gbp":100}}'
+    assert list(snapshot.parent.glob("*.tmp")) == []
+
+    # A later failed poll falls back to the archived prices
+    ok_resp.json.side_effect = ValueError("Bad JSON")
+    assert extract_current_prices([{"id": "bitcoin"}], ["gbp"]) == {"bitcoin": {"gbp": 100}}
@@ -0,0 +1,116 @@
+import json
+import time
+import pytest
+from unittest.mock import patch
+from src.extraction import extract_fx_rates as fx
+from src.extraction.raw_archive import fx_archive
+from src.utils.ohlc_batch import OhlcBatch
+
+DAY_MS = 24 * 60 * 60 * 1000
+BTC_GBP = 50_000.0
+RATES = {"gbp": 1.0, "usd": 1.25, "eur": 1.1}
+
+
+def candles(currency, end_ms, n=20):
+    close = BTC_GBP * RATES[currency]
+    rows = [[end_ms - i * 4 * DAY_MS, close, close, close, close] for i in range(n)]
+    return OhlcBatch.from_rows("bitcoin", "Bitcoin", currency, rows)
+
+
+@pytest.fixture
+def cache_file(tmp_path, monkeypatch):
+    path = tmp_path / "fx_rates.json"
+    monkeypatch.setattr(fx, "FX_CACHE_FILE", path)
+    return path
+
+
+def fake_fetch(end_ms, fail=()):
+    def fetch(coin, currency, days):
+        return None if currency in fail else candles(currency, end_ms)
+
+    return fetch
+
+
+def test_rates_from_reference_coin_are_cached(cache_file):
+    now_ms = int(time.time() * 1000)
+
+    with patch.object(fx, "fetch_coin_ohlc", side_effect=fake_fetch(now_ms)) as fetch:
+        rates = fx.extract_fx_rates(["gbp", "usd", "eur"], base="gbp")
+
+    assert fetch.call_count == 3
+    assert sorted(rates) == ["eur", "usd"]
+    assert len(rates["usd"]) == 20
+    assert all(rate == pytest.approx(1.25) for _, rate in rates["usd"])
+    assert rates["usd"] == sorted(rates["usd"])
+
+    stored = json.loads(cache_file.read_text())
+    assert stored["base"] == "gbp"
+    assert stored["rates"]["eur"] == rates["eur"]
+
+    # Cache is current - no requests at all
+    with patch.object(fx, "fetch_coin_ohlc") as fetch:
+        assert fx.extract_fx_rates(["gbp", "usd", "eur"], base="gbp") == rates
+    fetch.assert_not_called()
+
+
+def test_stale_cache_fetches_only_the_gap(cache_file):
+    now_ms = int(time.time() * 1000)
+    old_end = now_ms - 20 * DAY_MS
+
+    with patch.object(fx, "fetch_coin_ohlc", side_effect=fake_fetch(old_end)):
+        fx.extract_fx_rates(["gbp", "usd"], base="gbp")
+
+    with patch.object(fx, "fetch_coin_ohlc", side_effect=fake_fetch(now_ms)) as fetch:
+        rates = fx.extract_fx_rates(["gbp", "usd"], base="gbp")
+
+    assert {call.args[2] for call in fetch.call_args_list} == {90}
+    timestamps = [ts for ts, _ in rates["usd"]]
+    assert timestamps[-1] == now_ms
+    assert old_end in timestamps
+
+
+def test_failed_fetch_keeps_cached_rates(cache_file):
+    now_ms = int(time.time() * 1000)
+    old_end = now_ms - 20 * DAY_MS
+
+    with patch.object(fx, "fetch_coin_ohlc", side_effect=fake_fetch(old_end)):
+        cached = fx.extract_fx_rates(["gbp", "usd", "eur"], base="gbp")
+
+    with patch.object(fx, "fetch_coin_ohlc", side_effect=fake_fetch(now_ms, fail={"eur"})):
+        rates = fx.extract_fx_rates(["gbp", "usd", "eur"], base="gbp")
+
+    assert rates["eur"] == cached["eur"]
+    assert rates["usd"][-1][0] == now_ms
+
+
+def test_all_fetches_failing_writes_no_cache_or_snapshot(cache_file):
+    now_ms = int(time.time() * 1000)
+    old_end = now_ms - 20 * DAY_MS
+
+    with patch.object(fx, "fetch_coin_ohlc", side_effect=fake_fetch(old_end)):
+        cached = fx.extract_fx_rates(["gbp", "usd"], base="gbp")
+    cache_mtime = cache_file.stat().st_mtime_ns
+
+    with patch.object(fx, "fetch_coin_ohlc", side_effect=fake_fetch(now_ms, fail={"gbp", "usd"})):
+        rates = fx.extract_fx_rates(["gbp", "usd"], base="gbp")
+
+    assert rates == cached
+    assert cache_file.stat().st_mtime_ns == cache_mtime
+    assert len(fx_archive().snapshots()) == 1
+
+
+def test_cache_for_another_base_is_ignored(cache_file):
+    now_ms = int(time.time() * 1000)
+    cache_file.write_text(json.dumps({"base": "usd", "rates": {"eur": [[now_ms, 0.9]]}}))
+
+    with patch.object(fx, "fetch_coin_ohlc", side_effect=fake_fetch(now_ms)) as fetch:
+        rates = fx.extract_fx_rates(["gbp", "eur"], base="gbp")
+
+    assert fetch.call_count == 2
+    assert rates["eur"][-1] == [now_ms, pytest.approx(1.1)]
+
+
+def test_single_currency_needs_no_rates(cache_file):
+    with patch.object(fx, "fetch_coin_ohlc") as fetch:
+        assert fx.extract_fx_rates(["gbp"], base="gbp") == {}
+    fetch.assert_not_called()
@@ -1,11 +1,34 @@
 import json
+import shutil
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import patch, MagicMock
-from src.extraction.extract_historical_prices import extract_historical_ohlc
+from src.extraction.raw_archive import ohlc_archive
+from src.extraction.extract_historical_prices import (
+    extract_historical_ohlc,
+    incremental_days,
+)
+from src.utils.ohlc_batch import OhlcBatch
+from src.utils.rate_limiter import TokenBucket
+from tests.conftest import fast_client
 
 MOCK_COINS = [{"id": "bitcoin", "name": "Bitcoin"}]
 
 VALID_10_ROWS = [[1700000000000 + i, 1, 2, 3, 4] for i in range(10)]
-BACKUP_DATA = [{"coin_id": "bitcoin"}]
+BACKUP_BATCH = OhlcBatch.from_rows(
+    "bitcoin", "Bitcoin", "gbp", [[1600000000000 + i, 5, 6, 7, 8] for i in range(10)]
+)
+BACKUP_DATA = [BACKUP_BATCH.to_json()]
+# Backups written before OhlcBatch: one dict per candle
+LEGACY_BACKUP_DATA = BACKUP_BATCH.to_records()
+
+
+def records(batches):
+    """
+    Extracted batches as one dict per candle, for easy assertions
+    """
+    return [r for batch in batches for r in batch.to_records()]
 
 
 def test_extract_success(tmp_path):
@@ -19,14 +42,37 @@ def test_extract_success(tmp_path):
         mock_resp.json.return_value = VALID_10_ROWS
 
         with patch(
-            "src.extraction.extract_historical_prices.requests.get",
+            "requests.Session.get",
             return_value=mock_resp,
         ):
-            with patch("src.extraction.extract_historical_prices.time.sleep"):
-                results = extract_historical_ohlc(MOCK_COINS)
+            results = extract_historical_ohlc(MOCK_COINS)
+
+    assert len(records(results)) == 10
+    assert not fake_backup.exists()  # runs are archived instead
+
+    archive = ohlc_archive()
+    [snapshot] = archive.snapshots()
+    assert snapshot["rows"] == 10 and snapshot["file"].endswith(".arrow")
+    assert records(archive.read(snapshot["id"])) == records(results)
+
 
-    assert len(results) == 10
-    assert fake_backup.exists()  # backup written on success
+def test_failed_coin_without_cache_uses_latest_archived_batch(tmp_path, historical_cache_dir):
+    ok = MagicMock(status_code=200)
+    ok.json.return_value = VALID_10_ROWS
+    with patch("requests.Session.get", return_value=ok):
+        first = extract_historical_ohlc(MOCK_COINS)
+
+    # Per-coin cache lost - the archive is the only copy left
+    shutil.rmtree(historical_cache_dir)
+    bad = MagicMock(status_code=200)
+    bad.json.return_value = VALID_10_ROWS[:3]
+    with patch("src.extraction.extract_historical_prices.BACKUP_FILE", tmp_path / "none.json"):
+        with patch("requests.Session.get", return_value=bad):
+            second = extract_historical_ohlc(MOCK_COINS)
+
+    assert records(second) == records(first)
+    # Nothing was fetched, so nothing new was archived
+    assert len(ohlc_archive().snapshots()) == 1
 
 
 def test_extract_fails_if_less_than_10_rows_no_backup(tmp_path):
@@ -40,11 +86,10 @@ def test_extract_fails_if_less_than_10_rows_no_backup(tmp_path):
         mock_resp.json.return_value = VALID_10_ROWS[:3]
 
         with patch(
-            "src.extraction.extract_historical_prices.requests.get",
+            "requests.Session.get",
             return_value=mock_resp,
         ):
-            with patch("src.extraction.extract_historical_prices.time.sleep"):
-                results = extract_historical_ohlc(MOCK_COINS)
+            results = extract_historical_ohlc(MOCK_COINS)
 
     assert results == []
 
@@ -61,13 +106,12 @@ def test_extract_less_than_10_rows_loads_backup(tmp_path):
         mock_resp.json.return_value = VALID_10_ROWS[:2]
 
         with patch(
-            "src.extraction.extract_historical_prices.requests.get",
+            "requests.Session.get",
             return_value=mock_resp,
         ):
-            with patch("src.extraction.extract_historical_prices.time.sleep"):
-                results = extract_historical_ohlc(MOCK_COINS)
+            results = extract_historical_ohlc(MOCK_COINS)
 
-    assert results == BACKUP_DATA
+    assert records(results) == BACKUP_BATCH.to_records()
 
 
 def test_extract_api_error_no_backup(tmp_path):
@@ -80,18 +124,17 @@ def test_extract_api_error_no_backup(tmp_path):
         "src.extraction.extract_historical_prices.BACKUP_FILE", fake_backup
     ):
         with patch(
-            "src.extraction.extract_historical_prices.requests.get",
+            "requests.Session.get",
             return_value=mock_resp,
         ):
-            with patch("src.extraction.extract_historical_prices.time.sleep"):
-                results = extract_historical_ohlc(MOCK_COINS)
+            results = extract_historical_ohlc(MOCK_COINS)
 
     assert results == []
 
 
 def test_extract_api_error_loads_backup(tmp_path):
     fake_backup = tmp_path / "backup.json"
-    fake_backup.write_text(json.dumps(BACKUP_DATA))
+    fake_backup.write_text(json.dumps(LEGACY_BACKUP_DATA))
 
     mock_resp = MagicMock()
     mock_resp.raise_for_status.side_effect = Exception("error")
@@ -100,13 +143,12 @@ def test_extract_api_error_loads_backup(tmp_path):
         "src.extraction.extract_historical_prices.BACKUP_FILE", fake_backup
     ):
         with patch(
-            "src.extraction.extract_historical_prices.requests.get",
+            "requests.Session.get",
             return_value=mock_resp,
         ):
-            with patch("src.extraction.extract_historical_prices.time.sleep"):
-                results = extract_historical_ohlc(MOCK_COINS)
+            results = extract_historical_ohlc(MOCK_COINS)
 
-    assert results == BACKUP_DATA
+    assert records(results) == LEGACY_BACKUP_DATA
 
 
 def test_extract_empty_response_no_backup(tmp_path):
@@ -120,10 +162,286 @@ def test_extract_empty_response_no_backup(tmp_path):
         "src.extraction.extract_historical_prices.BACKUP_FILE", fake_backup
     ):
         with patch(
-            "src.extraction.extract_historical_prices.requests.get",
+            "requests.Session.get",
             return_value=mock_resp,
         ):
-            with patch("src.extraction.extract_historical_prices.time.sleep"):
-                results = extract_historical_ohlc(MOCK_COINS)
+            results = extract_historical_ohlc(MOCK_COINS)
+
+    assert results == []
+
+
+class StubCoinGecko:
+    """
+    Minimal local CoinGecko /ohlc stub served from a background thread
+    - Every coin returns VALID_10_ROWS after a short artificial latency
+    - Coins listed in `rate_limited` answer 429 + Retry-After once first
+    - Coins listed in `failing` always answer 404
+    - Tracks the peak number of requests being served at the same time
+    """
+
+    def __init__(self, latency=0.1, rate_limited=(), failing=()):
+        self.latency = latency
+        self.rate_limited = set(rate_limited)
+        self.failing = set(failing)
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                coin_id = self.path.split("/")[2]
+
+                with stub.lock:
+                    stub.requests.append(coin_id)
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                    limited = coin_id in stub.rate_limited
+                    stub.rate_limited.discard(coin_id)
+
+                time.sleep(stub.latency)
+
+                if limited:
+                    self.send_response(429)
+                    self.send_header("Retry-After", "0")
+                    body = b"{}"
+                elif coin_id in stub.failing:
+                    self.send_response(404)
+                    body = b"{}"
+                else:
+                    self.send_response(200)
+                    body = json.dumps(VALID_10_ROWS).encode()
+
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+                with stub.lock:
+                    stub.in_flight -= 1
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url_template(self):
+        port = self.server.server_address[1]
+        return (
+            f"http://127.0.0.1:{port}/coins/{{coin}}/ohlc?"
+            "vs_currency={currency}&days={days}"
+        )
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+STUB_COINS = [{"id": f"coin{i}", "name": f"Coin {i}"} for i in range(6)]
+
+
+def test_concurrent_fetch_against_stub_server(tmp_path):
+    with StubCoinGecko(latency=0.2) as stub:
+        with patch(
+            "src.extraction.extract_historical_prices.HISTORICAL_API",
+            stub.url_template,
+        ), patch(
+            "src.extraction.extract_historical_prices.BACKUP_FILE",
+            tmp_path / "backup.json",
+        ):
+            start = time.monotonic()
+            results = records(extract_historical_ohlc(STUB_COINS, max_workers=6))
+            elapsed = time.monotonic() - start
+
+    assert len(results) == 10 * len(STUB_COINS)
+    # Output keeps the configured coin order
+    assert [r["coin_id"] for r in results[::10]] == [c["id"] for c in STUB_COINS]
+    assert stub.max_in_flight > 1
+    # Serial fetching would take at least 6 * 0.2s
+    assert elapsed < 0.2 * len(STUB_COINS)
+
+
+def test_wall_clock_bounded_by_rate_limit(tmp_path):
+    # 600 calls/min = one call every 0.1s after the single burst token
+    limiter = TokenBucket(calls_per_minute=600, burst=1)
+
+    with StubCoinGecko(latency=0.0) as stub:
+        with patch(
+            "src.extraction.extract_historical_prices.HISTORICAL_API",
+            stub.url_template,
+        ), patch(
+            "src.extraction.extract_historical_prices.BACKUP_FILE",
+            tmp_path / "backup.json",
+        ), patch(
+            "src.utils.http_client._shared_client", fast_client(limiter)
+        ):
+            start = time.monotonic()
+            results = records(extract_historical_ohlc(STUB_COINS, max_workers=6))
+            elapsed = time.monotonic() - start
+
+    assert len(results) == 10 * len(STUB_COINS)
+    assert elapsed >= 0.1 * (len(STUB_COINS) - 1) * 0.9
+    assert elapsed < 3.0
+
+
+def test_rate_limited_coin_is_retried_after_retry_after(tmp_path):
+    with StubCoinGecko(latency=0.0, rate_limited={"coin2"}) as stub:
+        with patch(
+            "src.extraction.extract_historical_prices.HISTORICAL_API",
+            stub.url_template,
+        ), patch(
+            "src.extraction.extract_historical_prices.BACKUP_FILE",
+            tmp_path / "backup.json",
+        ):
+            results = records(extract_historical_ohlc(STUB_COINS, max_workers=3))
+
+    assert len(results) == 10 * len(STUB_COINS)
+    assert stub.requests.count("coin2") == 2
+
+
+def _extract_from_stub(stub, tmp_path, **kwargs):
+    with patch(
+        "src.extraction.extract_historical_prices.HISTORICAL_API",
+        stub.url_template,
+    ), patch(
+        "src.extraction.extract_historical_prices.BACKUP_FILE",
+        tmp_path / "backup.json",
+    ):
+        return records(extract_historical_ohlc(STUB_COINS, max_workers=3, **kwargs))
+
+
+def test_failed_coin_keeps_others_and_next_run_retries_only_it(tmp_path):
+    with StubCoinGecko(latency=0.0, failing={"coin3"}) as stub:
+        first = _extract_from_stub(stub, tmp_path)
+
+    # No cache or backup for coin3 yet - the other coins are still returned
+    assert {r["coin_id"] for r in first} == {c["id"] for c in STUB_COINS} - {"coin3"}
+    assert not (tmp_path / "backup.json").exists()
+
+    with StubCoinGecko(latency=0.0) as stub:
+        second = _extract_from_stub(stub, tmp_path)
+
+    # Everything else is still fresh in the per-coin cache
+    assert stub.requests == ["coin3"]
+    assert [r["coin_id"] for r in second[::10]] == [c["id"] for c in STUB_COINS]
+
+
+def test_failed_coin_falls_back_to_its_cached_rows(tmp_path, historical_cache_dir):
+    with StubCoinGecko(latency=0.0) as stub:
+        _extract_from_stub(stub, tmp_path)
+
+    with StubCoinGecko(latency=0.0, failing={"coin2"}) as stub:
+        # Expired cache - every coin is refetched
+        results = _extract_from_stub(stub, tmp_path, cache_ttl_hours=0)
+
+    assert sorted(stub.requests) == sorted(c["id"] for c in STUB_COINS)
+    assert len(results) == 10 * len(STUB_COINS)
+    assert [r["timestamp_ms"] for r in results if r["coin_id"] == "coin2"] == [row[0] for row in VALID_10_ROWS]
+
+    entry = json.loads((historical_cache_dir / "coin2_gbp.json").read_text())
+    assert "failed_at_ms" in entry and len(entry["batch"]["candles"]) == 10
+
+    # coin2 is retried on the next run even though its rows are recent
+    with StubCoinGecko(latency=0.0) as stub:
+        _extract_from_stub(stub, tmp_path)
+    assert stub.requests == ["coin2"]
+
+
+def test_cached_window_smaller_than_request_is_refetched(tmp_path):
+    with StubCoinGecko(latency=0.0) as stub:
+        _extract_from_stub(stub, tmp_path, days=90)
+        _extract_from_stub(stub, tmp_path, days=365)
+
+    assert len(stub.requests) == 2 * len(STUB_COINS)
+
+
+def test_failed_coin_ignores_fallbacks_shorter_than_the_window(tmp_path):
+    # Incremental tails only, in both the cache and the archive
+    with StubCoinGecko(latency=0.0) as stub:
+        _extract_from_stub(stub, tmp_path, days=7)
+
+    with StubCoinGecko(latency=0.0, failing={"coin2"}) as stub:
+        results = _extract_from_stub(stub, tmp_path, days=365)
+
+    # Left out, so a full rewrite keeps its stored rows instead
+    assert "coin2" not in {r["coin_id"] for r in results}
+    assert len(results) == 10 * (len(STUB_COINS) - 1)
+
+    with StubCoinGecko(latency=0.0, failing={"coin2"}) as stub:
+        results = _extract_from_stub(stub, tmp_path, days=7)
+
+    assert "coin2" in {r["coin_id"] for r in results}
+
+
+DAY_MS = 24 * 60 * 60 * 1000
+NOW_MS = 1_700_000_000_000
+
+
+def test_incremental_days_skips_when_no_new_candle_due():
+    # 365-day windows return 4-day candles
+    assert incremental_days(NOW_MS - 2 * DAY_MS, 365, NOW_MS) is None
+
+
+def test_incremental_days_picks_smallest_matching_window():
+    # Gap of 5 days at 4-day granularity: 90 is the smallest 4-day window
+    assert incremental_days(NOW_MS - 5 * DAY_MS, 365, NOW_MS) == 90
+    assert incremental_days(NOW_MS - 100 * DAY_MS, 365, NOW_MS) == 180
+    # 30-day windows use 4-hour candles, as do 7 and 14 days
+    assert incremental_days(NOW_MS - 3 * DAY_MS, 30, NOW_MS) == 7
+    assert incremental_days(NOW_MS - 10 * DAY_MS, 30, NOW_MS) == 14
+
+
+def test_incremental_days_falls_back_to_full_window():
+    assert incremental_days(NOW_MS - 400 * DAY_MS, 365, NOW_MS) == 365
+
+
+def test_incremental_only_requests_stale_coins(tmp_path):
+    coins = [
+        {"id": "bitcoin", "name": "Bitcoin"},
+        {"id": "ethereum", "name": "Ethereum"},
+    ]
+    now_ms = 1_700_000_000_000
+    since = {"bitcoin": now_ms - DAY_MS, "ethereum": now_ms - 10 * DAY_MS}
+
+    mock_resp = MagicMock()
+    mock_resp.status_code = 200
+    mock_resp.json.return_value = VALID_10_ROWS
+
+    with patch(
+        "src.extraction.extract_historical_prices.BACKUP_FILE",
+        tmp_path / "backup.json",
+    ), patch(
+        "src.extraction.extract_historical_prices.time.time",
+        return_value=now_ms / 1000,
+    ), patch("requests.Session.get", return_value=mock_resp) as mock_get:
+        results = extract_historical_ohlc(coins, since=since)
+
+    mock_get.assert_called_once()
+    assert "/coins/ethereum/ohlc" in mock_get.call_args.args[0]
+    assert "days=90" in mock_get.call_args.args[0]
+    assert [b.coin_id for b in results] == ["ethereum"]
+
+
+def test_incremental_up_to_date_makes_no_requests(tmp_path):
+    now_ms = 1_700_000_000_000
+    fake_backup = tmp_path / "backup.json"
+
+    with patch(
+        "src.extraction.extract_historical_prices.BACKUP_FILE", fake_backup
+    ), patch(
+        "src.extraction.extract_historical_prices.time.time",
+        return_value=now_ms / 1000,
+    ), patch("requests.Session.get") as mock_get:
+        results = extract_historical_ohlc(MOCK_COINS, since={"bitcoin": now_ms})
 
     assert results == []
+    mock_get.assert_not_called()
+    assert not fake_backup.exists()
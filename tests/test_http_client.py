@@ -0,0 +1,135 @@
+import json
+import threading
+import pytest
+import requests
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock, patch
+from src.utils.http_client import HttpClient
+from src.utils.rate_limiter import TokenBucket
+
+
+class KeepAliveStub:
+    """
+    Local HTTP/1.1 server that replays a queue of status codes, then 200s
+    """
+
+    def __init__(self, statuses=(), headers=None):
+        self.statuses = list(statuses)
+        self.headers = headers or {}
+        self.hits = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                stub.hits += 1
+                status = stub.statuses.pop(0) if stub.statuses else 200
+                body = json.dumps({"ok": status == 200}).encode()
+
+                self.send_response(status)
+                for name, value in stub.headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}/ping"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def make_client(**kwargs):
+    sleeps = []
+    client = HttpClient(sleep=sleeps.append, **kwargs)
+    return client, sleeps
+
+
+def test_connections_are_reused_across_requests():
+    client, _ = make_client()
+
+    with KeepAliveStub() as stub:
+        for _ in range(5):
+            assert client.get(stub.url).status_code == 200
+
+    stats = client.stats()
+    assert stats["requests"] == 5
+    assert stats["connections_opened"] == 1
+    assert stats["connections_reused"] == 4
+
+
+def test_transient_5xx_is_retried_with_backoff():
+    client, sleeps = make_client(max_retries=3, backoff_base=1.0)
+
+    with KeepAliveStub(statuses=[503, 502]) as stub:
+        response = client.get(stub.url)
+
+    assert response.status_code == 200
+    assert stub.hits == 3
+    assert client.stats()["retries"] == 2
+    # Full jitter: each delay is within [0, base * 2**attempt]
+    assert 0 <= sleeps[0] <= 1.0
+    assert 0 <= sleeps[1] <= 2.0
+
+
+def test_retries_exhausted_returns_last_response():
+    client, _ = make_client(max_retries=2)
+
+    with KeepAliveStub(statuses=[500, 500, 500, 500]) as stub:
+        response = client.get(stub.url)
+
+    assert response.status_code == 500
+    assert stub.hits == 3
+
+
+def test_retry_after_pauses_shared_limiter():
+    limiter = MagicMock(spec=TokenBucket)
+    client, sleeps = make_client(rate_limiter=limiter)
+
+    with KeepAliveStub(statuses=[429], headers={"Retry-After": "7"}) as stub:
+        response = client.get(stub.url)
+
+    assert response.status_code == 200
+    limiter.pause.assert_called_once_with(7.0)
+    assert limiter.acquire.call_count == 2
+    assert sleeps == []
+
+
+def test_429_without_retry_after_uses_default_pause():
+    limiter = MagicMock(spec=TokenBucket)
+    client, sleeps = make_client(rate_limiter=limiter, rate_limit_pause=60.0)
+
+    with KeepAliveStub(statuses=[429]) as stub:
+        response = client.get(stub.url)
+
+    assert response.status_code == 200
+    limiter.pause.assert_called_once_with(60.0)
+    assert sleeps == []
+
+
+def test_timeouts_retried_then_reraised():
+    client, sleeps = make_client(max_retries=2)
+
+    with patch.object(
+        client.session, "get", side_effect=requests.exceptions.Timeout("slow")
+    ) as mock_get:
+        with pytest.raises(requests.exceptions.Timeout):
+            client.get("http://example.invalid")
+
+    assert mock_get.call_count == 3
+    assert len(sleeps) == 2
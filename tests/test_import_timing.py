@@ -0,0 +1,35 @@
+import sys
+from src.utils import import_timing
+from src.utils.import_timing import import_timings, log_import_report, timed_imports
+
+
+def test_timed_imports_counts_only_new_modules(monkeypatch, caplog):
+    monkeypatch.setattr(import_timing, "_timings", {})
+    monkeypatch.delitem(sys.modules, "colorsys", raising=False)
+
+    with timed_imports("fresh"):
+        import colorsys  # noqa: F401
+    with timed_imports("cached"):
+        import colorsys  # noqa: F401,F811
+
+    fresh, cached = import_timings()
+    assert (fresh.group, fresh.new_modules) == ("fresh", 1)
+    assert (cached.group, cached.new_modules) == ("cached", 0)
+
+    with caplog.at_level("INFO"):
+        log_import_report()
+    assert "| fresh" in caplog.text
+    assert "total" in caplog.text
+
+
+def test_repeated_groups_are_summed_not_appended(monkeypatch):
+    monkeypatch.setattr(import_timing, "_timings", {})
+
+    # As a daemon re-enters the same groups on every run
+    for _ in range(100):
+        with timed_imports("current extract"):
+            import colorsys  # noqa: F401
+
+    (timing,) = import_timings()
+    assert timing.group == "current extract"
+    assert timing.seconds > 0
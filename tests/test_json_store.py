@@ -0,0 +1,59 @@
+import json
+import os
+import pytest
+from unittest.mock import patch
+from src.utils.json_store import read_json_cached, write_json_atomic
+
+
+def test_missing_file_returns_default(tmp_path):
+    assert read_json_cached(tmp_path / "missing.json", default={}) == {}
+
+
+def test_unchanged_file_is_parsed_once(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text(json.dumps({"a": 1}))
+
+    with patch("src.utils.json_store.json.load", wraps=json.load) as load:
+        first = read_json_cached(path)
+        second = read_json_cached(path)
+
+    assert first == {"a": 1}
+    assert second is first
+    assert load.call_count == 1
+
+
+def test_changed_file_is_reparsed(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text(json.dumps({"a": 1}))
+    read_json_cached(path)
+
+    path.write_text(json.dumps({"a": 22}))
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert read_json_cached(path) == {"a": 22}
+
+
+def test_write_is_compact_atomic_and_primes_cache(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text("old")
+
+    write_json_atomic(path, {"b": [1, 2]})
+
+    assert path.read_text() == '{"b":[1,2]}'
+    assert [p.name for p in tmp_path.iterdir()] == ["data.json"]
+
+    with patch("src.utils.json_store.json.load") as load:
+        assert read_json_cached(path) == {"b": [1, 2]}
+    load.assert_not_called()
+
+
+def test_failed_write_keeps_old_file(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text('{"ok":true}')
+
+    with pytest.raises(TypeError):
+        write_json_atomic(path, {"bad": object()})
+
+    assert path.read_text() == '{"ok":true}'
+    assert [p.name for p in tmp_path.iterdir()] == ["data.json"]
@@ -2,6 +2,13 @@ import pytest
 from unittest.mock import patch, MagicMock
 import pandas as pd
 from src.load.load_current_prices import load_current_prices
+from src.load.storage import ParquetBackend
+
+
+@pytest.fixture(autouse=True)
+def csv_backend(monkeypatch):
+    """These tests cover CSV as the primary backend"""
+    monkeypatch.setattr("src.load.load_current_prices.STORAGE_BACKEND", "csv")
 
 
 def fake_cleaned_dir(tmp_path, exists=True):
@@ -74,3 +81,52 @@ def test_load_raises_error_on_write_failure(tmp_path):
 
             with pytest.raises(Exception):
                 load_current_prices(df)
+
+
+def test_load_parquet_primary_with_csv_export(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.load.load_current_prices.STORAGE_BACKEND", "parquet")
+    monkeypatch.setattr("src.load.load_current_prices.EXPORT_CSV", True)
+    monkeypatch.setattr("src.load.load_current_prices.CLEANED_DIR", tmp_path)
+
+    df = pd.DataFrame({"coin_id": ["bitcoin"], "price": [50000.0]})
+
+    df = df.assign(timestamp=pd.Timestamp("2024-01-01", tz="UTC"))
+
+    result_path = load_current_prices(df)
+
+    assert result_path.endswith(".arrows")
+    assert (tmp_path / "current_crypto_prices.csv").exists()
+
+
+def test_load_parquet_appends_snapshots(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.load.load_current_prices.STORAGE_BACKEND", "parquet")
+    monkeypatch.setattr("src.load.load_current_prices.EXPORT_CSV", False)
+    monkeypatch.setattr("src.load.load_current_prices.CLEANED_DIR", tmp_path)
+
+    for minute, price in enumerate([100.0, 101.0, 102.0]):
+        load_current_prices(
+            pd.DataFrame(
+                {
+                    "timestamp": [pd.Timestamp("2024-01-01", tz="UTC")
+                                  + pd.Timedelta(minutes=minute)],
+                    "coin_id": ["bitcoin"],
+                    "price": [price],
+                }
+            )
+        )
+
+    backend = ParquetBackend(tmp_path)
+    assert backend.read_current()["price"].tolist() == [102.0]
+    assert backend.read_current_history()["price"].tolist() == [100.0, 101.0, 102.0]
+
+
+def test_load_parquet_empty_first_snapshot(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.load.load_current_prices.STORAGE_BACKEND", "parquet")
+    monkeypatch.setattr("src.load.load_current_prices.EXPORT_CSV", False)
+    monkeypatch.setattr("src.load.load_current_prices.CLEANED_DIR", tmp_path)
+
+    # Nothing is appended, so the snapshot store's directory is never created
+    result_path = load_current_prices(pd.DataFrame(columns=["timestamp", "coin_id", "price"]))
+
+    assert result_path == str(ParquetBackend(tmp_path).snapshots.root)
+    assert ParquetBackend(tmp_path).read_current().empty
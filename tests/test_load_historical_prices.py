@@ -1,6 +1,16 @@
 import pandas as pd
+import pytest
 from pathlib import Path
-from src.load.load_historical_prices import load_historical_prices
+from src.load.load_historical_prices import (
+    load_historical_prices,
+    read_historical_prices,
+)
+
+
+@pytest.fixture(autouse=True)
+def csv_backend(monkeypatch):
+    """These tests cover CSV as the primary backend"""
+    monkeypatch.setattr("src.load.load_historical_prices.STORAGE_BACKEND", "csv")
 
 
 def test_load_historical_creates_files(tmp_path, monkeypatch):
@@ -91,3 +101,59 @@ def test_rows_written_correctly(tmp_path, monkeypatch):
 
     assert clean_output.count("\n") == 3  # header + 2 rows
     assert stats_output.count("\n") == 2  # header + 1 row
+
+
+def test_read_historical_prices_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        "src.load.load_historical_prices.CLEANED_DIR", tmp_path
+    )
+
+    clean_df = pd.DataFrame(
+        {
+            "coin_id": ["btc"],
+            "timestamp_ms": [1704067200000],
+            "timestamp": [pd.Timestamp("2024-01-01")],
+            "close": [1.0],
+        }
+    )
+    load_historical_prices({"clean": clean_df, "stats": pd.DataFrame()})
+
+    df = read_historical_prices()
+
+    assert len(df) == 1
+    assert pd.api.types.is_datetime64_any_dtype(df["timestamp"])
+
+
+def test_read_historical_prices_missing_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        "src.load.load_historical_prices.CLEANED_DIR", tmp_path
+    )
+
+    assert read_historical_prices().empty
+
+
+def test_load_historical_parquet_primary_with_csv_export(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        "src.load.load_historical_prices.STORAGE_BACKEND", "parquet"
+    )
+    monkeypatch.setattr("src.load.load_historical_prices.EXPORT_CSV", True)
+    monkeypatch.setattr(
+        "src.load.load_historical_prices.CLEANED_DIR", tmp_path
+    )
+
+    clean_df = pd.DataFrame(
+        {
+            "coin_id": ["btc", "btc", "eth"],
+            "timestamp_ms": [1704067200000, 1706745600000, 1704067200000],
+            "timestamp": pd.to_datetime(["2024-01-01", "2024-02-01", "2024-01-01"]),
+            "close": [1.0, 2.0, 3.0],
+        }
+    )
+    stats_df = pd.DataFrame({"coin_id": ["btc", "eth"], "max_close": [2.0, 3.0]})
+
+    result = load_historical_prices({"clean": clean_df, "stats": stats_df})
+
+    assert Path(result["clean_path"], "coin_id=btc", "part-0.parquet").is_file()
+    assert (tmp_path / "historical_crypto_prices.csv").exists()
+    assert len(read_historical_prices()) == 3
+    assert read_historical_prices(coin_ids=["eth"])["close"].tolist() == [3.0]
@@ -0,0 +1,105 @@
+import logging
+import logging.handlers
+import threading
+import pytest
+from src.utils import logger as logger_module
+from src.utils.logger import get_logger, stop_logging
+
+
+@pytest.fixture
+def fresh_logging(tmp_path, monkeypatch):
+    """
+    Process-wide logging state reset, with the log file under tmp_path
+    """
+    monkeypatch.setattr(logger_module, "LOG_DIR", tmp_path)
+    monkeypatch.setattr(logger_module, "_env_loaded", False)
+    monkeypatch.setattr(logger_module, "_handlers", [])
+    monkeypatch.setattr(logger_module, "_listener", None)
+    monkeypatch.setenv("LOG_FILE", "test.log")
+    monkeypatch.setenv("LOG_LEVEL", "INFO")
+    created = []
+
+    def make(name):
+        log = get_logger(f"test_logger.{name}")
+        created.append(log)
+        return log
+
+    yield make
+
+    stop_logging()
+    for log in created:
+        for handler in log.handlers[:]:
+            log.removeHandler(handler)
+            handler.close()
+
+
+def test_env_is_loaded_once(fresh_logging, monkeypatch):
+    calls = []
+    monkeypatch.setattr(logger_module, "load_dotenv", lambda path: calls.append(path))
+
+    fresh_logging("a")
+    fresh_logging("b")
+
+    assert calls == [".env.dev"]
+
+
+def test_loggers_share_one_queue_handler(fresh_logging, tmp_path):
+    a = fresh_logging("a")
+    b = fresh_logging("b")
+
+    assert len(a.handlers) == 1
+    assert a.handlers == b.handlers
+    assert isinstance(a.handlers[0], logging.handlers.QueueHandler)
+
+    a.info("from a")
+    b.warning("from b")
+    stop_logging()
+
+    lines = (tmp_path / "test.log").read_text().splitlines()
+    assert [line.split(" | ", 1)[1] for line in lines] == [
+        "test_logger.a | INFO | from a",
+        "test_logger.b | WARNING | from b",
+    ]
+
+
+def test_queue_mode_can_be_disabled(fresh_logging, tmp_path, monkeypatch):
+    monkeypatch.setenv("LOG_QUEUE", "0")
+
+    log = fresh_logging("direct")
+    log.info("written inline")
+
+    assert {type(h) for h in log.handlers} == {logging.FileHandler, logging.StreamHandler}
+    assert "written inline" in (tmp_path / "test.log").read_text()
+
+
+def test_debug_arguments_are_not_formatted_below_level(fresh_logging):
+    class Loud:
+        def __str__(self):
+            raise AssertionError("debug argument was formatted")
+
+    log = fresh_logging("lazy")
+    log.debug("value %s", Loud())
+
+
+def test_records_are_formatted_on_the_listener_thread(fresh_logging, tmp_path):
+    formatted_on = []
+
+    class Traced:
+        def __str__(self):
+            formatted_on.append(threading.current_thread())
+            return "traced"
+
+    log = fresh_logging("listener")
+    # Keep pytest's capture handler (on the root logger) out of it
+    log.propagate = False
+    log.info("value %s", Traced())
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        log.exception("failed")
+    stop_logging()
+
+    assert formatted_on and threading.main_thread() not in formatted_on
+    text = (tmp_path / "test.log").read_text()
+    assert "value traced" in text
+    assert "ValueError: boom" in text and "Traceback" in text
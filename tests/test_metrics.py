@@ -0,0 +1,102 @@
+import json
+import tracemalloc
+import pandas as pd
+import pytest
+from src.utils.branches import run_branches
+from src.utils.metrics import PROMETHEUS_FILE, RUNS_FILE
+from src.utils.timer import timer
+
+
+@timer("Transform")
+def _transform(records):
+    return pd.DataFrame(records).head(2)
+
+
+@timer("Branch A")
+def _branch_a():
+    return _transform([{"x": 1}, {"x": 2}, {"x": 3}])
+
+
+@timer("Branch B")
+def _branch_b():
+    return None
+
+
+@timer("Pipeline")
+def _pipeline():
+    run_branches({"a": _branch_a, "b": _branch_b}, parallel=True)
+
+
+def _runs(metrics_dir):
+    return [json.loads(line) for line in (metrics_dir / RUNS_FILE).read_text().splitlines()]
+
+
+def test_nested_stages_are_reported_once_per_run(metrics_dir):
+    _pipeline()
+
+    runs = _runs(metrics_dir)
+    assert len(runs) == 1
+    assert runs[0]["run"] == "Pipeline"
+
+    stages = {s["path"]: s for s in runs[0]["stages"]}
+    assert set(stages) == {
+        "Pipeline",
+        "Pipeline > Branch A",
+        "Pipeline > Branch A > Transform",
+        "Pipeline > Branch B",
+    }
+
+    transform = stages["Pipeline > Branch A > Transform"]
+    assert transform["depth"] == 2
+    assert transform["rows_in"] == 3
+    assert transform["rows_out"] == 2
+    assert transform["status"] == "ok"
+    assert transform["wall_seconds"] >= 0
+    assert transform["cpu_seconds"] >= 0
+    assert stages["Pipeline"]["wall_seconds"] >= transform["wall_seconds"]
+
+
+def test_prometheus_textfile_keeps_latest_value_per_stage(metrics_dir):
+    _transform([{"x": 1}])
+    _branch_b()
+
+    text = (metrics_dir / PROMETHEUS_FILE).read_text()
+
+    assert "# TYPE etl_stage_duration_seconds gauge" in text
+    assert 'etl_stage_rows_out{stage="Transform"} 1' in text
+    assert 'etl_stage_success{stage="Transform"} 1' in text
+    assert 'etl_stage_success{stage="Branch B"} 1' in text
+    assert len(_runs(metrics_dir)) == 2
+
+
+def test_failed_stage_is_recorded_and_reraised(metrics_dir):
+    @timer("Broken")
+    def broken():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        broken()
+
+    (stage,) = _runs(metrics_dir)[0]["stages"]
+    assert stage["status"] == "error"
+    assert 'etl_stage_success{stage="Broken"} 0' in (metrics_dir / PROMETHEUS_FILE).read_text()
+
+
+def test_tracemalloc_peak_is_opt_in(metrics_dir, monkeypatch):
+    @timer("Allocate")
+    def allocate():
+        data = bytearray(8 * 2**20)
+        del data
+
+    allocate()
+    assert _runs(metrics_dir)[0]["stages"][0]["alloc_peak_mb"] is None
+
+    monkeypatch.setenv("METRICS_TRACEMALLOC", "1")
+    try:
+        allocate()
+    finally:
+        tracemalloc.stop()
+
+    stage = _runs(metrics_dir)[1]["stages"][0]
+    assert stage["alloc_peak_mb"] >= 7.5
+    assert stage["alloc_delta_mb"] < 1
@@ -0,0 +1,70 @@
+import json
+import math
+import numpy as np
+from src.utils.ohlc_batch import OHLC_DTYPE, OhlcBatch, load_batches
+
+ROWS = [[1600000000000 + i * 3_600_000, 1.0 + i, 2.0 + i, 0.5 + i, 1.5 + i] for i in range(5)]
+
+
+def _batch(coin_id="bitcoin", currency="gbp", rows=ROWS):
+    return OhlcBatch.from_rows(coin_id, coin_id.title(), currency, rows)
+
+
+def test_from_rows_is_columnar():
+    batch = _batch()
+
+    assert len(batch) == 5
+    assert batch.candles.dtype == OHLC_DTYPE
+    assert batch.candles["timestamp_ms"].tolist() == [r[0] for r in ROWS]
+    assert batch.candles["close"].tolist() == [r[4] for r in ROWS]
+
+
+def test_json_round_trip():
+    batch = _batch()
+
+    # Survives a trip through the backup file
+    restored = OhlcBatch.from_json(json.loads(json.dumps(batch.to_json())))
+
+    assert (restored.coin_id, restored.coin_name, restored.currency) == ("bitcoin", "Bitcoin", "gbp")
+    assert np.array_equal(restored.candles, batch.candles)
+    assert restored.digest() == batch.digest()
+
+
+def test_records_round_trip_groups_by_series():
+    records = _batch().to_records() + _batch("ethereum").to_records() + _batch(currency="usd").to_records()
+
+    batches = OhlcBatch.from_records(records)
+
+    assert [(b.coin_id, b.currency, len(b)) for b in batches] == [
+        ("bitcoin", "gbp", 5),
+        ("ethereum", "gbp", 5),
+        ("bitcoin", "usd", 5),
+    ]
+    assert [r for b in batches for r in b.to_records()] == records
+
+
+def test_load_batches_reads_compact_and_legacy_backups():
+    batch = _batch()
+
+    compact = load_batches([batch.to_json()])
+    legacy = load_batches(batch.to_records())
+
+    assert compact[0].digest() == legacy[0].digest() == batch.digest()
+    assert load_batches([]) == []
+
+
+def test_digest_changes_with_values_and_series():
+    changed = [row[:] for row in ROWS]
+    changed[-1][4] += 1
+
+    assert _batch().digest() != _batch(rows=changed).digest()
+    assert _batch().digest() != _batch(currency="usd").digest()
+
+
+def test_non_numeric_prices_become_nan():
+    rows = [ROWS[0], [ROWS[1][0], "n/a", None, 1.0, 2.0]]
+
+    batch = _batch(rows=rows)
+
+    assert math.isnan(batch.candles["open"][1]) and math.isnan(batch.candles["high"][1])
+    assert batch.candles["close"][1] == 2.0
@@ -0,0 +1,95 @@
+import pstats
+import threading
+import pytest
+from src.utils import profiling
+from src.utils.profiling import configure_profiling, profiling_enabled
+from src.utils.timer import timer
+
+
+@pytest.fixture(autouse=True)
+def profile_dir(tmp_path, monkeypatch):
+    path = tmp_path / "profiles"
+    monkeypatch.setattr(profiling, "PROFILE_DIR", path)
+    yield path
+    configure_profiling([])
+
+
+def _busy_inner():
+    return sum(i * i for i in range(20_000))
+
+
+@timer("Inner Stage")
+def _inner():
+    return _busy_inner()
+
+
+@timer("Outer Stage")
+def _outer():
+    return _inner()
+
+
+def test_disabled_by_default_writes_nothing(profile_dir):
+    configure_profiling([])
+
+    _outer()
+
+    assert not profiling_enabled("Outer Stage")
+    assert not profile_dir.exists()
+
+
+def test_selected_stage_is_dumped_as_pstats(profile_dir):
+    configure_profiling(["Inner Stage"])
+
+    _outer()
+
+    (dump,) = profile_dir.glob("*.pstats")
+    assert "inner_stage" in dump.name
+
+    stats = pstats.Stats(str(dump))
+    assert any(func[2] == "_busy_inner" for func in stats.stats)
+
+
+def test_nested_profiled_stages_use_outer_profile(profile_dir):
+    configure_profiling(["*"])
+
+    _outer()
+    _inner()
+
+    names = sorted(p.name.split("-")[1] for p in profile_dir.glob("*.pstats"))
+    assert names == ["inner_stage", "outer_stage"]
+
+
+def test_unknown_profiler_is_rejected():
+    with pytest.raises(ValueError):
+        configure_profiling(["Inner Stage"], profiler="perf")
+
+
+def test_concurrent_stages_profile_one_at_a_time(profile_dir):
+    configure_profiling(["*"])
+    # Both stages are running before either finishes, as with parallel branches
+    both_started = threading.Barrier(2, timeout=5)
+    errors = []
+
+    def stage(name):
+        @timer(name)
+        def run():
+            both_started.wait()
+            return _busy_inner()
+
+        try:
+            run()
+        except Exception as e:  # noqa: BLE001
+            errors.append(e)
+
+    threads = [threading.Thread(target=stage, args=(f"Stage {i}",)) for i in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert len(list(profile_dir.glob("*.pstats"))) == 1
+
+    # The lock is released, so the next stage is profiled again
+    _inner()
+    assert len(list(profile_dir.glob("*.pstats"))) == 2
@@ -0,0 +1,83 @@
+import pytest
+from src.utils.rate_limiter import TokenBucket, parse_retry_after
+
+
+class FakeClock:
+    """Deterministic clock whose sleep() just advances time"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def make_bucket(calls_per_minute=60, burst=1):
+    clock = FakeClock()
+    bucket = TokenBucket(
+        calls_per_minute, burst=burst, clock=clock.time, sleep=clock.sleep
+    )
+    return bucket, clock
+
+
+def test_burst_tokens_are_immediate():
+    bucket, clock = make_bucket(calls_per_minute=60, burst=3)
+
+    for _ in range(3):
+        assert bucket.acquire() == 0.0
+
+    assert clock.now == 0.0
+
+
+def test_steady_rate_after_burst():
+    bucket, clock = make_bucket(calls_per_minute=60, burst=1)
+
+    bucket.acquire()
+    waited = bucket.acquire()
+
+    # 60 calls/min = one token per second
+    assert waited == pytest.approx(1.0)
+    assert clock.now == pytest.approx(1.0)
+
+
+def test_tokens_refill_while_idle_up_to_burst():
+    bucket, clock = make_bucket(calls_per_minute=60, burst=2)
+
+    bucket.acquire()
+    bucket.acquire()
+    clock.now += 100  # idle for a long time
+
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == pytest.approx(1.0)
+
+
+def test_pause_blocks_until_cooldown_passes():
+    bucket, clock = make_bucket(calls_per_minute=6000, burst=5)
+
+    bucket.pause(30)
+    bucket.acquire()
+
+    assert clock.now >= 30
+
+
+def test_invalid_configuration_rejected():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+    with pytest.raises(ValueError):
+        TokenBucket(10, burst=0)
+
+
+def test_parse_retry_after_seconds():
+    assert parse_retry_after("12") == 12.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+
+
+def test_parse_retry_after_http_date_in_past():
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
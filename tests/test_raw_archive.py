@@ -0,0 +1,104 @@
+import pytest
+from src.extraction.raw_archive import JsonArchive, OhlcArchive, snapshot_kind
+from src.utils.ohlc_batch import OhlcBatch
+
+
+def _batch(coin_id, close=1.0, n=5):
+    return OhlcBatch.from_rows(
+        coin_id, coin_id.title(), "gbp", [[1_700_000_000_000 + i, 1.0, 2.0, 0.5, close] for i in range(n)]
+    )
+
+
+def _files(archive):
+    return sorted(p.name for p in archive.dir.iterdir() if p.name != "manifest.json")
+
+
+def test_snapshot_ids_are_unique_ordered_and_typed(tmp_path):
+    archive = JsonArchive("current", tmp_path, keep=10)
+
+    ids = [archive.write({"bitcoin": {"gbp": i}}, good=["bitcoin"]) for i in range(3)]
+
+    assert ids == sorted(ids) and len(set(ids)) == 3
+    assert [e["id"] for e in archive.snapshots()] == ids
+    assert {snapshot_kind(i) for i in ids} == {"current"}
+    with pytest.raises(ValueError):
+        snapshot_kind("backup_current_prices.json")
+
+
+def test_latest_skips_fallback_values(tmp_path):
+    archive = JsonArchive("current", tmp_path, keep=10)
+    archive.write({"bitcoin": {"gbp": 1}, "ethereum": {"gbp": 2}}, good=["bitcoin", "ethereum"])
+    # ethereum failed and was filled in from the backup
+    archive.write({"bitcoin": {"gbp": 3}, "ethereum": {"gbp": 2}}, good=["bitcoin"])
+
+    assert archive.latest(["bitcoin", "ethereum", "solana"]) == {"bitcoin": {"gbp": 3}, "ethereum": {"gbp": 2}}
+
+
+def test_retention_keeps_latest_good_snapshots(tmp_path):
+    archive = JsonArchive("current", tmp_path, keep=2)
+    first = archive.write({"solana": {"gbp": 9}}, good=["solana"])
+    for i in range(4):
+        archive.write({"bitcoin": {"gbp": i}}, good=["bitcoin"])
+
+    kept = [e["id"] for e in archive.snapshots()]
+
+    # The newest two, plus the only good snapshot of solana
+    assert len(kept) == 3 and kept[0] == first
+    assert len(_files(archive)) == 3
+    assert archive.latest(["solana", "bitcoin"]) == {"solana": {"gbp": 9}, "bitcoin": {"gbp": 3}}
+
+
+def test_as_of_returns_the_snapshot_in_use_at_a_time(tmp_path):
+    archive = JsonArchive("fx", tmp_path, keep=10)
+    archive.write({"usd": [[0, 1.2]]}, good=["usd"])
+    archive.write({"usd": [[0, 1.3]]}, good=["usd"])
+    first, second = archive.snapshots()
+
+    assert archive.as_of(first["created_at_ms"] - 1) is None
+    assert archive.as_of(first["created_at_ms"]) == {"usd": [[0, 1.2]]}
+    assert archive.as_of(second["created_at_ms"] + 60_000) == {"usd": [[0, 1.3]]}
+
+
+def test_ohlc_snapshot_round_trip(tmp_path):
+    archive = OhlcArchive(tmp_path, keep=10)
+    batches = [_batch("bitcoin"), _batch("ethereum", n=0), _batch("solana", n=7)]
+
+    snapshot_id = archive.write(batches)
+
+    assert [b.digest() for b in archive.read(snapshot_id)] == [b.digest() for b in batches]
+    assert [b.coin_id for b in archive.read(snapshot_id, ["solana"])] == ["solana"]
+    assert archive.entry(snapshot_id)["rows"] == 12
+
+
+def test_ohlc_latest_reads_each_coins_last_good_batch(tmp_path):
+    archive = OhlcArchive(tmp_path, keep=10)
+    archive.write([_batch("bitcoin", close=1.0), _batch("ethereum", close=1.0)])
+    archive.write([_batch("bitcoin", close=2.0), _batch("ethereum", close=1.0)], failed={"ethereum"})
+
+    latest = archive.latest(["bitcoin", "ethereum", "solana"], "gbp")
+
+    assert sorted(latest) == ["bitcoin", "ethereum"]
+    assert latest["bitcoin"].digest() == _batch("bitcoin", close=2.0).digest()
+    assert latest["ethereum"].digest() == _batch("ethereum", close=1.0).digest()
+    assert archive.latest(["bitcoin"], "usd") == {}
+
+
+def test_ohlc_latest_skips_batches_fetched_for_a_shorter_window(tmp_path):
+    archive = OhlcArchive(tmp_path, keep=10)
+    archive.write([_batch("bitcoin"), _batch("ethereum")], days={"bitcoin": 365, "ethereum": 7})
+
+    assert sorted(archive.latest(["bitcoin", "ethereum"], "gbp", min_days=7)) == ["bitcoin", "ethereum"]
+    assert sorted(archive.latest(["bitcoin", "ethereum"], "gbp", min_days=365)) == ["bitcoin"]
+
+
+def test_aborted_ohlc_write_leaves_archive_unchanged(tmp_path):
+    archive = OhlcArchive(tmp_path, keep=10)
+    archive.write([_batch("bitcoin")])
+
+    writer = archive.writer()
+    writer.add(_batch("bitcoin", close=5.0))
+    writer.abort()
+
+    assert len(archive.snapshots()) == 1
+    assert len(_files(archive)) == 1
+    assert archive.latest(["bitcoin"], "gbp")["bitcoin"].digest() == _batch("bitcoin").digest()
@@ -0,0 +1,299 @@
+import json
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+import pandas as pd
+import pytest
+from scripts import run_etl_pipeline as etl
+from src.utils import content_hash
+from src.utils.metrics import RUNS_FILE
+from src.utils.ohlc_batch import OhlcBatch
+from src.utils.timer import timer
+
+
+def _runs(metrics_dir):
+    return [json.loads(line) for line in (metrics_dir / RUNS_FILE).read_text().splitlines()]
+
+
+@pytest.fixture
+def calls(tmp_path, monkeypatch):
+    """
+    Fake extract/transform/load stages recording which ones ran, and a
+    stored-data version that changes on every load
+    """
+    monkeypatch.setattr(content_hash, "HASH_DIR", tmp_path / "hashes")
+    state = {"calls": [], "version": 0, "payload": {"bitcoin": {"gbp": 1.0}}}
+
+    @timer("Transform Current Crypto Prices")
+    def transform_current(raw, coins, currencies):
+        state["calls"].append("transform")
+        return pd.DataFrame({"price": [1.0]})
+
+    @timer("Load Current Crypto Prices")
+    def load_current(df):
+        state["calls"].append("load")
+        state["version"] += 1
+        return "current.csv"
+
+    monkeypatch.setattr(
+        "src.extraction.extract_current_prices.extract_current_prices",
+        lambda coins, currencies: state["payload"],
+    )
+    monkeypatch.setattr("src.transform.transform_current_prices.transform_current_prices", transform_current)
+    monkeypatch.setattr("src.load.load_current_prices.load_current_prices", load_current)
+    monkeypatch.setattr(etl, "_stored_version", lambda dataset: f"v{state['version']}")
+    return state
+
+
+def test_unchanged_current_payload_skips_transform_and_load(calls, metrics_dir):
+    etl.run_current_etl()
+    etl.run_current_etl()
+
+    assert calls["calls"] == ["transform", "load"]
+    report = _runs(metrics_dir)[-1]
+    assert report["skipped"] == [
+        "Current Price ETL > Transform Current Crypto Prices",
+        "Current Price ETL > Load Current Crypto Prices",
+    ]
+    assert {s["note"] for s in report["stages"] if s["status"] == "skipped"} == {
+        "extracted payload unchanged"
+    }
+
+
+def test_changed_payload_or_stored_data_reruns(calls):
+    etl.run_current_etl()
+
+    calls["payload"] = {"bitcoin": {"gbp": 2.0}}
+    etl.run_current_etl()
+
+    # Stored data replaced behind the pipeline's back
+    calls["version"] += 1
+    etl.run_current_etl()
+
+    assert calls["calls"] == ["transform", "load"] * 3
+
+
+def test_skipping_can_be_disabled(calls, monkeypatch):
+    monkeypatch.setattr(etl, "SKIP_UNCHANGED", False)
+
+    etl.run_current_etl()
+    etl.run_current_etl()
+
+    assert calls["calls"] == ["transform", "load"] * 2
+
+
+def test_unchanged_historical_output_skips_only_load(calls, monkeypatch, metrics_dir):
+    records = [
+        {"coin_id": "bitcoin", "coin_name": "Bitcoin", "currency": "gbp", "timestamp_ms": i * 1000,
+         "open": 1.0, "high": 2.0, "low": 0.5, "close": 1.0 + i}
+        for i in range(12)
+    ]
+    rates = [{"usd": [[0, 1.25]]}, {"usd": [[0, 1.25], [10**12, 1.3]]}]
+    loads = []
+
+    @timer("Load Historical Crypto Prices")
+    def load_historical(data):
+        loads.append(len(data["clean"]))
+        calls["version"] += 1
+        return {"clean_path": "clean", "stats_path": "stats"}
+
+    monkeypatch.setattr(etl, "HISTORICAL_CURRENCIES", ["gbp", "usd"])
+    monkeypatch.setattr("src.load.load_historical_prices.read_historical_prices", lambda: pd.DataFrame())
+    monkeypatch.setattr("src.extraction.extract_historical_prices.extract_historical_ohlc", lambda *a, **k: OhlcBatch.from_records(records))
+    monkeypatch.setattr("src.extraction.extract_fx_rates.extract_fx_rates", lambda *a: rates.pop(0))
+    monkeypatch.setattr("src.load.load_historical_prices.load_historical_prices", load_historical)
+
+    etl.run_historical_etl()
+    # New FX rates, but none near a candle - the transformed data is the same
+    etl.run_historical_etl()
+
+    assert loads == [24]
+    assert _runs(metrics_dir)[-1]["skipped"] == ["Historical Price ETL > Load Historical Crypto Prices"]
+
+
+REPLAY_ID = "historical-20260101T000000000Z"
+
+
+@pytest.mark.parametrize(
+    "argv, expected",
+    [
+        ([], "full"),
+        (["current"], "current"),
+        (["historical"], "historical"),
+        (["full"], "full"),
+        (["--replay", REPLAY_ID], ("historical", REPLAY_ID)),
+        (["current", "--replay", "current-20260101T000000000Z"], ("current", "current-20260101T000000000Z")),
+    ],
+)
+def test_subcommands_run_one_branch(argv, expected, monkeypatch):
+    ran = []
+    monkeypatch.setattr(etl, "run_current_etl", lambda replay: ran.append(("current", replay) if replay else "current"))
+    monkeypatch.setattr(
+        etl,
+        "run_historical_etl",
+        lambda streaming, replay: ran.append(("historical", replay) if replay else "historical"),
+    )
+    monkeypatch.setattr(etl, "run_full_pipeline", lambda parallel, streaming: ran.append("full") or True)
+
+    etl.main(argv)
+
+    assert ran == [expected]
+
+
+@pytest.mark.parametrize(
+    "argv",
+    [["current", "--replay", REPLAY_ID], ["--replay", "fx-20260101T000000000Z"], ["--replay", "latest"]],
+)
+def test_replay_rejects_mismatched_snapshots(argv):
+    with pytest.raises(SystemExit):
+        etl.parse_args(argv)
+
+
+def test_entry_point_defers_heavy_imports():
+    # Fresh interpreter - this one has already imported everything
+    code = (
+        "import sys; from scripts import run_etl_pipeline; "
+        "print(sorted(m for m in ('pandas', 'numpy', 'requests', 'pyarrow') if m in sys.modules))"
+    )
+    root = Path(__file__).resolve().parents[1]
+    out = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+
+    assert out.stdout.strip() == "[]"
+
+
+def _ohlc_records(coin_id, start, n, step_ms=4 * 86_400_000):
+    return [
+        {"coin_id": coin_id, "coin_name": coin_id.title(), "currency": "gbp",
+         "timestamp_ms": 1_600_000_000_000 + (start + i) * step_ms,
+         "open": 1.0, "high": 2.0, "low": 0.5, "close": 1.0 + (start + i) % 7 + len(coin_id)}
+        for i in range(n)
+    ]
+
+
+def _run_historical(root, monkeypatch, streaming, runs, **kwargs):
+    """
+    Run the historical branch once per {coin_id: records} payload in `runs`
+    (kwargs go to run_historical_etl)
+    Returns the stored history and stats
+    """
+    from src.extraction.extract_historical_prices import CoinBatch
+    from src.load import load_historical_prices as load
+
+    monkeypatch.setattr(load, "CLEANED_DIR", root)
+    monkeypatch.setattr(etl, "SKIP_UNCHANGED", False)
+    monkeypatch.setattr(etl, "HISTORICAL_CURRENCIES", ["gbp", "usd"])
+    monkeypatch.setattr("src.extraction.extract_fx_rates.extract_fx_rates", lambda *a: {"usd": [[0, 1.25]]})
+    monkeypatch.setattr("src.transform.transform_historical_prices.FX_MAX_GAP_MS", 10**15)
+
+    for payload in runs:
+        monkeypatch.setattr(
+            "src.extraction.extract_historical_prices.extract_historical_ohlc",
+            lambda *a, **k: [OhlcBatch.from_records(records)[0] for records in payload.values()],
+        )
+        monkeypatch.setattr(
+            "src.extraction.extract_historical_prices.iter_historical_ohlc",
+            lambda *a, **k: (CoinBatch(c, OhlcBatch.from_records(records)[0], "fetched") for c, records in payload.items()),
+        )
+        etl.run_historical_etl(streaming=streaming, **kwargs)
+
+    return load.read_historical_prices(), load.get_storage_backend(load.STORAGE_BACKEND, root).read_stats()
+
+
+def test_streaming_matches_batch_transform(tmp_path, monkeypatch, calls):
+    first = {c: _ohlc_records(c, 0, 40) for c in ("bitcoin", "ethereum", "solana")}
+    # Second run: new and revised candles for one coin only
+    second = {"ethereum": _ohlc_records("ethereum", 38, 5)}
+
+    batch = _run_historical(tmp_path / "batch", monkeypatch, False, [first, second])
+    streamed = _run_historical(tmp_path / "stream", monkeypatch, True, [first, second])
+
+    pd.testing.assert_frame_equal(streamed[0], batch[0])
+    pd.testing.assert_frame_equal(streamed[1], batch[1])
+    assert len(batch[0]) == 2 * (40 + 43 + 40)
+    # The CSV export is streamed too
+    assert len(pd.read_csv(tmp_path / "stream" / "historical_crypto_prices.csv")) == len(batch[0])
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_full_rewrite_keeps_stored_rows_of_coins_not_extracted(tmp_path, monkeypatch, calls, streaming):
+    monkeypatch.setattr(etl, "COINS", [{"id": c, "name": c.title()} for c in ("bitcoin", "ethereum")])
+    first = {c: _ohlc_records(c, 0, 40) for c in ("bitcoin", "ethereum")}
+    # ethereum failed, with no fallback covering the full window
+    second = {"bitcoin": _ohlc_records("bitcoin", 0, 40)}
+
+    history, stats = _run_historical(tmp_path, monkeypatch, streaming, [first, second], incremental=False)
+
+    assert history.groupby("coin_id").size().to_dict() == {"bitcoin": 80, "ethereum": 80}
+    assert sorted(stats["coin_id"].unique()) == ["bitcoin", "ethereum"]
+
+
+def test_replay_matches_the_archived_run(tmp_path, monkeypatch, calls):
+    from src.extraction.raw_archive import fx_archive, ohlc_archive
+    from src.load import load_historical_prices as load
+
+    payload = {c: _ohlc_records(c, 0, 40) for c in ("bitcoin", "ethereum")}
+    live = _run_historical(tmp_path / "live", monkeypatch, False, [payload])
+
+    # The same extraction, as the extractors archive it
+    fx_archive().write({"usd": [[0, 1.25]]}, good=["usd"])
+    snapshot_id = ohlc_archive().write([OhlcBatch.from_records(r)[0] for r in payload.values()])
+
+    def no_api(*args, **kwargs):
+        raise AssertionError("replay called the API")
+
+    monkeypatch.setattr("src.extraction.extract_historical_prices.extract_historical_ohlc", no_api)
+    monkeypatch.setattr("src.extraction.extract_fx_rates.extract_fx_rates", no_api)
+    monkeypatch.setattr(load, "CLEANED_DIR", tmp_path / "replay")
+
+    etl.run_historical_etl(streaming=True, replay=snapshot_id)
+
+    pd.testing.assert_frame_equal(load.read_historical_prices(), live[0])
+
+
+def test_replay_of_a_batch_run_uses_that_runs_fx_rates(tmp_path, monkeypatch, calls, historical_cache_dir):
+    from src.extraction import extract_fx_rates as fx
+    from src.extraction import extract_historical_prices as extract
+    from src.extraction.raw_archive import ohlc_archive
+    from src.load import load_historical_prices as load
+
+    day_ms = 86_400_000
+    end_ms = int(time.time() * 1000) - 10 * day_ms
+    rates = {"gbp": 1.0, "usd": 1.25}
+
+    def fetch(coin, currency, days):
+        close = 100.0 * len(coin["id"]) * rates[currency]
+        rows = [[end_ms - i * 4 * day_ms, close, close, close, close] for i in range(19, -1, -1)]
+        return OhlcBatch.from_rows(coin["id"], coin["name"], currency, rows)
+
+    monkeypatch.setattr(etl, "COINS", [{"id": c, "name": c.title()} for c in ("bitcoin", "ethereum")])
+    monkeypatch.setattr(etl, "HISTORICAL_CURRENCIES", ["gbp", "usd"])
+    monkeypatch.setattr(etl, "SKIP_UNCHANGED", False)
+    monkeypatch.setattr("src.transform.transform_historical_prices.FX_MAX_GAP_MS", 10**15)
+    monkeypatch.setattr(fx, "FX_CACHE_FILE", tmp_path / "fx_rates.json")
+    monkeypatch.setattr(extract, "BACKUP_FILE", tmp_path / "backup.json")
+    monkeypatch.setattr(extract, "fetch_coin_ohlc", fetch)
+    monkeypatch.setattr(fx, "fetch_coin_ohlc", fetch)
+    monkeypatch.setattr(load, "CLEANED_DIR", tmp_path / "live")
+
+    # Two batch runs with different FX rates - the second must not be
+    # replayed with the first run's rates
+    etl.run_historical_etl(incremental=False, streaming=False)
+    shutil.rmtree(historical_cache_dir)
+    rates["usd"] = 1.5
+    etl.run_historical_etl(incremental=False, streaming=False)
+    live = load.read_historical_prices()
+
+    def no_api(*args, **kwargs):
+        raise AssertionError("replay called the API")
+
+    monkeypatch.setattr(extract, "fetch_coin_ohlc", no_api)
+    monkeypatch.setattr(fx, "fetch_coin_ohlc", no_api)
+    monkeypatch.setattr(load, "CLEANED_DIR", tmp_path / "replay")
+
+    etl.run_historical_etl(incremental=False, replay=ohlc_archive().snapshots()[-1]["id"])
+
+    pd.testing.assert_frame_equal(load.read_historical_prices(), live)
+    usd = live[live["currency"] == "usd"]
+    assert (usd["close"] == 150.0 * usd["coin_id"].str.len()).all()
@@ -0,0 +1,113 @@
+import os
+import signal
+import threading
+import time
+import pytest
+from src.utils.scheduler import Scheduler
+
+
+def _run_in_background(scheduler):
+    thread = threading.Thread(target=scheduler.run, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_jobs_run_on_independent_intervals():
+    scheduler = Scheduler()
+    fast = scheduler.add_job("fast", lambda: None, 0.02)
+    slow = scheduler.add_job("slow", lambda: None, 10)
+
+    thread = _run_in_background(scheduler)
+    time.sleep(0.15)
+    scheduler.stop()
+    thread.join(timeout=2)
+
+    assert not thread.is_alive()
+    assert fast.runs >= 4
+    assert slow.runs == 1
+
+
+def test_overlapping_runs_are_skipped_not_queued():
+    release = threading.Event()
+    started = []
+
+    def slow_job():
+        started.append(time.monotonic())
+        release.wait(timeout=2)
+
+    scheduler = Scheduler()
+    job = scheduler.add_job("slow", slow_job, 0.02)
+
+    thread = _run_in_background(scheduler)
+    time.sleep(0.15)
+    release.set()
+    scheduler.stop()
+    thread.join(timeout=2)
+
+    assert len(started) == 1
+    assert job.skipped >= 3
+    assert job.runs == 1
+
+
+def test_failing_job_keeps_its_schedule(caplog):
+    def broken():
+        raise RuntimeError("boom")
+
+    scheduler = Scheduler()
+    job = scheduler.add_job("broken", broken, 0.02)
+
+    thread = _run_in_background(scheduler)
+    time.sleep(0.1)
+    scheduler.stop()
+    thread.join(timeout=2)
+
+    assert job.failures >= 2
+    assert job.failures == job.runs
+    assert "Job 'broken' failed" in caplog.text
+
+
+def test_stop_waits_for_in_flight_job():
+    finished = threading.Event()
+
+    def job_func():
+        time.sleep(0.1)
+        finished.set()
+
+    scheduler = Scheduler()
+    scheduler.add_job("job", job_func, 10)
+
+    thread = _run_in_background(scheduler)
+    time.sleep(0.02)
+    scheduler.stop()
+    thread.join(timeout=2)
+
+    assert finished.is_set()
+
+
+def test_sigterm_stops_scheduler_gracefully():
+    previous = signal.getsignal(signal.SIGTERM)
+    finished = threading.Event()
+
+    def job_func():
+        os.kill(os.getpid(), signal.SIGTERM)
+        time.sleep(0.05)
+        finished.set()
+
+    scheduler = Scheduler()
+    job = scheduler.add_job("job", job_func, 0.01)
+
+    # Runs in the main thread, so the scheduler owns SIGTERM
+    scheduler.run()
+
+    assert finished.is_set()
+    assert job.runs == 1
+    assert signal.getsignal(signal.SIGTERM) is previous
+
+
+def test_invalid_configuration_is_rejected():
+    scheduler = Scheduler()
+
+    with pytest.raises(ValueError):
+        scheduler.run()
+    with pytest.raises(ValueError):
+        scheduler.add_job("bad", lambda: None, 0)
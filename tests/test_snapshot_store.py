@@ -0,0 +1,162 @@
+import pandas as pd
+import pyarrow as pa
+from unittest.mock import patch
+from src.load.snapshot_store import SnapshotStore
+
+START = pd.Timestamp("2024-01-01 00:00", tz="UTC")
+
+
+def snapshot(minute, coins=("bitcoin", "ethereum"), currencies=("gbp", "usd")):
+    rows = [
+        {
+            "timestamp": START + pd.Timedelta(minutes=minute),
+            "coin_id": coin,
+            "currency": currency,
+            "price": float(minute),
+        }
+        for coin in coins
+        for currency in currencies
+    ]
+    return pd.DataFrame(rows)
+
+
+def test_latest_returns_only_newest_snapshot(tmp_path):
+    store = SnapshotStore(tmp_path)
+    for minute in range(5):
+        store.append(snapshot(minute))
+
+    latest = store.latest()
+
+    assert len(latest) == 4
+    assert latest["price"].unique().tolist() == [4.0]
+    assert latest["timestamp"].iloc[0] == START + pd.Timedelta(minutes=4)
+
+
+def test_history_keeps_every_snapshot_in_order(tmp_path):
+    store = SnapshotStore(tmp_path)
+    for minute in range(5):
+        store.append(snapshot(minute))
+
+    history = store.history()
+
+    assert len(history) == 20
+    assert history["price"].drop_duplicates().tolist() == [0.0, 1.0, 2.0, 3.0, 4.0]
+
+
+def test_history_filters_by_time_range(tmp_path):
+    store = SnapshotStore(tmp_path)
+    for minute in range(5):
+        store.append(snapshot(minute))
+
+    history = store.history(
+        start=START + pd.Timedelta(minutes=1), end=START + pd.Timedelta(minutes=2)
+    )
+
+    assert history["price"].unique().tolist() == [1.0, 2.0]
+
+
+def test_stale_or_duplicate_snapshot_is_skipped(tmp_path):
+    store = SnapshotStore(tmp_path)
+    store.append(snapshot(2))
+
+    assert store.append(snapshot(2)) is None
+    assert store.append(snapshot(1)) is None
+    assert len(store.entries()) == 1
+
+
+def test_segments_roll_over_past_size_limit(tmp_path):
+    store = SnapshotStore(tmp_path, segment_max_bytes=1)
+    for minute in range(3):
+        store.append(snapshot(minute))
+
+    segments = sorted(p.name for p in tmp_path.glob("segment-*.arrows"))
+    assert segments == [
+        "segment-00001.arrows",
+        "segment-00002.arrows",
+        "segment-00003.arrows",
+    ]
+    assert len(store.history()) == 12
+
+
+def test_append_does_not_scan_the_index(tmp_path):
+    store = SnapshotStore(tmp_path)
+    store.append(snapshot(0))
+
+    with patch.object(SnapshotStore, "entries", side_effect=AssertionError):
+        store.append(snapshot(1))
+        store.latest()
+
+
+def test_unindexed_bytes_from_interrupted_append_are_ignored(tmp_path):
+    store = SnapshotStore(tmp_path)
+    store.append(snapshot(0))
+
+    # Simulate a crash after writing data but before the index line
+    with open(tmp_path / "segment-00001.arrows", "ab") as f:
+        f.write(b"garbage")
+
+    store.append(snapshot(1))
+
+    assert store.history()["price"].unique().tolist() == [0.0, 1.0]
+    assert store.latest()["price"].unique().tolist() == [1.0]
+
+
+def test_empty_store(tmp_path):
+    store = SnapshotStore(tmp_path / "missing")
+
+    assert store.latest().empty
+    assert store.history().empty
+    assert store.last_entry() is None
+
+
+def test_partial_index_line_from_interrupted_append_is_dropped(tmp_path):
+    store = SnapshotStore(tmp_path)
+    for minute in range(3):
+        store.append(snapshot(minute))
+
+    # Simulate a crash in the middle of writing the last index line
+    index = tmp_path / "index.csv"
+    index.write_bytes(index.read_bytes()[:-10])
+
+    assert store.last_entry().timestamp == START + pd.Timedelta(minutes=1)
+    assert len(store.entries()) == 2
+    assert store.latest()["price"].unique().tolist() == [1.0]
+
+    store.append(snapshot(3))
+
+    assert store.history()["price"].drop_duplicates().tolist() == [0.0, 1.0, 3.0]
+    assert index.read_text().count("\n") == 4
+
+
+def test_snapshots_with_all_null_columns_share_one_schema(tmp_path):
+    store = SnapshotStore(tmp_path)
+    # No market caps in the first snapshot - pandas infers an object column
+    store.append(snapshot(0).assign(market_cap=None))
+    store.append(snapshot(1).assign(market_cap=1e9))
+
+    history = store.history()
+
+    assert history["market_cap"].isna().tolist() == [True] * 4 + [False] * 4
+    assert history["price"].dtype == "float64"
+
+
+def test_snapshots_written_with_an_inferred_schema_are_read(tmp_path):
+    # As written before snapshots had a fixed schema: no coin_name column,
+    # and an all-null market_cap inferred as the null type
+    table = pa.Table.from_pandas(snapshot(0).assign(market_cap=None), preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    payload = sink.getvalue().to_pybytes()
+    (tmp_path / "segment-00001.arrows").write_bytes(payload)
+    (tmp_path / "index.csv").write_text(
+        f"timestamp,segment,offset,length,rows\n{START.isoformat()},segment-00001.arrows,0,{len(payload)},4\n"
+    )
+
+    store = SnapshotStore(tmp_path)
+    store.append(snapshot(1))
+    history = store.history()
+
+    assert list(history.columns) == store.schema.names
+    assert history["price"].drop_duplicates().tolist() == [0.0, 1.0]
+    assert history["market_cap"].isna().all()
@@ -0,0 +1,233 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+import pytest
+from benchmarks.generators import ohlc_frame
+from src.load.storage import (
+    CsvBackend,
+    HistoricalWriter,
+    ParquetBackend,
+    StorageBackend,
+    get_storage_backend,
+)
+
+
+def make_history():
+    timestamps = pd.to_datetime(
+        ["2024-01-05", "2024-01-20", "2024-02-10", "2024-03-01"]
+    )
+    frames = []
+    for i, coin in enumerate(["bitcoin", "ethereum"]):
+        frames.append(
+            pd.DataFrame(
+                {
+                    "coin_id": coin,
+                    "coin_name": coin.title(),
+                    "currency": "gbp",
+                    "timestamp_ms": timestamps.astype("int64") // 1_000_000,
+                    "open": 1.0,
+                    "high": 2.0,
+                    "low": 0.5,
+                    "close": [10.0 * (i + 1) + j for j in range(4)],
+                    "timestamp": timestamps,
+                    "pct_change": 0.1,
+                    "rolling_7d": 1.0,
+                    "rolling_30d": 1.0,
+                    "normalized_close": 1.0,
+                }
+            )
+        )
+    return pd.concat(frames, ignore_index=True)
+
+
+def make_stats():
+    return pd.DataFrame(
+        {"coin_id": ["bitcoin", "ethereum"], "coin_name": ["Bitcoin", "Ethereum"]}
+    )
+
+
+def test_parquet_writes_one_file_per_coin(tmp_path):
+    backend = ParquetBackend(tmp_path)
+    backend.write_historical(make_history(), make_stats())
+
+    files = sorted(
+        str(p.relative_to(backend.historical_dir))
+        for p in backend.historical_dir.rglob("*.parquet")
+    )
+    assert files == [
+        "coin_id=bitcoin/part-0.parquet",
+        "coin_id=ethereum/part-0.parquet",
+    ]
+
+
+def test_parquet_reads_month_partitioned_datasets(tmp_path):
+    # Layout written by earlier versions: coin_id=.../year_month=...
+    history = make_history()
+    backend = ParquetBackend(tmp_path)
+    ds.write_dataset(
+        backend._to_table(history.assign(year_month=history["timestamp"].dt.strftime("%Y-%m"))),
+        backend.historical_dir,
+        format="parquet",
+        partitioning=ds.partitioning(
+            pa.schema([("coin_id", pa.string()), ("year_month", pa.string())]), flavor="hive"
+        ),
+    )
+
+    result = backend.read_historical(coin_ids=["ethereum"], start="2024-01-10")
+
+    assert "year_month" not in result.columns
+    assert result["close"].tolist() == [21.0, 22.0, 23.0]
+
+
+def test_parquet_files_are_typed_and_compressed(tmp_path):
+    backend = ParquetBackend(tmp_path)
+    backend.write_historical(make_history(), make_stats())
+
+    part = next(backend.historical_dir.rglob("*.parquet"))
+    schema = pq.read_schema(part)
+    assert schema.field("timestamp").type == pa.timestamp("us")
+    assert schema.field("close").type == pa.float64()
+    assert pq.ParquetFile(part).metadata.row_group(0).column(0).compression == "ZSTD"
+
+
+def test_parquet_round_trip_matches_input(tmp_path):
+    history = make_history()
+    backend = ParquetBackend(tmp_path)
+    backend.write_historical(history, make_stats())
+
+    result = backend.read_historical()
+
+    pd.testing.assert_frame_equal(result, history, check_dtype=False)
+    assert pd.api.types.is_datetime64_any_dtype(result["timestamp"])
+
+
+def test_parquet_read_filters_by_coin_and_date(tmp_path):
+    backend = ParquetBackend(tmp_path)
+    backend.write_historical(make_history(), make_stats())
+
+    result = backend.read_historical(
+        coin_ids=["ethereum"], start="2024-01-10", end="2024-02-28"
+    )
+
+    assert result["coin_id"].unique().tolist() == ["ethereum"]
+    assert result["timestamp"].dt.strftime("%Y-%m-%d").tolist() == [
+        "2024-01-20",
+        "2024-02-10",
+    ]
+
+
+def test_parquet_rewrite_replaces_old_partitions(tmp_path):
+    backend = ParquetBackend(tmp_path)
+    history = make_history()
+    backend.write_historical(history, make_stats())
+    backend.write_historical(history[history["coin_id"] == "bitcoin"], make_stats())
+
+    assert backend.read_historical()["coin_id"].unique().tolist() == ["bitcoin"]
+    assert not (backend.historical_dir / "coin_id=ethereum").exists()
+
+
+def test_parquet_reads_fall_back_to_csv_export(tmp_path):
+    history = make_history()
+    CsvBackend(tmp_path).write_historical(history, make_stats())
+
+    result = ParquetBackend(tmp_path).read_historical(coin_ids=["bitcoin"])
+
+    assert len(result) == 4
+
+
+def test_current_and_stats_round_trip(tmp_path):
+    backend = ParquetBackend(tmp_path)
+    current = pd.DataFrame(
+        {
+            "timestamp": [pd.Timestamp.now(tz="UTC")],
+            "coin_id": ["bitcoin"],
+            "coin_name": ["Bitcoin"],
+            "currency": ["gbp"],
+            "price": [100.0],
+            "market_cap": [1e9],
+            "volume_24h": [1e6],
+            "change_24h": [-1.5],
+        }
+    )
+
+    backend.write_current(current)
+    backend.write_historical(make_history(), make_stats())
+
+    pd.testing.assert_frame_equal(backend.read_current(), current, check_dtype=False)
+    pd.testing.assert_frame_equal(backend.read_stats(), make_stats())
+
+
+def test_unknown_backend_rejected(tmp_path):
+    assert isinstance(get_storage_backend("csv", tmp_path), CsvBackend)
+    with pytest.raises(ValueError):
+        get_storage_backend("sqlite", tmp_path)
+
+
+def test_parquet_writes_more_than_1024_partitions(tmp_path):
+    clean = ohlc_frame(n_coins=90, years=1)  # 90 coins x 13 months
+    stats = clean.groupby("coin_id", as_index=False)["close"].max()
+
+    backend = ParquetBackend(tmp_path)
+    backend.write_historical(clean, stats)
+
+    assert len(backend.read_historical()) == len(clean)
+
+
+@pytest.mark.parametrize("backend_cls", [ParquetBackend, CsvBackend])
+def test_historical_writer_matches_full_write_and_keeps_other_coins(tmp_path, backend_cls):
+    history = make_history()
+    backend = backend_cls(tmp_path)
+    backend.write_historical(history, make_stats())
+
+    # Rewrite bitcoin only, with a changed close - ethereum is carried over
+    bitcoin = history[history["coin_id"] == "bitcoin"].assign(close=99.0)
+    writer = backend.historical_writer()
+    writer.write_coin(bitcoin, make_stats().iloc[:1].assign(coin_name="New"))
+    writer.finish()
+
+    expected = pd.concat([bitcoin, history[history["coin_id"] == "ethereum"]], ignore_index=True)
+    pd.testing.assert_frame_equal(
+        backend.read_historical(), expected, check_dtype=False, check_exact=False
+    )
+    assert backend.read_stats()["coin_name"].tolist() == ["New", "Ethereum"]
+
+
+@pytest.mark.parametrize("backend_cls", [ParquetBackend, CsvBackend])
+def test_aborted_historical_writer_leaves_stored_data(tmp_path, backend_cls):
+    history = make_history()
+    backend = backend_cls(tmp_path)
+    backend.write_historical(history, make_stats())
+
+    writer = backend.historical_writer()
+    writer.write_coin(history.iloc[:1], make_stats().iloc[:1])
+    writer.abort()
+
+    assert len(backend.read_historical()) == len(history)
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def test_parquet_reads_only_requested_columns(tmp_path):
+    backend = ParquetBackend(tmp_path)
+    backend.write_historical(make_history(), make_stats())
+
+    df = backend.read_historical(columns=["coin_id", "timestamp_ms"])
+
+    assert list(df.columns) == ["coin_id", "timestamp_ms"]
+    assert len(df) == len(make_history())
+
+
+
+def test_incomplete_backend_or_writer_fails_at_construction(tmp_path):
+    class Partial(StorageBackend):
+        def write_current(self, df, filename="x.csv"):
+            return filename
+
+    class PartialWriter(HistoricalWriter):
+        def abort(self):
+            pass
+
+    with pytest.raises(TypeError, match="abstract"):
+        Partial(tmp_path)
+    with pytest.raises(TypeError, match="abstract"):
+        PartialWriter(CsvBackend(tmp_path))
@@ -1,5 +1,7 @@
 import pandas as pd
 import pytest  # noqa: F401
+from benchmarks.reference import legacy_flatten_rows
+from src.transform import transform_current_prices as transform_current
 from src.transform.transform_current_prices import transform_current_prices
 
 # Sample input for testing
@@ -124,3 +126,29 @@ def test_unknown_coin_id_does_not_crash(caplog):
     assert any(
         "Unknown coin ID" in message for message in caplog.text.split("\n")
     )
+
+
+def test_vectorized_matches_row_by_row(monkeypatch):
+    raw = {
+        **MOCK_RAW_DATA,
+        "dogecoin": {
+            "gbp": None,
+            "gbp_market_cap": 10,
+            "gbp_24h_vol": "5",
+            "usd": 0.2,
+            "usd_market_cap": "n/a",
+            "usd_24h_vol": 3,
+            "usd_24h_change": 1.0,
+        },
+        "unknowncoin": {"gbp": 1, "usd": 2},
+    }
+    coins = MOCK_COINS + [{"id": "dogecoin", "name": "Dogecoin"}]
+
+    fast = transform_current_prices(raw, coins, MOCK_CURRENCIES)
+    monkeypatch.setattr(transform_current, "_flatten_vectorized", legacy_flatten_rows)
+    slow = transform_current_prices(raw, coins, MOCK_CURRENCIES)
+
+    assert fast["timestamp"].dtype == slow["timestamp"].dtype
+    pd.testing.assert_frame_equal(
+        fast.drop(columns="timestamp"), slow.drop(columns="timestamp")
+    )
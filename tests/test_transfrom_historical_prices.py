@@ -1,5 +1,12 @@
 import pandas as pd
+import pytest
+from unittest.mock import patch
+from benchmarks.generators import DAY_MS, ohlc_frame
+from benchmarks.reference import legacy_build_stats, legacy_enrich
 from src.transform.transform_historical_prices import (
+    _build_stats,
+    _enrich,
+    latest_timestamps,
     transform_historical_prices,
 )
 
@@ -111,3 +118,152 @@ def test_stats_table_values():
     assert row["max_close"] == 15
     assert row["min_close"] == 10
     assert row["total_return"] == (15 - 10) / 10
+
+
+def _synthetic_records(coins=("btc", "eth"), n=80):
+    records = []
+    for c, coin in enumerate(coins):
+        for i in range(n):
+            records.append(
+                {
+                    "coin_id": coin,
+                    "coin_name": coin.upper(),
+                    "currency": "gbp",
+                    "timestamp_ms": 1_000_000 + i * 1000,
+                    "open": 1,
+                    "high": 2,
+                    "low": 1,
+                    "close": 10 + c + (i % 13) * 0.5 + i * 0.01,
+                }
+            )
+    return records
+
+
+def test_incremental_merge_matches_full_transform():
+    records = _synthetic_records()
+    history = [r for r in records if r["timestamp_ms"] < 1_000_000 + 60 * 1000]
+    # New batch overlaps the last stored candle and revises its close
+    new = [r for r in records if r["timestamp_ms"] >= 1_000_000 + 59 * 1000]
+
+    full = transform_historical_prices(records)
+    existing = transform_historical_prices(history)["clean"]
+    merged = transform_historical_prices(new, existing=existing)
+
+    columns = [
+        "coin_id",
+        "timestamp_ms",
+        "close",
+        "pct_change",
+        "rolling_7d",
+        "rolling_30d",
+        "normalized_close",
+    ]
+    pd.testing.assert_frame_equal(
+        merged["clean"][columns].reset_index(drop=True),
+        full["clean"][columns].reset_index(drop=True),
+    )
+    pd.testing.assert_frame_equal(merged["stats"], full["stats"])
+
+
+def test_incremental_new_coin_is_fully_enriched():
+    existing = transform_historical_prices(_synthetic_records(coins=("btc",)))["clean"]
+    new = _synthetic_records(coins=("eth",), n=5)
+
+    merged = transform_historical_prices(new, existing=existing)["clean"]
+    eth = merged[merged["coin_id"] == "eth"]
+
+    assert len(eth) == 5
+    assert eth["normalized_close"].iloc[0] == 1.0
+    assert eth["pct_change"].isna().sum() == 1
+
+
+def test_incremental_without_new_records_keeps_history():
+    existing = transform_historical_prices(_synthetic_records())["clean"]
+
+    result = transform_historical_prices([], existing=existing)
+
+    assert result["clean"] is existing
+    assert len(result["stats"]) == 2
+
+
+# The legacy total_return lambda divides by the zero first close
+@pytest.mark.filterwarnings("ignore:divide by zero")
+def test_native_kernels_match_per_coin_lambdas():
+    history = ohlc_frame(n_coins=12, years=1, candle_ms=DAY_MS, seed=3)
+    # Uneven coin lengths, a single-candle coin and a zero first close
+    history = history.drop(index=history.index[40:400]).reset_index(drop=True)
+    history = history[~((history["coin_id"] == "coin-00005") & (history.index % 365 != 0))]
+    history = history.reset_index(drop=True)
+    history.loc[history["coin_id"] == "coin-00007", "close"] *= 1e-9
+    history.loc[history.index[history["coin_id"] == "coin-00009"][0], "close"] = 0.0
+    # Each coin in two currencies - series are per (coin_id, currency)
+    history = pd.concat([history, history.assign(currency="usd", close=history["close"] * 1.3)])
+    history = history.sort_values(["coin_id", "currency"], kind="stable").reset_index(drop=True)
+
+    expected = history.copy()
+    legacy_enrich(expected)
+    actual = history.copy()
+    _enrich(actual)
+
+    pd.testing.assert_frame_equal(actual, expected, check_exact=True)
+    pd.testing.assert_frame_equal(_build_stats(actual), legacy_build_stats(expected), check_exact=True)
+
+    # Rows not in series order are grouped the same way
+    shuffled = actual.sample(frac=1, random_state=0)
+    pd.testing.assert_frame_equal(_build_stats(shuffled), legacy_build_stats(shuffled), check_exact=True)
+
+
+def _fx_rates(rate, n=80, step_ms=1000):
+    return [[1_000_000 + i * step_ms, rate * (1 + i * 0.001)] for i in range(n)]
+
+
+def test_fx_rates_derive_other_currencies():
+    records = _synthetic_records()
+
+    result = transform_historical_prices(records, fx_rates={"usd": _fx_rates(1.25)})
+    clean = result["clean"]
+
+    assert sorted(clean["currency"].unique()) == ["gbp", "usd"]
+    gbp = clean[clean["currency"] == "gbp"].reset_index(drop=True)
+    usd = clean[clean["currency"] == "usd"].reset_index(drop=True)
+    rate = pd.Series([r for _, r in _fx_rates(1.25)] * 2)
+    pd.testing.assert_series_equal(usd["close"], gbp["close"] * rate, check_names=False)
+    # Derived columns are computed per coin and currency
+    assert (usd.groupby("coin_id")["normalized_close"].first() == 1.0).all()
+    assert usd["pct_change"].isna().sum() == 2
+    assert sorted(zip(result["stats"]["coin_id"], result["stats"]["currency"])) == [
+        ("btc", "gbp"), ("btc", "usd"), ("eth", "gbp"), ("eth", "usd")
+    ]
+
+
+def test_fx_rates_use_nearest_rate_and_skip_uncovered_candles():
+    records = _synthetic_records(coins=("btc",), n=10)
+    # Rates every 3 candles, and none after the 6th candle
+    rates = [[1_000_000, 2.0], [1_003_000, 3.0], [1_006_000, 4.0]]
+
+    with patch("src.transform.transform_historical_prices.FX_MAX_GAP_MS", 1000):
+        clean = transform_historical_prices(records, fx_rates={"eur": rates})["clean"]
+
+    eur = clean[clean["currency"] == "eur"]
+    gbp = clean[clean["currency"] == "gbp"].set_index("timestamp_ms")["close"]
+    assert eur["timestamp_ms"].tolist() == [1_000_000 + i * 1000 for i in range(8)]
+    expected = [2, 2, 3, 3, 3, 4, 4, 4]
+    assert (eur["close"].to_numpy() == gbp.loc[eur["timestamp_ms"]].to_numpy() * expected).all()
+
+
+def test_incremental_merge_with_currencies_matches_full_transform():
+    records = _synthetic_records()
+    fx = {"usd": _fx_rates(1.25), "eur": _fx_rates(1.1)}
+    history = [r for r in records if r["timestamp_ms"] < 1_000_000 + 60 * 1000]
+    new = [r for r in records if r["timestamp_ms"] >= 1_000_000 + 59 * 1000]
+
+    full = transform_historical_prices(records, fx_rates=fx)
+    existing = transform_historical_prices(history, fx_rates=fx)["clean"]
+    merged = transform_historical_prices(new, existing=existing, fx_rates=fx)
+
+    pd.testing.assert_frame_equal(merged["clean"], full["clean"])
+    pd.testing.assert_frame_equal(merged["stats"], full["stats"])
+    assert latest_timestamps(merged["clean"], currency="gbp") == {
+        "btc": 1_000_000 + 79 * 1000,
+        "eth": 1_000_000 + 79 * 1000,
+    }